@@ -0,0 +1,105 @@
+# ************************************************
+#   AdjacenciaCSR.py
+#   Define a classe AdjacenciaCSR: lista de adjacencia compacta
+#   (4-vizinhanca) sobre ids planos de celula (x + z*width).
+#
+#   Formato CSR com linha de tamanho fixo: os vizinhos caminhaveis
+#   da celula i ficam em nbr[4*i : 4*i + deg[i]] (offset da linha =
+#   4*i, sem vetor de offsets). Toda celula tem linha, inclusive
+#   parede (vizinhos caminhaveis dela), como neighbors_of.
+#   Com a linha de tamanho fixo, mudar uma celula so reescreve a
+#   linha dela e a dos 4 vizinhos, sem deslocar o resto do vetor.
+#
+#   nbr e array('i') e deg e bytearray: indexar devolve int direto,
+#   sem montar listas/tuplas a cada no expandido.
+#   As linhas (4 ints por celula) so sao montadas na primeira busca:
+#   um mapa enorme carregado sem rodar A* nao paga a memoria delas.
+# ************************************************
+
+from array import array
+
+import numpy as np
+
+""" Classe AdjacenciaCSR """
+class AdjacenciaCSR:
+    def __init__(self, walkable):
+        height, width = walkable.shape
+        self.width = width
+        self.height = height
+        # plano caminhável vivo (o mapa muda no lugar), lido no build
+        self.walkable = walkable
+        self._nbr = None
+        self._deg = None
+
+    @property
+    def built(self):
+        return self._nbr is not None
+
+    @property
+    def nbr(self):
+        if self._nbr is None:
+            self._build()
+        return self._nbr
+
+    @property
+    def deg(self):
+        if self._deg is None:
+            self._build()
+        return self._deg
+
+    def _build(self):
+        walkable = self.walkable
+        height, width = walkable.shape
+        cand = np.full((height * width, 4), -1, dtype=np.int32)
+        deg = np.zeros(height * width, dtype=np.uint8)
+        # mesma ordem de neighbors_of: +x, -x, +z, -z; cada vizinho caminhável
+        # vai para a próxima posição livre da linha (sem ordenar)
+        for (dx, dz) in ((1, 0), (-1, 0), (0, 1), (0, -1)):
+            x0, x1 = max(0, -dx), width - max(0, dx)
+            z0, z1 = max(0, -dz), height - max(0, dz)
+            has = np.zeros((height, width), dtype=bool)
+            has[z0:z1, x0:x1] = walkable[z0+dz:z1+dz, x0+dx:x1+dx]
+            ids = np.flatnonzero(has).astype(np.int32)
+            cand[ids, deg[ids]] = ids + (dx + dz*width)
+            deg[ids] += 1
+        self._nbr = array('i', cand.tobytes())
+        self._deg = bytearray(deg.tobytes())
+
+    def row(self, i):
+        base = 4 * i
+        return self.nbr[base:base + self.deg[i]]
+
+    """ Arestas (u, w) entre células caminháveis, com u < w, como vetores NumPy
+        (para algoritmos vetorizados). Saem direto do plano, sem montar as linhas. """
+    def edges(self, walkable):
+        ids = np.arange(walkable.size, dtype=np.int64).reshape(walkable.shape)
+        h = walkable[:, :-1] & walkable[:, 1:]
+        v = walkable[:-1, :] & walkable[1:, :]
+        return (np.concatenate([ids[:, :-1][h], ids[:-1, :][v]]),
+                np.concatenate([ids[:, 1:][h], ids[1:, :][v]]))
+
+    """ Reescreve as linhas das células alteradas e dos vizinhos delas """
+    def update(self, cells, walkable):
+        if self._nbr is None:
+            # ainda não montado: o build já lê o plano novo
+            return
+        width = self.width
+        height = self.height
+        nbr = self.nbr
+        deg = self.deg
+        touched = set()
+        for (x, z) in cells:
+            touched.add((x, z))
+            touched.update(((x+1, z), (x-1, z), (x, z+1), (x, z-1)))
+        for (x, z) in touched:
+            if not (0 <= x < width and 0 <= z < height):
+                continue
+            base = 4 * (x + z*width)
+            k = 0
+            for (nx, nz) in ((x+1, z), (x-1, z), (x, z+1), (x, z-1)):
+                if 0 <= nx < width and 0 <= nz < height and walkable[nz, nx]:
+                    nbr[base + k] = nx + nz*width
+                    k += 1
+            deg[base // 4] = k
+            for j in range(k, 4):
+                nbr[base + j] = -1
@@ -0,0 +1,84 @@
+# ************************************************
+#   AgendadorDeCaminhos.py
+#   Define a classe AgendadorDeCaminhos: fila de pedidos de
+#   caminho com um orcamento por quadro: tempo (ms) ou numero de
+#   pedidos. O orcamento em pedidos nao depende da maquina: a mesma
+#   semente da o mesmo resultado (headless, testes).
+#   Os pedidos sao atendidos por prioridade: primeiro quem esta
+#   mais perto do jogador e quem tem o caminho mais velho.
+#   Quem fica na fila continua seguindo o caminho antigo.
+# ************************************************
+
+import time
+
+MAX_STALE_AGE = 10.0
+
+""" Classe AgendadorDeCaminhos """
+class AgendadorDeCaminhos:
+    def __init__(self, budget_ms=2.0, stale_weight=4.0, max_requests=None):
+        # budget_ms None = sem limite (atende tudo no mesmo quadro)
+        self.budget_ms = budget_ms
+        # max_requests: pedidos por quadro; quando dado, vale no lugar de budget_ms
+        self.max_requests = max_requests
+        self.stale_weight = stale_weight
+        self.clock = 0.0
+        self._pending = {}
+        # contadores
+        self.served_last_frame = 0
+        self.served_total = 0
+        self.requested_total = 0
+        self.max_queue = 0
+        self.last_frame_ms = 0.0
+
+    @property
+    def queue_length(self):
+        return len(self._pending)
+
+    def __len__(self):
+        return len(self._pending)
+
+    def __contains__(self, obj):
+        return id(obj) in self._pending
+
+    def clear(self):
+        self._pending.clear()
+
+    """ Pede (ou atualiza) um caminho para obj; dist = distância até o alvo,
+        planned_at = instante em que o caminho atual foi calculado (None = nunca) """
+    def request(self, obj, dist, planned_at=None):
+        key = id(obj)
+        if key not in self._pending:
+            self.requested_total += 1
+        self._pending[key] = (obj, dist, planned_at)
+
+    def cancel(self, obj):
+        self._pending.pop(id(obj), None)
+
+    def _priority(self, item):
+        _, dist, planned_at = item
+        age = MAX_STALE_AGE if planned_at is None else min(MAX_STALE_AGE, self.clock - planned_at)
+        return dist - self.stale_weight * age
+
+    """ Avança o relógio e chama serve(obj) para os pedidos mais urgentes até
+        gastar o orçamento do quadro (sempre atende pelo menos um) """
+    def run(self, dt, serve):
+        self.clock += dt
+        self.max_queue = max(self.max_queue, len(self._pending))
+        served = 0
+        start = time.perf_counter()
+        if self._pending:
+            for item in sorted(self._pending.values(), key=self._priority):
+                if self.max_requests is not None:
+                    if served >= max(1, self.max_requests):
+                        break
+                elif served and self.budget_ms is not None and \
+                     (time.perf_counter() - start) * 1000.0 >= self.budget_ms:
+                    break
+                obj = item[0]
+                del self._pending[id(obj)]
+                serve(obj)
+                served += 1
+        self.served_last_frame = served
+        self.served_total += served
+        self.last_frame_ms = (time.perf_counter() - start) * 1000.0
+        return served
@@ -0,0 +1,131 @@
+# ************************************************
+#   CacheDeCaminhos.py
+#   Define a classe CacheDeCaminhos: cache LRU de caminhos
+#   calculados, chave (start_cell, goal_cell).
+#   Todo sufixo de um caminho minimo tambem e minimo: qualquer
+#   celula de um caminho guardado responde a uma consulta para o
+#   mesmo goal (sufix hit).
+#   Um indice celula -> caminhos permite invalidar so os caminhos
+#   que passam pelas celulas alteradas no mapa.
+#   Celula aberta (parede que virou chao) nao esta em caminho nenhum,
+#   mas pode encurtar alguns: um caminho por c de start a goal tem pelo
+#   menos |start-c| + |c-goal| passos (Manhattan, 4-vizinhanca), entao
+#   so cai quem tem mais passos que isso. O teste vale tambem para os
+#   sufixos (o sufixo de i tem i passos a menos, e |p_i-c| >= |start-c| - i).
+# ************************************************
+
+from collections import OrderedDict
+
+""" Classe CacheDeCaminhos """
+class CacheDeCaminhos:
+    def __init__(self, capacity=256):
+        self.capacity = capacity
+        self._paths = OrderedDict()
+        # (cell, goal) -> (chave, posição da célula no caminho)
+        self._suffix = {}
+        # cell -> chaves dos caminhos que passam por ela
+        self._through = {}
+        # contadores
+        self.hits = 0
+        self.suffix_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidated = 0
+
+    def __len__(self):
+        return len(self._paths)
+
+    def clear(self):
+        self._paths.clear()
+        self._suffix.clear()
+        self._through.clear()
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.suffix_hits + self.misses
+        return (self.hits + self.suffix_hits) / total if total else 0.0
+
+    """ Caminho de start até goal (lista nova) ou None se não estiver no cache """
+    def get(self, start, goal):
+        key = (start, goal)
+        path = self._paths.get(key)
+        if path is not None:
+            self._paths.move_to_end(key)
+            self.hits += 1
+            return list(path)
+        ref = self._suffix.get(key)
+        if ref is not None:
+            owner, i = ref
+            self._paths.move_to_end(owner)
+            self.suffix_hits += 1
+            return list(self._paths[owner][i:])
+        self.misses += 1
+        return None
+
+    def put(self, path):
+        if not path or self.capacity <= 0:
+            return
+        goal = path[-1]
+        key = (path[0], goal)
+        if key in self._paths:
+            self._remove(key)
+        path = tuple(path)
+        self._paths[key] = path
+        for i, cell in enumerate(path):
+            self._suffix[(cell, goal)] = (key, i)
+            self._through.setdefault(cell, set()).add(key)
+        while len(self._paths) > self.capacity:
+            self._remove(next(iter(self._paths)))
+            self.evictions += 1
+
+    def _remove(self, key):
+        path = self._paths.pop(key)
+        goal = key[1]
+        for cell in path:
+            ref = self._suffix.get((cell, goal))
+            if ref is not None and ref[0] == key:
+                del self._suffix[(cell, goal)]
+            keys = self._through.get(cell)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._through[cell]
+
+    """ Remove os caminhos que podem ficar mais curtos passando por alguma das
+        células abertas; retorna quantos """
+    def invalidate_opened(self, cells):
+        if not cells or not self._paths:
+            return 0
+        x0 = min(x for x, _ in cells)
+        x1 = max(x for x, _ in cells)
+        z0 = min(z for _, z in cells)
+        z1 = max(z for _, z in cells)
+        doomed = []
+        for (start, goal), path in self._paths.items():
+            steps = len(path) - 1
+            # limite inferior pelo retângulo das células abertas
+            if _to_box(start, x0, z0, x1, z1) + _to_box(goal, x0, z0, x1, z1) >= steps:
+                continue
+            for (x, z) in cells:
+                if abs(start[0]-x) + abs(start[1]-z) + abs(goal[0]-x) + abs(goal[1]-z) < steps:
+                    doomed.append((start, goal))
+                    break
+        for key in doomed:
+            self._remove(key)
+        self.invalidated += len(doomed)
+        return len(doomed)
+
+    """ Remove os caminhos que passam por alguma das células; retorna quantos """
+    def invalidate_cells(self, cells):
+        doomed = set()
+        for cell in cells:
+            doomed.update(self._through.get(cell, ()))
+        for key in doomed:
+            self._remove(key)
+        self.invalidated += len(doomed)
+        return len(doomed)
+
+""" Distância Manhattan de cell até o retângulo [x0,x1] x [z0,z1] """
+def _to_box(cell, x0, z0, x1, z1):
+    x, z = cell
+    return max(x0 - x, 0, x - x1) + max(z0 - z, 0, z - z1)
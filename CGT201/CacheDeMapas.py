@@ -0,0 +1,60 @@
+# ************************************************
+#   CacheDeMapas.py
+#   Cache em disco (.npz) dos mapas gerados com semente:
+#   celulas, objetos fixos e alturas das janelas.
+#   A chave e (gerador, MAP_SIZE, WALL_PROB, NUM_CORRIDORS,
+#   CORRIDOR_WIDEN_RADIUS, MIN_FIXED_OBJECTS, seed).
+# ************************************************
+
+import os
+import hashlib
+import zipfile
+
+import numpy as np
+
+from GradeLabirinto import GradeLabirinto
+from ObjetosFixos import ObjetosFixos
+
+CACHE_VERSION = 1
+
+def cache_key(generator, size, wall_prob, n_corridors, widen_radius, min_fixed, seed):
+    return f"v{CACHE_VERSION}|{generator}|{size}|{wall_prob!r}|{n_corridors}|{widen_radius}|{min_fixed}|{seed}"
+
+def cache_path(key, cache_dir):
+    digest = hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+    return os.path.join(cache_dir, f"mapa_{digest}.npz")
+
+""" Resumo do plano caminhável (nome de arquivo dos índices derivados dele) """
+def walkable_digest(walkable):
+    h = hashlib.sha1()
+    h.update(np.asarray(walkable.shape, dtype=np.int64).tobytes())
+    h.update(np.packbits(walkable).tobytes())
+    return h.hexdigest()[:16]
+
+def save_map_cache(path, key, grid, fixed_objects, mapa_janelas):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    fixed = fixed_objects.as_array()
+    win_cells = np.array(list(mapa_janelas.keys()), dtype=np.int32).reshape(-1, 2)
+    win_heights = np.array(list(mapa_janelas.values()), dtype=np.float32)
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        np.savez_compressed(f, key=np.array(key), cells=grid.cells, fixed=fixed,
+                            win_cells=win_cells, win_heights=win_heights)
+    os.replace(tmp, path)
+
+""" Retorna (grid, fixed_objects, mapa_janelas) ou None se não houver cache válido """
+def load_map_cache(path, key):
+    if not os.path.exists(path):
+        return None
+    try:
+        with np.load(path) as data:
+            if str(data['key']) != key:
+                return None
+            grid = GradeLabirinto(cells=data['cells'])
+            fixed_objects = ObjetosFixos.from_array(data['fixed'])
+            mapa_janelas = {(int(z), int(x)): float(h)
+                            for (z, x), h in zip(data['win_cells'].tolist(), data['win_heights'].tolist())}
+    except (OSError, ValueError, KeyError, zipfile.BadZipFile) as exc:
+        print(f"Cache de mapa ignorado ({path}): {exc}")
+        return None
+    return grid, fixed_objects, mapa_janelas
@@ -0,0 +1,98 @@
+# ************************************************
+#   CampoDeFluxo.py
+#   Define a classe CampoDeFluxo: distancia (BFS, 4-vizinhanca)
+#   de cada celula caminhavel ate a celula do jogador.
+#   Calculado uma vez por mudanca de celula do jogador e
+#   compartilhado por todos os inimigos: cada inimigo so desce
+#   o gradiente (vai para o vizinho com distancia menor).
+#   Distancia -1 = celula nao alcancada.
+#   A BFS e a vetorizada de FrenteDeOnda.
+# ************************************************
+
+import numpy as np
+
+from FrenteDeOnda import wavefront_distances
+
+# mesma ordem de next_step: +x, -x, +z, -z
+STEP_X = np.array([1, -1, 0, 0])
+STEP_Z = np.array([0, 0, 1, -1])
+
+""" Classe CampoDeFluxo """
+class CampoDeFluxo:
+    def __init__(self):
+        self.goal = None
+        self.width = 0
+        self.height = 0
+        # distâncias como grade (z,x) com borda -1: o vizinho de uma célula da
+        # beirada cai na borda (sem teste de limite nas consultas vetorizadas).
+        # Reaproveitada entre builds; só é alocada de novo se o mapa mudar de tamanho.
+        self.padded = np.full((2, 2), -1, dtype=np.int32)
+        self.version = 0
+        self.dirty = True
+        self.builds = 0
+
+    """ Marca o campo para ser recalculado (mapa alterado, inimigo fora do alcance) """
+    def invalidate(self):
+        self.dirty = True
+
+    def needs_update(self, goal):
+        return self.dirty or goal != self.goal
+
+    """ BFS a partir de goal sobre o plano walkable (array bool z,x).
+        Se 'targets' for dado, para assim que todas essas células forem alcançadas. """
+    def build(self, walkable, goal, targets=None):
+        height, width = walkable.shape
+        self.width = width
+        self.height = height
+        self.goal = goal
+        self.dirty = False
+        self.version += 1
+        self.builds += 1
+        if self.padded.shape != (height+2, width+2):
+            self.padded = np.full((height+2, width+2), -1, dtype=np.int32)
+        self.padded[1:-1, 1:-1] = wavefront_distances(walkable, [goal], targets=targets)
+
+    def dist_at(self, x, z):
+        if not (0 <= x < self.width and 0 <= z < self.height):
+            return -1
+        return int(self.padded[z+1, x+1])
+
+    """ Vizinho com a menor distância conhecida, desde que seja menor que a da célula;
+        None se a célula já é o alvo ou se não há gradiente a seguir """
+    def next_step(self, cell):
+        x, z = cell
+        here = self.dist_at(x, z)
+        if here == 0:
+            return None
+        best = None
+        best_d = here if here >= 0 else None
+        for nb in ((x+1, z), (x-1, z), (x, z+1), (x, z-1)):
+            d = self.dist_at(nb[0], nb[1])
+            if d < 0:
+                continue
+            if best_d is None or d < best_d:
+                best = nb
+                best_d = d
+        return best
+
+    """ next_step para várias células de uma vez (vetores xs, zs): devolve
+        (nx, nz) com a própria célula onde a distância é 0 e -1 onde não há
+        gradiente a seguir """
+    def next_steps(self, xs, zs):
+        pad = self.padded
+        px = xs + 1
+        pz = zs + 1
+        here = pad[pz, px]
+        d = pad[pz[:, None] + STEP_Z, px[:, None] + STEP_X]
+        far = np.iinfo(np.int32).max
+        d = np.where(d < 0, far, d)
+        # no empate fica o primeiro, como em next_step
+        k = np.argmin(d, axis=1)
+        best = d[np.arange(len(k)), k]
+        ok = (best < far) & ((here < 0) | (best < here))
+        nx = np.where(ok, xs + STEP_X[k], -1)
+        nz = np.where(ok, zs + STEP_Z[k], -1)
+        goal = here == 0
+        nx[goal] = xs[goal]
+        nz[goal] = zs[goal]
+        return nx, nz
@@ -0,0 +1,138 @@
+# ************************************************
+#   Componentes.py
+#   Define a classe ComponentesConexos: rotulo de componente
+#   conexa (4-vizinhanca) de cada celula caminhavel.
+#   Duas celulas com rotulos diferentes nao tem caminho entre si,
+#   entao o A* pode responder "sem caminho" em O(1).
+#   Rotulo 0 = celula nao caminhavel.
+#   Os rotulos so sao calculados na primeira consulta (o union-find
+#   leva segundos em mapas enormes e nao deve atrasar a carga).
+# ************************************************
+
+import random
+
+import numpy as np
+
+""" Union-find vetorizado: liga raízes pelo menor id e comprime por saltos de ponteiro.
+    edges: arestas (u, w) em ids planos já prontas (AdjacenciaCSR.edges) """
+def label_components(walkable, edges=None):
+    height, width = walkable.shape
+    n = height * width
+    idt = np.int32 if n < 2**31 - 1 else np.int64
+    parent = np.arange(n, dtype=idt)
+    if edges is None:
+        ids = np.arange(n, dtype=idt).reshape(height, width)
+        h = walkable[:, :-1] & walkable[:, 1:]
+        v = walkable[:-1, :] & walkable[1:, :]
+        u = np.concatenate([ids[:, :-1][h], ids[:-1, :][v]])
+        w = np.concatenate([ids[:, 1:][h], ids[1:, :][v]])
+    else:
+        u = edges[0].astype(idt)
+        w = edges[1].astype(idt)
+    while len(u):
+        pu = parent[u]
+        pw = parent[w]
+        diff = pu != pw
+        if not diff.any():
+            break
+        u = u[diff]
+        w = w[diff]
+        lo = np.minimum(pu[diff], pw[diff])
+        hi = np.maximum(pu[diff], pw[diff])
+        np.minimum.at(parent, hi, lo)
+        while True:
+            grand = parent[parent]
+            if np.array_equal(grand, parent):
+                break
+            parent = grand
+    labels = np.where(walkable.ravel(), parent + 1, 0).astype(idt)
+    return labels.reshape(height, width)
+
+""" Classe ComponentesConexos """
+class ComponentesConexos:
+    def __init__(self, walkable, edges=None):
+        # plano caminhável vivo (o mapa muda no lugar): rotulado quando pedido
+        self.walkable = walkable
+        self._edges = edges
+        self._labels = None
+
+    @property
+    def labels(self):
+        if self._labels is None:
+            self._labels = label_components(self.walkable, self._edges)
+            self._edges = None
+        return self._labels
+
+    def label_at(self, x, z):
+        if x < 0 or z < 0 or z >= self.labels.shape[0] or x >= self.labels.shape[1]:
+            return 0
+        return int(self.labels[z, x])
+
+    """ False quando b não é caminhável (nunca é alcançado) ou quando as duas
+        células estão em componentes diferentes. Início fora da grade (rótulo 0,
+        ex.: jogador numa porta) não decide nada: True. """
+    def maybe_connected(self, a, b):
+        lb = self.label_at(b[0], b[1])
+        if lb == 0:
+            return False
+        la = self.label_at(a[0], a[1])
+        return la == 0 or la == lb
+
+    def size_of(self, label):
+        return int(np.count_nonzero(self.labels == label))
+
+    """ Rótulos (não nulos) das células a até r células de (x,z) """
+    def labels_near(self, x, z, r):
+        height, width = self.labels.shape
+        win = self.labels[max(0, z-r):min(height, z+r+1), max(0, x-r):min(width, x+r+1)]
+        return [int(l) for l in np.unique(win) if l != 0]
+
+    def count(self):
+        return len(np.unique(self.labels[self.labels > 0]))
+
+    """ Sorteia até k células distintas da componente 'label' que não estejam em 'exclude'
+        (e, se 'allowed' for dado, em que o plano bool allowed é True) """
+    def sample_in(self, label, k, exclude=(), rng=random, allowed=None):
+        width = self.labels.shape[1]
+        mask = self.labels.ravel() == label
+        if allowed is not None:
+            mask &= allowed.ravel()
+        ids = np.flatnonzero(mask)
+        m = min(len(ids), k + len(exclude))
+        out = []
+        for i in rng.sample(range(len(ids)), m):
+            cid = int(ids[i])
+            c = (cid % width, cid // width)
+            if c not in exclude:
+                out.append(c)
+        return out[:k]
+
+    """ Atualiza os rótulos depois que células mudaram; retorna False se
+        alguma célula deixou de ser caminhável (aí é preciso rotular de novo) """
+    def update(self, cells, walkable):
+        if self._labels is None:
+            # ainda não rotulado: a primeira consulta já vê o plano novo
+            self._edges = None
+            return True
+        labels = self._labels
+        height, width = labels.shape
+        for (x, z) in cells:
+            if not walkable[z, x]:
+                if labels[z, x] != 0:
+                    return False
+                continue
+            if labels[z, x] != 0:
+                continue
+            around = set()
+            for (nx, nz) in ((x+1, z), (x-1, z), (x, z+1), (x, z-1)):
+                if 0 <= nx < width and 0 <= nz < height and labels[nz, nx] != 0:
+                    around.add(int(labels[nz, nx]))
+            if not around:
+                labels[z, x] = z*width + x + 1
+                continue
+            keep = min(around)
+            labels[z, x] = keep
+            for other in around:
+                if other != keep:
+                    labels[labels == other] = keep
+        return True
@@ -0,0 +1,240 @@
+# ************************************************
+#   DStarLite.py
+#   Define a classe DStarLite: planejador incremental (D* Lite /
+#   LPA*, versao "moving target") para um perseguidor.
+#
+#   A busca e para a frente: raiz = celula do inimigo, alvo =
+#   celula do jogador. Os valores g (distancia a raiz) ficam
+#   guardados entre chamadas:
+#     - o jogador andou: so o alvo da heuristica muda; o deslocamento
+#       km (D* Lite) mantem as chaves da fila como limites inferiores,
+#       e a busca continua de onde parou;
+#     - o inimigo andou: enquanto a celula dele estiver num caminho
+#       minimo da raiz ate o alvo, o caminho e so o sufixo a partir
+#       dela; senao a raiz passa para a celula nova: as celulas cujo
+#       caminho minimo passa por ela continuam valendo (g - g(nova raiz)),
+#       o resto e descartado e refeito a partir da borda (MT-D* Lite basico);
+#     - paredes mudaram: so as celulas alteradas e os vizinhos sao
+#       reavaliados.
+#
+#   O plano caminhavel e compartilhado por todos os planejadores
+#   (PlanoCaminhavel: bytearray com borda bloqueada).
+# ************************************************
+
+import heapq
+
+import numpy as np
+
+INF = float('inf')
+
+""" Classe PlanoCaminhavel """
+class PlanoCaminhavel:
+    def __init__(self, walkable):
+        height, width = walkable.shape
+        self.width = width
+        self.height = height
+        self.stride = width + 2
+        pad = np.zeros((height+2, width+2), dtype=np.uint8)
+        pad[1:-1, 1:-1] = walkable
+        self.free = bytearray(pad.tobytes())
+
+    def update(self, cells, walkable):
+        for (x, z) in cells:
+            self.free[(z+1)*self.stride + x+1] = 1 if walkable[z, x] else 0
+
+    def id_of(self, cell):
+        return (cell[1]+1)*self.stride + cell[0]+1
+
+    def cell_of(self, i):
+        return (i % self.stride - 1, i // self.stride - 1)
+
+""" Classe DStarLite """
+class DStarLite:
+    def __init__(self, plane):
+        self.plane = plane
+        self.root = None
+        self.target = None
+        self.g = {}
+        self.rhs = {}
+        self._open = []
+        self._open_key = {}
+        self.km = 0
+        self._pending = []
+        self._last = set()
+        # contadores
+        self.expanded = 0
+        self.total_expanded = 0
+        self.resets = 0
+        self.reroots = 0
+
+    """ Avisa que células mudaram no plano (aplicado na próxima chamada a plan) """
+    def notify(self, cells):
+        self._pending.extend(cells)
+
+    def _h(self, u):
+        w = self.plane.stride
+        return abs(u % w - self._tx) + abs(u // w - self._tz)
+
+    def _key(self, u):
+        m = min(self.g.get(u, INF), self.rhs.get(u, INF))
+        return (m + self._h(u) + self.km, m)
+
+    def _push(self, u):
+        k = self._key(u)
+        self._open_key[u] = k
+        heapq.heappush(self._open, (k, u))
+
+    def _update(self, u):
+        g = self.g
+        if u != self.root:
+            best = INF
+            if self.plane.free[u]:
+                w = self.plane.stride
+                for v in (u+1, u-1, u+w, u-w):
+                    gv = g.get(v, INF) + 1
+                    if gv < best:
+                        best = gv
+            self.rhs[u] = best
+        if g.get(u, INF) != self.rhs.get(u, INF):
+            self._push(u)
+        else:
+            self._open_key.pop(u, None)
+
+    def _compute(self):
+        g = self.g
+        rhs = self.rhs
+        open_set = self._open
+        open_key = self._open_key
+        t = self.target
+        w = self.plane.stride
+        expanded = 0
+        while open_set:
+            k, u = open_set[0]
+            if open_key.get(u) != k:
+                heapq.heappop(open_set)
+                continue
+            if k >= self._key(t) and rhs.get(t, INF) == g.get(t, INF):
+                break
+            heapq.heappop(open_set)
+            expanded += 1
+            k_new = self._key(u)
+            if k < k_new:
+                open_key[u] = k_new
+                heapq.heappush(open_set, (k_new, u))
+                continue
+            del open_key[u]
+            if g.get(u, INF) > rhs.get(u, INF):
+                g[u] = rhs[u]
+            else:
+                g[u] = INF
+                self._update(u)
+            for v in (u+1, u-1, u+w, u-w):
+                self._update(v)
+        self.expanded = expanded
+        self.total_expanded += expanded
+
+    def _reset(self, root):
+        self.g = {}
+        self.rhs = {root: 0}
+        self._open = []
+        self._open_key = {}
+        self.km = 0
+        self.root = root
+        self._push(root)
+        self.resets += 1
+
+    """ Troca a raiz por 'root' (que tem g finito), reaproveitando as
+        células cujo caminho mínimo passa por ela """
+    def _reroot(self, root):
+        g = self.g
+        rhs = self.rhs
+        w = self.plane.stride
+        base = g[root]
+        kept = {root}
+        stack = [root]
+        while stack:
+            u = stack.pop()
+            gu = g[u] + 1
+            for v in (u+1, u-1, u+w, u-w):
+                if v not in kept and g.get(v, INF) == gu and rhs.get(v, INF) == gu:
+                    kept.add(v)
+                    stack.append(v)
+        self.g = {u: g[u] - base for u in kept}
+        self.rhs = {u: g[u] - base for u in kept}
+        self.root = root
+        self.km = 0
+        self._open = []
+        self._open_key = {}
+        for u in kept:
+            for v in (u+1, u-1, u+w, u-w):
+                if v not in kept and v not in self._open_key:
+                    self._update(v)
+        self.reroots += 1
+
+    """ Caminho da raiz até t seguindo g decrescente (empates: células do caminho anterior) """
+    def _extract(self, t):
+        g = self.g
+        w = self.plane.stride
+        last = self._last
+        path = [t]
+        u = t
+        while u != self.root:
+            best = None
+            best_g = g[u]
+            for v in (u+1, u-1, u+w, u-w):
+                gv = g.get(v, INF)
+                if gv < best_g or (gv == best_g and best is not None and v in last and best not in last):
+                    best = v
+                    best_g = gv
+            if best is None:
+                return None
+            u = best
+            path.append(u)
+        path.reverse()
+        return path
+
+    """ Caminho (lista de células) de start até goal, ou None """
+    def plan(self, start, goal):
+        plane = self.plane
+        s = plane.id_of(start)
+        t = plane.id_of(goal)
+        self._tx = t % plane.stride
+        self._tz = t // plane.stride
+        if self.target is not None and t != self.target:
+            w = plane.stride
+            self.km += abs(t % w - self.target % w) + abs(t // w - self.target // w)
+        self.target = t
+        pending = self._pending
+        self._pending = []
+        if self.root is None or self.g.get(s, INF) == INF or self.g.get(s) != self.rhs.get(s):
+            self._reset(s)
+        else:
+            w = plane.stride
+            for cell in pending:
+                u = plane.id_of(cell)
+                for v in (u, u+1, u-1, u+w, u-w):
+                    self._update(v)
+        self._compute()
+        if self.g.get(t, INF) == INF:
+            return None
+        path = self._extract(t)
+        # o inimigo anda pelo caminho: se ainda está num caminho mínimo
+        # até o alvo, basta o sufixo; senão troca a raiz e repara
+        if path is not None and s != self.root:
+            try:
+                path = path[path.index(s):]
+            except ValueError:
+                path = None
+        if path is None:
+            if self.g.get(s, INF) == INF or self.g.get(s) != self.rhs.get(s):
+                self._reset(s)
+            else:
+                self._reroot(s)
+            self._compute()
+            if self.g.get(t, INF) == INF:
+                return None
+            path = self._extract(t)
+            if path is None:
+                return None
+        self._last = set(path)
+        return [plane.cell_of(u) for u in path]
@@ -0,0 +1,173 @@
+# ************************************************
+#   FormatoLabirinto.py
+#   Leitura e escrita de labirintos em arquivo.
+#
+#   Formato binario (.lab), little-endian:
+#
+#     cabecalho (32 bytes)
+#       magic      8s   b'T2CGLAB\0'
+#       version    u16  1
+#       flags      u16  0
+#       width      u32  QtdX
+#       height     u32  QtdZ
+#       n_windows  u32  linhas da tabela de janelas
+#       n_fixed    u32  linhas da tabela de objetos fixos
+#       reserved   u32  0
+#     celulas       width*height bytes (uint8, linha a linha: z, depois x),
+#                   mesmos codigos de GradeLabirinto (CELL_*)
+#     padding       ate o proximo multiplo de 4
+#     janelas       n_windows x (x u32, z u32, altura f32)
+#     objetos fixos n_fixed   x (x u32, z u32, tipo u8, 3 bytes de padding)
+#                   tipo = indice em ObjetosFixos.FIXED_TYPES
+#
+#   O plano de celulas e aberto com np.memmap em modo copy-on-write:
+#   o arquivo nao e lido inteiro nem alterado pelo jogo.
+#
+#   Formato texto: uma linha por fileira z; cada celula e um caractere
+#   0, 1, 2, P, F, J ou D (espacos, tabs e virgulas sao ignorados).
+#   O leitor de texto le fileira por fileira direto para o array uint8.
+#
+#   Uso: python FormatoLabirinto.py converte entrada.txt saida.lab
+# ************************************************
+
+import os
+import sys
+import struct
+
+import numpy as np
+
+from GradeLabirinto import (GradeLabirinto, CELL_EMPTY, CELL_WALL_H, CELL_WALL_V,
+                            CELL_PLAYER, CELL_FIXED, CELL_WINDOW, CELL_DOOR)
+from ObjetosFixos import ObjetosFixos
+
+MAGIC = b'T2CGLAB\0'
+VERSION = 1
+HEADER = struct.Struct('<8sHHIIIII')
+
+WINDOW_DTYPE = np.dtype([('x', '<u4'), ('z', '<u4'), ('h', '<f4')])
+FIXED_DTYPE = np.dtype([('x', '<u4'), ('z', '<u4'), ('t', 'u1'), ('pad', 'u1', 3)])
+
+TEXT_CHARS = {
+    CELL_EMPTY: b'0', CELL_WALL_H: b'1', CELL_WALL_V: b'2', CELL_PLAYER: b'P',
+    CELL_FIXED: b'F', CELL_WINDOW: b'J', CELL_DOOR: b'D',
+}
+INVALID = 255
+# tabela byte -> código para bytes.translate
+_TEXT_TABLE = bytearray([INVALID]) * 256
+for _code, _ch in TEXT_CHARS.items():
+    _TEXT_TABLE[_ch[0]] = _code
+_TEXT_TABLE = bytes(_TEXT_TABLE)
+_TEXT_SEPARATORS = b' \t,\r\n'
+
+def _align4(n):
+    return (n + 3) & ~3
+
+def is_binary_maze(path):
+    with open(path, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+# -------------------- binário
+def save_maze_binary(path, grid, fixed_objects=None, mapa_janelas=None):
+    cells = np.ascontiguousarray(grid.cells, dtype=np.uint8)
+    height, width = cells.shape
+    windows = np.zeros(len(mapa_janelas or {}), dtype=WINDOW_DTYPE)
+    for i, ((z, x), h) in enumerate((mapa_janelas or {}).items()):
+        windows[i] = (x, z, h)
+    fixed = np.zeros(len(fixed_objects) if fixed_objects is not None else 0, dtype=FIXED_DTYPE)
+    if len(fixed):
+        arr = fixed_objects.as_array()
+        fixed['x'] = arr[:, 0]
+        fixed['z'] = arr[:, 1]
+        fixed['t'] = arr[:, 2]
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, 0, width, height, len(windows), len(fixed), 0))
+        f.write(cells.tobytes())
+        f.write(b'\0' * (_align4(width*height) - width*height))
+        f.write(windows.tobytes())
+        f.write(fixed.tobytes())
+    os.replace(tmp, path)
+
+""" Abre um .lab; retorna (grid, fixed_objects, mapa_janelas) com as células em memmap """
+def open_maze_binary(path, writable=False):
+    with open(path, 'rb') as f:
+        head = f.read(HEADER.size)
+    if len(head) < HEADER.size:
+        raise ValueError(f"{path}: arquivo curto demais para um labirinto")
+    magic, version, flags, width, height, n_windows, n_fixed, _ = HEADER.unpack(head)
+    if magic != MAGIC:
+        raise ValueError(f"{path}: não é um labirinto binário")
+    if version != VERSION:
+        raise ValueError(f"{path}: versão {version} não suportada")
+    n_cells = width * height
+    expected = HEADER.size + _align4(n_cells) + n_windows*WINDOW_DTYPE.itemsize + n_fixed*FIXED_DTYPE.itemsize
+    if os.path.getsize(path) < expected:
+        raise ValueError(f"{path}: arquivo truncado")
+    cells = np.memmap(path, dtype=np.uint8, mode='r+' if writable else 'c',
+                      offset=HEADER.size, shape=(height, width))
+    side = HEADER.size + _align4(n_cells)
+    windows = np.fromfile(path, dtype=WINDOW_DTYPE, count=n_windows, offset=side)
+    fixed = np.fromfile(path, dtype=FIXED_DTYPE, count=n_fixed,
+                        offset=side + n_windows*WINDOW_DTYPE.itemsize)
+    grid = GradeLabirinto(cells=cells)
+    fixed_objects = ObjetosFixos.from_array(np.stack([fixed['x'], fixed['z'], fixed['t']], axis=1))
+    mapa_janelas = {(int(z), int(x)): float(h) for (x, z, h) in windows.tolist()}
+    return grid, fixed_objects, mapa_janelas
+
+# -------------------- texto
+def _parse_text_row(line, lineno):
+    row = line.translate(_TEXT_TABLE, _TEXT_SEPARATORS)
+    if INVALID in row:
+        bad = line.translate(None, _TEXT_SEPARATORS)[row.index(INVALID)]
+        raise ValueError(f"linha {lineno}: caractere de célula inválido {chr(bad)!r}")
+    return row
+
+""" Lê o formato texto fileira por fileira, sem criar objetos Python por célula """
+def load_maze_text(path):
+    with open(path, 'rb') as f:
+        # 1a passada: só conta as fileiras
+        height = 0
+        width = None
+        for line in f:
+            if not line.strip(_TEXT_SEPARATORS):
+                continue
+            if width is None:
+                width = len(line.translate(None, _TEXT_SEPARATORS))
+            height += 1
+        if width is None:
+            raise ValueError(f"{path}: labirinto vazio")
+        cells = np.empty((height, width), dtype=np.uint8)
+        f.seek(0)
+        z = 0
+        for lineno, line in enumerate(f, 1):
+            row = _parse_text_row(line, lineno)
+            if not row:
+                continue
+            if len(row) != width:
+                raise ValueError(f"{path}: linha {lineno} tem {len(row)} células, esperado {width}")
+            cells[z] = np.frombuffer(row, dtype=np.uint8)
+            z += 1
+    return GradeLabirinto(cells=cells)
+
+def save_maze_text(path, grid):
+    table = bytearray(256)
+    for code, ch in TEXT_CHARS.items():
+        table[code] = ch[0]
+    table = bytes(table)
+    with open(path, 'wb') as f:
+        for row in grid.cells:
+            f.write(row.tobytes().translate(table))
+            f.write(b'\n')
+
+def load_maze(path):
+    if is_binary_maze(path):
+        return open_maze_binary(path)
+    return load_maze_text(path), None, None
+
+if __name__ == '__main__':
+    if len(sys.argv) != 4 or sys.argv[1] != 'converte':
+        print("uso: python FormatoLabirinto.py converte entrada.txt saida.lab")
+        sys.exit(1)
+    grid = load_maze_text(sys.argv[2])
+    save_maze_binary(sys.argv[3], grid)
+    print(f"{sys.argv[3]}: {grid.width}x{grid.height}")
@@ -0,0 +1,62 @@
+# ************************************************
+#   FrenteDeOnda.py
+#   BFS vetorizada (NumPy) sobre o plano caminhavel: distancia
+#   em passos (4-vizinhanca) de cada celula ate a fonte mais
+#   proxima, como grade int32 (-1 = inalcancavel).
+#
+#   A frente de onda e um vetor de ids planos num plano com borda
+#   bloqueada; cada nivel desloca a frente pelos 4 offsets
+#   (+1, -1, +stride, -stride), filtra celulas livres ainda nao
+#   visitadas e tira repetidas sem ordenar. O custo por nivel e
+#   proporcional ao tamanho da frente (e nao ao mapa inteiro), entao
+#   labirintos com caminhos longos nao pagam O(mapa) a cada passo.
+# ************************************************
+
+import numpy as np
+
+""" Distâncias (grade int32 height x width) de cada célula até a fonte mais próxima.
+    sources: células (x,z); fontes não caminháveis são ignoradas.
+    max_dist: para depois desse nível (o resto fica -1).
+    targets: para assim que todas essas células (x,z) forem alcançadas. """
+def wavefront_distances(walkable, sources, max_dist=None, targets=None):
+    height, width = walkable.shape
+    stride = width + 2
+    free = np.zeros((height+2, stride), dtype=bool)
+    free[1:-1, 1:-1] = walkable
+    free = free.ravel()
+    dist = np.full(free.shape, -1, dtype=np.int32)
+    frontier = _ids(sources, width, height, stride)
+    frontier = np.unique(frontier[free[frontier]])
+    dist[frontier] = 0
+    pending = None
+    if targets is not None:
+        pending = _ids(targets, width, height, stride)
+        pending = pending[free[pending]]
+    # owner[c] = posição de c no candidato do nível (para tirar repetidas)
+    owner = np.empty(free.shape, dtype=np.int64)
+    offsets = (1, -1, stride, -stride)
+    level = 0
+    while len(frontier):
+        if max_dist is not None and level >= max_dist:
+            break
+        if pending is not None:
+            pending = pending[dist[pending] < 0]
+            if len(pending) == 0:
+                break
+        level += 1
+        nb = np.concatenate([frontier + off for off in offsets])
+        nb = nb[free[nb] & (dist[nb] < 0)]
+        if len(nb) == 0:
+            break
+        pos = np.arange(len(nb))
+        owner[nb] = pos
+        nb = nb[owner[nb] == pos]
+        dist[nb] = level
+        frontier = nb
+    return dist.reshape(height+2, stride)[1:-1, 1:-1].copy()
+
+def _ids(cells, width, height, stride):
+    cells = np.asarray(list(cells), dtype=np.int64).reshape(-1, 2)
+    inside = (cells[:, 0] >= 0) & (cells[:, 0] < width) & (cells[:, 1] >= 0) & (cells[:, 1] < height)
+    cells = cells[inside]
+    return (cells[:, 1] + 1) * stride + cells[:, 0] + 1
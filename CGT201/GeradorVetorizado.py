@@ -0,0 +1,101 @@
+# ************************************************
+#   GeradorVetorizado.py
+#   Versao NumPy de generate_sparse_map_with_corridors:
+#   mesmo tipo de labirinto, mas com operacoes sobre o
+#   array inteiro em vez de lacos Python por celula.
+# ************************************************
+
+import numpy as np
+
+from GradeLabirinto import GradeLabirinto, CELL_EMPTY, CELL_WALL_H, CELL_WALL_V, CELL_PLAYER
+
+def generate_sparse_map_vectorized(size, wall_prob, n_corridors, seed=None):
+    rng = np.random.default_rng(seed)
+    mat = np.full((size, size), CELL_WALL_H, dtype=np.uint8)
+    inner = mat[1:size-1, 1:size-1]
+
+    # campo aleatório de paredes internas
+    shape = inner.shape
+    walls = (rng.random(shape) < wall_prob) & (rng.random(shape) < 0.9)
+    inner[...] = np.where(walls, CELL_WALL_H, CELL_EMPTY)
+
+    # bordas coerentes (meio-fio)
+    mat[0, :] = CELL_WALL_H
+    mat[size-1, :] = CELL_WALL_H
+    mat[:, 0] = CELL_WALL_V
+    mat[:, size-1] = CELL_WALL_V
+
+    player = _find_player_cell(mat, size)
+
+    free_z, free_x = np.nonzero(inner == CELL_EMPTY)
+    if len(free_x) < 2:
+        inner[rng.random(shape) < 0.02] = CELL_EMPTY
+        free_z, free_x = np.nonzero(inner == CELL_EMPTY)
+    free_x = free_x + 1
+    free_z = free_z + 1
+
+    if len(free_x) > 0 and n_corridors > 0:
+        a = rng.integers(0, len(free_x), n_corridors)
+        b = rng.integers(0, len(free_x), n_corridors)
+        keep = a != b
+        carved = rasterize_corridors(free_x[a[keep]], free_z[a[keep]],
+                                     free_x[b[keep]], free_z[b[keep]], mat.shape, rng)
+        mat[carved] = CELL_EMPTY
+
+    if player is not None:
+        mat[player[1], player[0]] = CELL_PLAYER
+    else:
+        mat[size//2, size//2] = CELL_PLAYER
+
+    orient_walls(mat, rng)
+    return GradeLabirinto(cells=mat)
+
+""" Célula livre mais próxima do centro (anéis quadrados, como a busca espiral) """
+def _find_player_cell(mat, size):
+    center = size//2
+    if mat[center, center] == CELL_EMPTY:
+        return (center, center)
+    zs, xs = np.nonzero(mat == CELL_EMPTY)
+    if len(xs) == 0:
+        return None
+    ring = np.maximum(np.abs(xs - center), np.abs(zs - center))
+    ok = ring < size//2
+    if not ok.any():
+        return None
+    best = ring[ok].min()
+    # np.nonzero devolve em ordem de linha, a mesma da busca original
+    i = np.flatnonzero(ok & (ring == best))[0]
+    return (int(xs[i]), int(zs[i]))
+
+""" Caminha todos os corredores ao mesmo tempo, um passo por iteração """
+def rasterize_corridors(x, z, tx, tz, shape, rng):
+    carved = np.zeros(shape, dtype=bool)
+    x = x.astype(np.int64)
+    z = z.astype(np.int64)
+    carved[z, x] = True
+    while True:
+        dx = tx - x
+        dz = tz - z
+        act = (dx != 0) | (dz != 0)
+        if not act.any():
+            break
+        both = (dx != 0) & (dz != 0)
+        prefer_x = rng.random(len(x)) < 0.6
+        step_x = (dx != 0) & (~both | prefer_x)
+        step_z = act & ~step_x
+        x += np.sign(dx) * step_x
+        z += np.sign(dz) * step_z
+        carved[z[act], x[act]] = True
+    return carved
+
+""" Orienta as paredes internas olhando os vizinhos por arrays deslocados """
+def orient_walls(mat, rng):
+    free = mat == CELL_EMPTY
+    inner = mat[1:-1, 1:-1]
+    vert_open = free[:-2, 1:-1] | free[2:, 1:-1]
+    horiz_open = free[1:-1, :-2] | free[1:-1, 2:]
+    wall = (inner != CELL_EMPTY) & (inner != CELL_PLAYER)
+    coin = np.where(rng.random(inner.shape) < 0.5, CELL_WALL_H, CELL_WALL_V).astype(np.uint8)
+    oriented = np.where(horiz_open & ~vert_open, CELL_WALL_V,
+                        np.where(vert_open & ~horiz_open, CELL_WALL_H, coin)).astype(np.uint8)
+    inner[wall] = oriented[wall]
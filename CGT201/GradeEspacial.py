@@ -0,0 +1,148 @@
+# ************************************************
+#   GradeEspacial.py
+#   Define a classe GradeEspacial: hash espacial de grade uniforme
+#   (um balde por celula de tamanho cell_size) para entidades que
+#   se movem, identificadas por um inteiro (indice na lista).
+#
+#   move() so mexe nos baldes quando a entidade troca de celula;
+#   sync() faz o mesmo para todos de uma vez a partir dos vetores
+#   de posicao (so quem trocou de celula passa pelo dicionario).
+#   near() visita apenas os baldes que encostam no circulo pedido.
+#
+#   close_pairs acha os pares a menos de um raio comparando cada
+#   balde com ele mesmo e com 4 vizinhos (meia vizinhanca: cada par
+#   aparece uma vez), todo em NumPy a partir das posicoes.
+# ************************************************
+
+from math import floor
+
+import numpy as np
+
+""" Classe GradeEspacial """
+class GradeEspacial:
+    def __init__(self, width, height, cell_size=1.0):
+        self.cell_size = cell_size
+        self.cols = int(width / cell_size) + 2
+        # chave do balde -> ids nele
+        self.buckets = {}
+        # id -> chave do balde
+        self.key_of = {}
+        # chaves do último sync (ids 0..n-1)
+        self._keys = None
+
+    def __len__(self):
+        return len(self.key_of)
+
+    def clear(self):
+        self.buckets.clear()
+        self.key_of.clear()
+        self._keys = None
+
+    def _key(self, x, z):
+        cs = self.cell_size
+        return int(floor(x / cs)) + int(floor(z / cs)) * self.cols
+
+    def _place(self, i, key):
+        old = self.key_of.get(i)
+        if old == key:
+            return
+        if old is not None:
+            bucket = self.buckets[old]
+            bucket.remove(i)
+            if not bucket:
+                del self.buckets[old]
+        self.key_of[i] = key
+        self.buckets.setdefault(key, []).append(i)
+
+    """ Põe (ou atualiza) a entidade i na posição (x, z) """
+    def move(self, i, x, z):
+        key = self._key(x, z)
+        self._place(i, key)
+        if self._keys is not None and i < len(self._keys):
+            self._keys[i] = key
+
+    def remove(self, i):
+        key = self.key_of.pop(i, None)
+        if key is None:
+            return
+        bucket = self.buckets[key]
+        bucket.remove(i)
+        if not bucket:
+            del self.buckets[key]
+
+    """ Atualiza os ids 0..n-1 a partir dos vetores de posição xs, zs """
+    def sync(self, xs, zs):
+        cs = self.cell_size
+        keys = np.floor(xs / cs).astype(np.int64) + np.floor(zs / cs).astype(np.int64) * self.cols
+        if self._keys is None or len(self._keys) != len(keys):
+            self.clear()
+            changed = range(len(keys))
+        else:
+            changed = np.flatnonzero(keys != self._keys).tolist()
+        for i in changed:
+            self._place(i, int(keys[i]))
+        self._keys = keys
+
+    """ Ids nos baldes que encostam no círculo de raio 'radius' em (x, z)
+        (candidatos: quem chama confere a distância) """
+    def near(self, x, z, radius):
+        cs = self.cell_size
+        bx0 = int(floor((x - radius) / cs))
+        bx1 = int(floor((x + radius) / cs))
+        bz0 = int(floor((z - radius) / cs))
+        bz1 = int(floor((z + radius) / cs))
+        out = []
+        buckets = self.buckets
+        for bz in range(bz0, bz1 + 1):
+            for bx in range(bx0, bx1 + 1):
+                bucket = buckets.get(bx + bz * self.cols)
+                if bucket:
+                    out.extend(bucket)
+        return out
+
+# balde vizinho: o mesmo e 4 dos 8 (o par com os outros 4 sai do lado de lá)
+HALF_NEIGHBORS = ((0, 0), (1, 0), (-1, 1), (0, 1), (1, 1))
+
+""" Pares (i, j) de pontos a menos de 'radius' (radius <= cell_size).
+    Devolve i, j, dx = x[j]-x[i], dz = z[j]-z[i] e a distância, como vetores. """
+def close_pairs(xs, zs, radius, cell_size=1.0):
+    n = len(xs)
+    empty = np.zeros(0, dtype=np.int64)
+    if n < 2:
+        return empty, empty, np.zeros(0), np.zeros(0), np.zeros(0)
+    bx = np.floor(xs / cell_size).astype(np.int64)
+    bz = np.floor(zs / cell_size).astype(np.int64)
+    # chaves com uma coluna de folga dos dois lados (vizinho -1/+1 não dá a volta)
+    cols = int(bx.max()) - int(bx.min()) + 3
+    keys = (bx - bx.min() + 1) + (bz - bz.min() + 1) * cols
+    order = np.argsort(keys, kind='stable')
+    sorted_keys = keys[order]
+    # tudo na ordem das chaves: as buscas também saem ordenadas (bem mais rápido)
+    ii = []
+    jj = []
+    for (ox, oz) in HALF_NEIGHBORS:
+        target = sorted_keys + (ox + oz * cols)
+        lo = np.searchsorted(sorted_keys, target, 'left')
+        cnt = np.searchsorted(sorted_keys, target, 'right') - lo
+        total = int(cnt.sum())
+        if total == 0:
+            continue
+        p = np.repeat(np.arange(n), cnt)
+        # posição de cada candidato dentro do seu balde
+        within = np.arange(total) - np.repeat(np.cumsum(cnt) - cnt, cnt)
+        q = np.repeat(lo, cnt) + within
+        if (ox, oz) == (0, 0):
+            keep = p < q
+            p = p[keep]
+            q = q[keep]
+        ii.append(order[p])
+        jj.append(order[q])
+    if not ii:
+        return empty, empty, np.zeros(0), np.zeros(0), np.zeros(0)
+    i = np.concatenate(ii)
+    j = np.concatenate(jj)
+    dx = xs[j] - xs[i]
+    dz = zs[j] - zs[i]
+    dist = np.sqrt(dx*dx + dz*dz)
+    keep = dist < radius
+    return i[keep], j[keep], dx[keep], dz[keep], dist[keep]
@@ -0,0 +1,165 @@
+# ************************************************
+#   GradeLabirinto.py
+#   Define a classe GradeLabirinto: o mapa do labirinto
+#   guardado em um array uint8 (um codigo inteiro por celula)
+#   mais os planos booleanos pre-calculados de navegacao.
+# ************************************************
+
+import numpy as np
+
+# tipos de célula (um código uint8 por tipo)
+CELL_EMPTY = 0
+CELL_WALL_H = 1
+CELL_WALL_V = 2
+CELL_PLAYER = 3
+CELL_FIXED = 4
+CELL_WINDOW = 5
+CELL_DOOR = 6
+
+# códigos usados nas matrizes antigas (listas de listas com strings)
+LEGACY_CODES = {'P': CELL_PLAYER, 'F': CELL_FIXED, 'J': CELL_WINDOW, 'D': CELL_DOOR}
+LEGACY_CHARS = {v: k for k, v in LEGACY_CODES.items()}
+
+# tabelas código -> bool
+# walkable: células que o pathfinding aceita
+# passable: células que não bloqueiam o movimento (colisão)
+WALKABLE_LUT = np.zeros(256, dtype=bool)
+WALKABLE_LUT[[CELL_EMPTY, CELL_PLAYER, CELL_FIXED]] = True
+PASSABLE_LUT = np.zeros(256, dtype=bool)
+PASSABLE_LUT[[CELL_EMPTY, CELL_PLAYER, CELL_DOOR]] = True
+
+def legacy_to_code(v):
+    if isinstance(v, str):
+        return LEGACY_CODES[v]
+    return int(v)
+
+""" Classe GradeLabirinto """
+class GradeLabirinto:
+    def __init__(self, largura=0, altura=0, cells=None):
+        if cells is None:
+            cells = np.zeros((altura, largura), dtype=np.uint8)
+        self.cells = np.ascontiguousarray(cells, dtype=np.uint8)
+        self.refresh()
+
+    @classmethod
+    def from_matrix(cls, mat):
+        if isinstance(mat, GradeLabirinto):
+            return mat
+        if isinstance(mat, np.ndarray):
+            return cls(cells=mat)
+        rows = [[legacy_to_code(v) for v in row] for row in mat]
+        return cls(cells=np.array(rows, dtype=np.uint8))
+
+    def to_matrix(self):
+        return [[LEGACY_CHARS.get(v, v) for v in row] for row in self.cells.tolist()]
+
+    """ Recalcula os planos booleanos a partir das células """
+    def refresh(self):
+        self.walkable = WALKABLE_LUT[self.cells]
+        self.passable = PASSABLE_LUT[self.cells]
+
+    @property
+    def width(self):
+        return self.cells.shape[1]
+
+    @property
+    def height(self):
+        return self.cells.shape[0]
+
+    @property
+    def shape(self):
+        return self.cells.shape
+
+    def __len__(self):
+        return self.cells.shape[0]
+
+    # compatibilidade com o acesso antigo Cidade[z][x] (somente leitura:
+    # escrever na linha deixaria walkable/passable desatualizados; use set)
+    def __getitem__(self, z):
+        row = self.cells[z]
+        row.flags.writeable = False
+        return row
+
+    def in_bounds(self, x, z):
+        return 0 <= x < self.cells.shape[1] and 0 <= z < self.cells.shape[0]
+
+    def get(self, x, z):
+        return int(self.cells[z, x])
+
+    def set(self, x, z, code):
+        self.cells[z, x] = code
+        self.walkable[z, x] = WALKABLE_LUT[code]
+        self.passable[z, x] = PASSABLE_LUT[code]
+
+    def is_walkable(self, x, z):
+        if x < 0 or z < 0 or x >= self.cells.shape[1] or z >= self.cells.shape[0]:
+            return False
+        return bool(self.walkable[z, x])
+
+    def is_passable(self, x, z):
+        if x < 0 or z < 0 or x >= self.cells.shape[1] or z >= self.cells.shape[0]:
+            return False
+        return bool(self.passable[z, x])
+
+    def count(self, code):
+        return int(np.count_nonzero(self.cells == code))
+
+    """ Lista (x,z) das células onde mask é verdadeiro, em ordem de linha """
+    @staticmethod
+    def cells_where(mask):
+        zs, xs = np.nonzero(mask)
+        return list(zip(xs.tolist(), zs.tolist()))
+
+    def cells_of(self, code):
+        return self.cells_where(self.cells == code)
+
+    def walkable_cells(self):
+        return self.cells_where(self.walkable)
+
+    """ Ids planos (x + z*width) das células caminháveis """
+    def walkable_ids(self):
+        return np.flatnonzero(self.walkable)
+
+    """ Ids planos das células livres: caminháveis e passáveis (sem objeto fixo) """
+    def clear_ids(self):
+        return np.flatnonzero(self.walkable & self.passable)
+
+    """ Arrays (xs, zs) das células caminháveis """
+    def walkable_xz(self, exclude_player=False, clear=False):
+        mask = self.walkable
+        if clear:
+            mask = mask & self.passable
+        if exclude_player:
+            mask = mask & (self.cells != CELL_PLAYER)
+        zs, xs = np.nonzero(mask)
+        return xs, zs
+
+    """ Cópia das células do retângulo [x0,x1) x [z0,z1) (fora do mapa = parede) """
+    def window(self, x0, z0, x1, z1):
+        out = np.full((z1-z0, x1-x0), CELL_WALL_H, dtype=np.uint8)
+        sx0 = max(0, x0)
+        sz0 = max(0, z0)
+        sx1 = min(self.cells.shape[1], x1)
+        sz1 = min(self.cells.shape[0], z1)
+        if sx0 < sx1 and sz0 < sz1:
+            out[sz0-z0:sz1-z0, sx0-x0:sx1-x0] = self.cells[sz0:sz1, sx0:sx1]
+        return out
+
+    """ Transforma paredes em chão dentro do retângulo [x0,x1) x [z0,z1)
+        e retorna a lista de células alteradas """
+    def clear_walls(self, x0, z0, x1, z1):
+        x0 = max(0, x0)
+        z0 = max(0, z0)
+        x1 = min(self.cells.shape[1], x1)
+        z1 = min(self.cells.shape[0], z1)
+        if x0 >= x1 or z0 >= z1:
+            return []
+        sub = self.cells[z0:z1, x0:x1]
+        mask = (sub == CELL_WALL_H) | (sub == CELL_WALL_V)
+        if not mask.any():
+            return []
+        sub[mask] = CELL_EMPTY
+        self.walkable[z0:z1, x0:x1][mask] = True
+        self.passable[z0:z1, x0:x1][mask] = True
+        zs, xs = np.nonzero(mask)
+        return list(zip((xs + x0).tolist(), (zs + z0).tolist()))
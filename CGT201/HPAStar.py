@@ -0,0 +1,309 @@
+# ************************************************
+#   HPAStar.py
+#   Define a classe HPAStar: busca hierarquica (HPA*) para
+#   mapas grandes.
+#
+#   O mapa e dividido em clusters de cluster_size x cluster_size.
+#   Em cada borda entre dois clusters vizinhos, cada trecho aberto
+#   (as duas celulas livres) vira uma ou duas entradas (uma no meio
+#   se o trecho e curto, duas nas pontas se e longo); cada entrada
+#   liga um no abstrato de cada lado com custo 1.
+#   Dentro do cluster, uma BFS a partir de cada no guarda a distancia
+#   e o proximo passo de toda celula ate aquele no: isso da as arestas
+#   internas do grafo abstrato, liga start/goal ao grafo sem nova busca
+#   e refina cada trecho do caminho so seguindo ponteiros.
+#   Os dados internos de um cluster sao calculados na primeira vez que
+#   a busca passa por ele e descartados (so ele e os vizinhos) quando
+#   paredes mudam.
+#
+#   O caminho e quase otimo (no maximo alguns passos a mais que o A*).
+# ************************************************
+
+import heapq
+
+import numpy as np
+
+""" Dados internos de um cluster (BFS de cada no abstrato) """
+class _Cluster:
+    def __init__(self, x0, z0, w, h):
+        self.x0 = x0
+        self.z0 = z0
+        self.w = w
+        self.h = h
+        self.built = False
+        self.nodes = []
+        self.trees = {}
+        self.edges = {}
+
+""" Classe HPAStar """
+class HPAStar:
+    def __init__(self, walkable, cluster_size=16):
+        self.walkable = walkable
+        self.height, self.width = walkable.shape
+        self.cs = cluster_size
+        self.ncx = (self.width + cluster_size - 1) // cluster_size
+        self.ncz = (self.height + cluster_size - 1) // cluster_size
+        self.clusters = {}
+        for cz in range(self.ncz):
+            for cx in range(self.ncx):
+                x0 = cx * cluster_size
+                z0 = cz * cluster_size
+                self.clusters[(cx, cz)] = _Cluster(x0, z0, min(cluster_size, self.width - x0),
+                                                   min(cluster_size, self.height - z0))
+        self.borders = {}
+        self.inter = {}
+        for cz in range(self.ncz):
+            for cx in range(self.ncx):
+                if cx + 1 < self.ncx:
+                    self._build_border((cx, cz, 'v'))
+                if cz + 1 < self.ncz:
+                    self._build_border((cx, cz, 'h'))
+        # contadores
+        self.expanded = 0
+        self.cluster_builds = 0
+
+    # -------------------- entradas
+    """ Borda 'v' = entre (cx,cz) e (cx+1,cz); borda 'h' = entre (cx,cz) e (cx,cz+1) """
+    def _build_border(self, key):
+        cx, cz, kind = key
+        cs = self.cs
+        width = self.width
+        for (a, b) in self.borders.pop(key, ()):
+            self.inter[a].discard(b)
+            self.inter[b].discard(a)
+        if kind == 'v':
+            xa = (cx+1)*cs - 1
+            z0 = cz*cs
+            z1 = min(self.height, z0 + cs)
+            line = self.walkable[z0:z1, xa] & self.walkable[z0:z1, xa+1]
+            cells = lambda i: ((z0+i)*width + xa, (z0+i)*width + xa+1)
+        else:
+            za = (cz+1)*cs - 1
+            x0 = cx*cs
+            x1 = min(width, x0 + cs)
+            line = self.walkable[za, x0:x1] & self.walkable[za+1, x0:x1]
+            cells = lambda i: (za*width + x0+i, (za+1)*width + x0+i)
+        pairs = []
+        for (i0, i1) in _runs(line):
+            if i1 - i0 < 6:
+                pairs.append(cells((i0 + i1 - 1) // 2))
+            else:
+                pairs.append(cells(i0))
+                pairs.append(cells(i1 - 1))
+        for (a, b) in pairs:
+            self.inter.setdefault(a, set()).add(b)
+            self.inter.setdefault(b, set()).add(a)
+        self.borders[key] = pairs
+
+    def _cluster_of(self, cid):
+        return (cid % self.width // self.cs, cid // self.width // self.cs)
+
+    def _cluster_nodes(self, cx, cz):
+        nodes = set()
+        for key, side in (((cx, cz, 'v'), 0), ((cx-1, cz, 'v'), 1),
+                          ((cx, cz, 'h'), 0), ((cx, cz-1, 'h'), 1)):
+            for pair in self.borders.get(key, ()):
+                nodes.add(pair[side])
+        return sorted(nodes)
+
+    # -------------------- dados internos
+    def _ensure(self, key):
+        cl = self.clusters[key]
+        if cl.built:
+            return cl
+        self.cluster_builds += 1
+        free = self.walkable[cl.z0:cl.z0+cl.h, cl.x0:cl.x0+cl.w].ravel().tolist()
+        cl.nodes = self._cluster_nodes(*key)
+        cl.trees = {}
+        cl.edges = {}
+        for n in cl.nodes:
+            cl.trees[n] = _bfs(free, cl.w, cl.h, self._local(cl, n))
+        # arestas (vizinho, custo): internas + entradas para o cluster ao lado
+        for n in cl.nodes:
+            dist = cl.trees[n][0]
+            edges = [(m, dist[self._local(cl, m)]) for m in cl.nodes
+                     if m != n and dist[self._local(cl, m)] >= 0]
+            edges.extend((m, 1) for m in self.inter.get(n, ()))
+            cl.edges[n] = edges
+        cl.built = True
+        return cl
+
+    def _local(self, cl, cid):
+        return (cid // self.width - cl.z0) * cl.w + (cid % self.width - cl.x0)
+
+    def _global(self, cl, i):
+        return (cl.z0 + i // cl.w) * self.width + cl.x0 + i % cl.w
+
+    """ Células de 'cid' até o nó 'node' (os dois no mesmo cluster), seguindo a árvore do nó """
+    def _walk_to(self, cl, cid, node):
+        parent = cl.trees[node][1]
+        i = self._local(cl, cid)
+        target = self._local(cl, node)
+        out = [cid]
+        while i != target:
+            i = parent[i]
+            out.append(self._global(cl, i))
+        return out
+
+    """ Descarta os dados dos clusters afetados pelas células alteradas """
+    def update(self, cells):
+        cs = self.cs
+        dirty = set()
+        borders = set()
+        for (x, z) in cells:
+            cx = x // cs
+            cz = z // cs
+            dirty.add((cx, cz))
+            # célula na borda também muda as entradas (e os nós do vizinho)
+            if x % cs == cs-1 and cx+1 < self.ncx:
+                borders.add((cx, cz, 'v'))
+            if x % cs == 0 and cx > 0:
+                borders.add((cx-1, cz, 'v'))
+            if z % cs == cs-1 and cz+1 < self.ncz:
+                borders.add((cx, cz, 'h'))
+            if z % cs == 0 and cz > 0:
+                borders.add((cx, cz-1, 'h'))
+        for key in borders:
+            self._build_border(key)
+            cx, cz, kind = key
+            dirty.add((cx, cz))
+            dirty.add((cx+1, cz) if kind == 'v' else (cx, cz+1))
+        for key in dirty:
+            self.clusters[key].built = False
+
+    # -------------------- busca
+    """ start/goal em (x,z), células caminháveis; devolve lista de células ou None """
+    def find(self, start, goal):
+        if start == goal:
+            return [start]
+        width = self.width
+        s = start[0] + start[1]*width
+        g = goal[0] + goal[1]*width
+        if not (self.walkable[start[1], start[0]] and self.walkable[goal[1], goal[0]]):
+            return None
+        cls = self._ensure(self._cluster_of(s))
+        clg = self._ensure(self._cluster_of(g))
+        if cls is clg:
+            local = self._local_path(cls, s, g)
+            if local is not None:
+                return local
+        gx, gz = goal
+        ls = self._local(cls, s)
+        lg = self._local(clg, g)
+        exits = {}
+        for m in clg.nodes:
+            d = clg.trees[m][0][lg]
+            if d >= 0:
+                exits[m] = d
+        if not exits:
+            return None
+        START = -2
+        GOAL = -1
+        open_set = []
+        gscore = {}
+        came_from = {}
+        for n in cls.nodes:
+            d = cls.trees[n][0][ls]
+            if d >= 0:
+                gscore[n] = d
+                came_from[n] = START
+                heapq.heappush(open_set, (d + abs(n % width - gx) + abs(n // width - gz), -d, n))
+        closed = set()
+        expanded = 0
+        best_goal = None
+        while open_set:
+            # empate no f: sai primeiro o de maior g (mais perto do objetivo)
+            f, cost, n = heapq.heappop(open_set)
+            cost = -cost
+            if n == GOAL:
+                break
+            if n in closed:
+                continue
+            closed.add(n)
+            expanded += 1
+            if n in exits:
+                total = cost + exits[n]
+                if best_goal is None or total < best_goal:
+                    best_goal = total
+                    came_from[GOAL] = n
+                    heapq.heappush(open_set, (total, -total, GOAL))
+            for m, c in self._ensure(self._cluster_of(n)).edges[n]:
+                ng = cost + c
+                if m in closed or ng >= gscore.get(m, 1e18):
+                    continue
+                gscore[m] = ng
+                came_from[m] = n
+                heapq.heappush(open_set, (ng + abs(m % width - gx) + abs(m // width - gz), -ng, m))
+        self.expanded = expanded
+        if GOAL not in came_from:
+            return None
+        chain = []
+        n = came_from[GOAL]
+        while n != START:
+            chain.append(n)
+            n = came_from[n]
+        chain.reverse()
+        return self._refine(s, chain, g)
+
+    def _local_path(self, cl, s, g):
+        free = self.walkable[cl.z0:cl.z0+cl.h, cl.x0:cl.x0+cl.w].ravel().tolist()
+        dist, parent = _bfs(free, cl.w, cl.h, self._local(cl, g))
+        i = self._local(cl, s)
+        if dist[i] < 0:
+            return None
+        out = [s]
+        target = self._local(cl, g)
+        while i != target:
+            i = parent[i]
+            out.append(self._global(cl, i))
+        return [(c % self.width, c // self.width) for c in out]
+
+    """ Transforma start -> nós abstratos -> goal em células """
+    def _refine(self, s, chain, g):
+        cells = self._walk_to(self.clusters[self._cluster_of(s)], s, chain[0])
+        for a, b in zip(chain, chain[1:]):
+            if b in self.inter.get(a, ()) and self._cluster_of(a) != self._cluster_of(b):
+                cells.append(b)
+            else:
+                cells.extend(self._walk_to(self.clusters[self._cluster_of(a)], a, b)[1:])
+        last = chain[-1]
+        tail = self._walk_to(self.clusters[self._cluster_of(g)], g, last)
+        tail.reverse()
+        cells.extend(tail[1:])
+        width = self.width
+        return [(c % width, c // width) for c in cells]
+
+def _runs(mask):
+    m = np.concatenate(([False], np.asarray(mask, dtype=bool), [False]))
+    d = np.flatnonzero(m[1:] != m[:-1])
+    return list(zip(d[0::2].tolist(), d[1::2].tolist()))
+
+""" BFS local a partir de 'root'; parent[i] = vizinho de i um passo mais perto de root """
+def _bfs(free, w, h, root):
+    n = w * h
+    dist = [-1] * n
+    parent = [-1] * n
+    if not free[root]:
+        return dist, parent
+    dist[root] = 0
+    queue = [root]
+    for i in queue:
+        d = dist[i] + 1
+        x = i % w
+        if x + 1 < w and dist[i+1] < 0 and free[i+1]:
+            dist[i+1] = d
+            parent[i+1] = i
+            queue.append(i+1)
+        if x > 0 and dist[i-1] < 0 and free[i-1]:
+            dist[i-1] = d
+            parent[i-1] = i
+            queue.append(i-1)
+        if i + w < n and dist[i+w] < 0 and free[i+w]:
+            dist[i+w] = d
+            parent[i+w] = i
+            queue.append(i+w)
+        if i >= w and dist[i-w] < 0 and free[i-w]:
+            dist[i-w] = d
+            parent[i-w] = i
+            queue.append(i-w)
+    return dist, parent
@@ -0,0 +1,144 @@
+# ************************************************
+#   HeuristicaALT.py
+#   Define a classe HeuristicaALT: heuristica de marcos (ALT =
+#   A*, Landmarks, Triangle inequality) para o a_star.
+#
+#   K marcos sao escolhidos por "ponto mais distante" (cada novo
+#   marco e a celula mais longe dos ja escolhidos) e guardam a
+#   distancia BFS ate toda celula. Pela desigualdade triangular,
+#   |d(L,a) - d(L,b)| <= d(a,b) para todo marco L: o maximo disso
+#   (e da Manhattan) e uma heuristica admissivel e bem mais justa
+#   que a Manhattan em mapas com paredes longas.
+#
+#   Paredes abertas so diminuem distancias: as distancias dos marcos
+#   sao reparadas a partir das celulas novas. Celula bloqueada exige
+#   recalcular tudo (update retorna False).
+#
+#   Em disco: <base>.npz com marcos, distancias (int32), largura e altura.
+# ************************************************
+
+import os
+
+import numpy as np
+
+from FrenteDeOnda import wavefront_distances
+
+""" Classe HeuristicaALT """
+class HeuristicaALT:
+    def __init__(self, landmarks, dist, width, height):
+        self.landmarks = landmarks
+        # dist[k][x + z*width] = distância BFS do marco k (-1 = inalcançável)
+        self.dist = dist
+        self.width = width
+        self.height = height
+
+    """ Escolhe k marcos na componente de 'seed_cell' e calcula as distâncias """
+    @classmethod
+    def build(cls, walkable, k=8, seed_cell=None):
+        height, width = walkable.shape
+        if seed_cell is None:
+            ids = np.flatnonzero(walkable.ravel())
+            if len(ids) == 0:
+                return cls([], [], width, height)
+            seed_cell = (int(ids[0]) % width, int(ids[0]) // width)
+        nearest = wavefront_distances(walkable, [seed_cell]).ravel().astype(np.int64)
+        landmarks = []
+        dist = []
+        for _ in range(k):
+            cid = int(np.argmax(nearest))
+            if nearest[cid] <= 0:
+                break
+            d = wavefront_distances(walkable, [(cid % width, cid // width)]).ravel()
+            landmarks.append((cid % width, cid // width))
+            dist.append(d.tolist())
+            # distância até o marco mais próximo (inalcançável fica -1)
+            nearest = np.where(nearest < 0, nearest, np.minimum(nearest, d))
+        return cls(landmarks, dist, width, height)
+
+    def save(self, path):
+        tmp = path + '.tmp.npz'
+        np.savez(tmp, landmarks=np.array(self.landmarks, dtype=np.int32).reshape(-1, 2),
+                 dist=np.array(self.dist, dtype=np.int32).reshape(len(self.dist), -1),
+                 width=self.width, height=self.height)
+        os.replace(tmp, path)
+
+    """ Abre marcos salvos; None se não existir ou não servir para 'shape' """
+    @classmethod
+    def load(cls, path, shape, k):
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path) as data:
+                width = int(data['width'])
+                height = int(data['height'])
+                landmarks = [tuple(c) for c in data['landmarks'].tolist()]
+                dist = data['dist'].tolist()
+        except (OSError, ValueError, KeyError):
+            return None
+        if (height, width) != tuple(shape) or len(landmarks) != k:
+            return None
+        return cls(landmarks, dist, width, height)
+
+    """ Repara as distâncias depois que células mudaram; retorna False se
+        alguma célula deixou de ser caminhável (aí é preciso recalcular) """
+    def update(self, cells, walkable):
+        width = self.width
+        opened = []
+        for (x, z) in cells:
+            if walkable[z, x]:
+                opened.append(x + z*width)
+            elif self.dist and self.dist[0][x + z*width] >= 0:
+                return False
+        if not opened:
+            return True
+        free = walkable.ravel().tolist()
+        n = width * self.height
+        for d in self.dist:
+            queue = []
+            for c in opened:
+                best = d[c]
+                for v in _around(c, width, n):
+                    if d[v] >= 0 and (best < 0 or d[v] + 1 < best):
+                        best = d[v] + 1
+                if best != d[c]:
+                    d[c] = best
+                    queue.append(c)
+            # só diminuições: propaga em largura a partir das células novas
+            for u in queue:
+                du = d[u] + 1
+                for v in _around(u, width, n):
+                    if free[v] and (d[v] < 0 or d[v] > du):
+                        d[v] = du
+                        queue.append(v)
+        return True
+
+    """ Heuristica h(i) até 'goal', i = id plano da célula:
+        max(Manhattan, |d(L,i) - d(L,goal)|) """
+    def to_goal(self, goal):
+        width = self.width
+        gx, gz = goal
+        g = gx + gz*width
+        pairs = [(d, d[g]) for d in self.dist]
+        def h(i):
+            best = abs(i % width - gx) + abs(i // width - gz)
+            for d, dg in pairs:
+                v = d[i] - dg
+                if v < 0:
+                    v = -v
+                if v > best:
+                    best = v
+            return best
+        return h
+
+def _around(c, width, n):
+    x = c % width
+    out = []
+    if x + 1 < width:
+        out.append(c+1)
+    if x > 0:
+        out.append(c-1)
+    if c + width < n:
+        out.append(c+width)
+    if c >= width:
+        out.append(c-width)
+    return out
@@ -0,0 +1,140 @@
+# ************************************************
+#   IndiceCelulasLivres.py
+#   Define a classe IndiceCelulasLivres: conjunto indexavel
+#   das celulas livres, caminhaveis e passaveis (array de ids +
+#   posicao de cada id, remocao por troca com o ultimo). Permite
+#   sortear uma celula livre em O(1) sem varrer o mapa.
+#   O id de uma celula e x + z*width; a tabela de posicoes so e
+#   criada na primeira alteracao (densa em numpy, ou um dict
+#   quando sparse=True, para mundos enormes em chunks).
+# ************************************************
+
+import random
+
+import numpy as np
+
+""" Classe IndiceCelulasLivres """
+class IndiceCelulasLivres:
+    def __init__(self, width=0, height=0, sparse=False):
+        self.width = max(1, width)
+        self.size = width * height
+        self.sparse = sparse
+        self.ids = np.zeros(16, dtype=np.int64)
+        self.n = 0
+        self.pos = None
+
+    @classmethod
+    def from_ids(cls, ids, width, height, sparse=False):
+        idx = cls(width, height, sparse)
+        idx.ids = np.array(ids, dtype=np.int64)
+        idx.n = len(idx.ids)
+        if len(idx.ids) == 0:
+            idx.ids = np.zeros(16, dtype=np.int64)
+        return idx
+
+    def _ensure_pos(self):
+        if self.pos is not None:
+            return
+        live = self.ids[:self.n]
+        if self.sparse:
+            self.pos = dict(zip(live.tolist(), range(self.n)))
+        else:
+            self.pos = np.full(self.size, -1, dtype=np.int64)
+            self.pos[live] = np.arange(self.n)
+
+    def _index_of(self, cid):
+        if self.sparse:
+            return self.pos.get(cid, -1)
+        return int(self.pos[cid])
+
+    def _set_pos(self, cid, i):
+        if self.sparse:
+            if i < 0:
+                self.pos.pop(cid, None)
+            else:
+                self.pos[cid] = i
+        else:
+            self.pos[cid] = i
+
+    def _cell(self, i):
+        cid = int(self.ids[i])
+        return (cid % self.width, cid // self.width)
+
+    def __len__(self):
+        return self.n
+
+    def __contains__(self, cell):
+        self._ensure_pos()
+        return self._index_of(cell[0] + cell[1]*self.width) >= 0
+
+    def add(self, cell):
+        self._ensure_pos()
+        cid = cell[0] + cell[1]*self.width
+        if self._index_of(cid) >= 0:
+            return
+        if self.n == len(self.ids):
+            self.ids = np.resize(self.ids, max(16, 2*len(self.ids)))
+        self.ids[self.n] = cid
+        self._set_pos(cid, self.n)
+        self.n += 1
+
+    def discard(self, cell):
+        self._ensure_pos()
+        cid = cell[0] + cell[1]*self.width
+        i = self._index_of(cid)
+        if i < 0:
+            return
+        last = self.n - 1
+        if i != last:
+            moved = int(self.ids[last])
+            self.ids[i] = moved
+            self._set_pos(moved, i)
+        self._set_pos(cid, -1)
+        self.n = last
+
+    """ Sorteia uma célula livre uniforme (None se o índice estiver vazio) """
+    def sample(self, rng=random):
+        if self.n == 0:
+            return None
+        return self._cell(rng.randrange(self.n))
+
+    """ Sorteia uma célula cujo centro esteja a mais de min_dist de (px,pz).
+        Amostragem por rejeição (continua uniforme); só olha o índice inteiro
+        se quase todas as células estiverem dentro do raio excluído. """
+    def sample_far(self, px, pz, min_dist, rng=random, tries=64):
+        if self.n == 0:
+            return None
+        d2 = min_dist * min_dist
+        for _ in range(tries):
+            x, z = self._cell(rng.randrange(self.n))
+            if (x+0.5-px)**2 + (z+0.5-pz)**2 > d2:
+                return (x, z)
+        live = self.ids[:self.n]
+        xs = live % self.width
+        zs = live // self.width
+        far = np.flatnonzero((xs+0.5-px)**2 + (zs+0.5-pz)**2 > d2)
+        if len(far) == 0:
+            return None
+        return self._cell(int(far[rng.randrange(len(far))]))
+
+    """ Sorteia até k células distintas que não estejam em 'exclude' """
+    def sample_distinct(self, k, exclude=(), rng=random):
+        n = self.n
+        if k <= 0 or n == 0:
+            return []
+        if k * 2 >= n:
+            pool = [self._cell(i) for i in range(n)]
+            pool = [c for c in pool if c not in exclude]
+            rng.shuffle(pool)
+            return pool[:k]
+        seen = set(exclude)
+        out = []
+        tries = 0
+        while len(out) < k and tries < k * 20:
+            tries += 1
+            c = self._cell(rng.randrange(n))
+            if c in seen:
+                continue
+            seen.add(c)
+            out.append(c)
+        return out
@@ -0,0 +1,186 @@
+# ************************************************
+#   JumpPointSearch.py
+#   Define a classe JumpPointSearch: Jump Point Search para grade
+#   4-conectada (sem diagonais), mesma interface do a_star:
+#   find(start, goal) -> lista de celulas (ou None).
+#   So os pontos de salto entram na fila de prioridade; as celulas
+#   de cada trecho reto sao preenchidas na reconstrucao do caminho.
+#
+#   Regras de salto (4-vizinhanca):
+#     - andando na horizontal, para numa celula com vizinho forcado
+#       acima/abaixo (livre, com a celula de tras na mesma linha bloqueada);
+#     - andando na vertical, idem para esquerda/direita, e tambem para
+#       em toda celula de onde um salto horizontal acha um ponto de salto.
+#
+#   O plano caminhavel fica num bytearray com borda de uma celula
+#   bloqueada, indexado por id = (z+1)*(width+2) + (x+1): os saltos
+#   nao precisam testar limites.
+#
+#   O salto horizontal nao depende da busca (a nao ser pelo goal):
+#   para cada celula e direcao guarda-se a primeira celula da linha
+#   em que ele para (bloqueada ou com vizinho forcado). Assim cada
+#   passo vertical testa as duas direcoes em O(1), em vez de varrer
+#   a linha (o que deixava a busca quadratica em areas abertas).
+#   update() recalcula so as linhas vizinhas das celulas alteradas.
+# ************************************************
+
+import heapq
+from array import array
+
+import numpy as np
+
+""" Classe JumpPointSearch """
+class JumpPointSearch:
+    def __init__(self, walkable):
+        height, width = walkable.shape
+        self.width = width
+        self.height = height
+        self.stride = width + 2
+        pad = np.zeros((height+2, width+2), dtype=np.uint8)
+        pad[1:-1, 1:-1] = walkable
+        self.free = bytearray(pad.tobytes())
+        # right[i] / left[i]: id onde o salto horizontal a partir de i para
+        self.right = array('i', bytes(4 * len(self.free)))
+        self.left = array('i', bytes(4 * len(self.free)))
+        self._scan_rows(range(1, height+1))
+        self.expanded = 0
+
+    """ Recalcula right/left das linhas (do plano com borda) 'rows' """
+    def _scan_rows(self, rows):
+        w = self.stride
+        free = np.frombuffer(self.free, dtype=np.uint8).reshape(-1, w).astype(bool)
+        cols = np.arange(w, dtype=np.int32)
+        for r in rows:
+            up = free[r-1]
+            row = free[r]
+            down = free[r+1]
+            # indo para +x a célula de trás é c-1; indo para -x, c+1
+            up_back = np.concatenate(([False], up[:-1]))
+            down_back = np.concatenate(([False], down[:-1]))
+            up_ahead = np.concatenate((up[1:], [False]))
+            down_ahead = np.concatenate((down[1:], [False]))
+            stop_r = ~row | (up & ~up_back) | (down & ~down_back)
+            stop_l = ~row | (up & ~up_ahead) | (down & ~down_ahead)
+            # a borda da linha é bloqueada: sempre há onde parar
+            nxt = np.minimum.accumulate(np.where(stop_r, cols, w)[::-1])[::-1]
+            prv = np.maximum.accumulate(np.where(stop_l, cols, -1))
+            base = r * w
+            self.right[base:base+w] = array('i', (nxt + base).astype(np.int32).tobytes())
+            self.left[base:base+w] = array('i', (prv + base).astype(np.int32).tobytes())
+
+    """ Copia para o plano interno as células alteradas no mapa """
+    def update(self, cells, walkable):
+        rows = set()
+        for (x, z) in cells:
+            self.free[(z+1)*self.stride + x+1] = 1 if walkable[z, x] else 0
+            # muda o vizinho forçado das linhas de cima e de baixo
+            rows.update((z, z+1, z+2))
+        self._scan_rows(sorted(r for r in rows if 1 <= r <= self.height))
+
+    def _id(self, cell):
+        return (cell[1]+1)*self.stride + cell[0]+1
+
+    def _cell(self, i):
+        return (i % self.stride - 1, i // self.stride - 1)
+
+    """ Salto horizontal em O(1): a parada da tabela, ou o goal se ele vem antes """
+    def _hjump(self, i, step, goal):
+        if step == 1:
+            j = self.right[i]
+            if i <= goal < j:
+                return goal
+        else:
+            j = self.left[i]
+            if j < goal <= i:
+                return goal
+        return j if self.free[j] else -1
+
+    def _jump(self, i, step, goal):
+        if step == 1 or step == -1:
+            return self._hjump(i, step, goal)
+        free = self.free
+        hjump = self._hjump
+        while True:
+            if not free[i]:
+                return -1
+            if i == goal:
+                return i
+            if (free[i-1] and not free[i-1-step]) or (free[i+1] and not free[i+1-step]):
+                return i
+            if hjump(i+1, 1, goal) >= 0 or hjump(i-1, -1, goal) >= 0:
+                return i
+            i += step
+
+    def _steps(self, node, parent):
+        w = self.stride
+        if parent < 0:
+            return (1, -1, w, -w)
+        d = node - parent
+        if -w < d < w:
+            s = 1 if d > 0 else -1
+            return (s, w, -w)
+        s = w if d > 0 else -w
+        return (s, 1, -1)
+
+    """ start/goal em (x,z); stats (dict opcional) acumula 'expanded' """
+    def find(self, start, goal, stats=None):
+        if start == goal:
+            return [start]
+        if not (0 <= start[0] < self.width and 0 <= start[1] < self.height and
+                0 <= goal[0] < self.width and 0 <= goal[1] < self.height):
+            return None
+        w = self.stride
+        s = self._id(start)
+        g = self._id(goal)
+        gx = g % w
+        gz = g // w
+        open_set = [(abs(start[0]-goal[0]) + abs(start[1]-goal[1]), 0, s)]
+        came_from = {s: -1}
+        gscore = {s: 0}
+        closed = set()
+        expanded = 0
+        found = False
+        while open_set:
+            _, cost, cur = heapq.heappop(open_set)
+            if cur in closed:
+                continue
+            if cur == g:
+                found = True
+                break
+            closed.add(cur)
+            expanded += 1
+            cx = cur % w
+            cz = cur // w
+            for step in self._steps(cur, came_from[cur]):
+                jp = self._jump(cur + step, step, g)
+                if jp < 0 or jp in closed:
+                    continue
+                jx = jp % w
+                jz = jp // w
+                ng = cost + abs(jx-cx) + abs(jz-cz)
+                if ng < gscore.get(jp, 1e18):
+                    gscore[jp] = ng
+                    came_from[jp] = cur
+                    heapq.heappush(open_set, (ng + abs(jx-gx) + abs(jz-gz), ng, jp))
+        self.expanded = expanded
+        if stats is not None:
+            stats['expanded'] = stats.get('expanded', 0) + expanded
+        if not found:
+            return None
+        points = []
+        node = g
+        while node >= 0:
+            points.append(node)
+            node = came_from[node]
+        points.reverse()
+        path = [start]
+        for nxt in points[1:]:
+            x1, z1 = self._cell(nxt)
+            x0, z0 = path[-1]
+            dx = (x1 > x0) - (x1 < x0)
+            dz = (z1 > z0) - (z1 < z0)
+            while (x0, z0) != (x1, z1):
+                x0 += dx
+                z0 += dz
+                path.append((x0, z0))
+        return path
@@ -0,0 +1,92 @@
+# ************************************************
+#   LinhaDeVisao.py
+#   Raio em grade (DDA de Amanatides & Woo) e suavizacao de
+#   caminhos por "string pulling".
+#
+#   line_of_sight percorre exatamente as celulas que o segmento
+#   cruza; quando o segmento passa bem na quina entre quatro
+#   celulas, as duas vizinhas laterais tambem precisam estar livres
+#   (nao atravessa parede pela diagonal).
+#   smooth_path troca os passos de celula em celula por pontos de
+#   passagem ligados em linha reta: de cada ponto, vai ate a celula
+#   mais distante do caminho ainda visivel.
+#
+#   is_free(x, z) -> bool diz se a celula pode ser atravessada.
+# ************************************************
+
+from math import floor
+
+INF = float('inf')
+
+""" True se o segmento (x0,z0)-(x1,z1) (coordenadas contínuas) só cruza células livres """
+def line_of_sight(is_free, x0, z0, x1, z1):
+    cx = int(floor(x0))
+    cz = int(floor(z0))
+    tx = int(floor(x1))
+    tz = int(floor(z1))
+    if not is_free(cx, cz):
+        return False
+    dx = x1 - x0
+    dz = z1 - z0
+    step_x = 1 if dx > 0 else -1
+    step_z = 1 if dz > 0 else -1
+    # t (0..1 no segmento) até cruzar a próxima linha vertical/horizontal da grade
+    if dx != 0:
+        delta_x = abs(1.0 / dx)
+        max_x = ((cx + 1 - x0) if dx > 0 else (x0 - cx)) * delta_x
+    else:
+        delta_x = max_x = INF
+    if dz != 0:
+        delta_z = abs(1.0 / dz)
+        max_z = ((cz + 1 - z0) if dz > 0 else (z0 - cz)) * delta_z
+    else:
+        delta_z = max_z = INF
+    # limite de passos contra erro de arredondamento
+    steps = abs(tx - cx) + abs(tz - cz)
+    while (cx, cz) != (tx, tz) and steps > 0:
+        if max_x < max_z:
+            cx += step_x
+            max_x += delta_x
+            steps -= 1
+        elif max_z < max_x:
+            cz += step_z
+            max_z += delta_z
+            steps -= 1
+        else:
+            # quina: passa na diagonal só se as duas laterais estão livres
+            if not (is_free(cx + step_x, cz) and is_free(cx, cz + step_z)):
+                return False
+            cx += step_x
+            cz += step_z
+            max_x += delta_x
+            max_z += delta_z
+            steps -= 2
+        if not is_free(cx, cz):
+            return False
+    return (cx, cz) == (tx, tz)
+
+""" Caminho de células -> pontos de passagem (primeiro e último mantidos);
+    cada trecho reto tem no máximo max_len células. Com 'limit', só as
+    primeiras 'limit' células são suavizadas (o resto segue célula a
+    célula): quem replaneja sempre só anda o começo do caminho. """
+def smooth_path(is_free, path, max_len=16, limit=None):
+    if len(path) <= 2:
+        return list(path)
+    out = [path[0]]
+    i = 0
+    last = len(path) - 1
+    if limit is not None and limit < last:
+        last = limit
+    while i < last:
+        ax = path[i][0] + 0.5
+        az = path[i][1] + 0.5
+        j = i + 1
+        while j < last and j + 1 - i <= max_len:
+            bx, bz = path[j+1]
+            if not line_of_sight(is_free, ax, az, bx + 0.5, bz + 0.5):
+                break
+            j += 1
+        out.append(path[j])
+        i = j
+    out.extend(path[last+1:])
+    return out
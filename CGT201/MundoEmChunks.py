@@ -0,0 +1,240 @@
+# ************************************************
+#   MundoEmChunks.py
+#   Define a classe MundoEmChunks: um labirinto muito grande
+#   dividido em blocos (chunks) de chunk_size x chunk_size.
+#   Cada chunk e gerado de forma deterministica a partir de
+#   (seed, cx, cz) no primeiro acesso e descartado por LRU
+#   quando fica longe do jogador e dos inimigos.
+#   Tem a mesma interface de GradeLabirinto usada pelo app.
+# ************************************************
+
+from collections import OrderedDict
+
+import numpy as np
+
+from GradeLabirinto import (GradeLabirinto, CELL_EMPTY, CELL_WALL_H, CELL_WALL_V,
+                            CELL_PLAYER)
+from GeradorVetorizado import rasterize_corridors, orient_walls
+
+""" Classe MundoEmChunks """
+class MundoEmChunks:
+    def __init__(self, largura, altura, seed, chunk_size=64, max_chunks=256,
+                 wall_prob=0.06, corridors_per_chunk=4, keep_radius=1):
+        self._width = largura
+        self._height = altura
+        self.seed = seed
+        self.chunk_size = chunk_size
+        self.max_chunks = max_chunks
+        self.wall_prob = wall_prob
+        self.corridors_per_chunk = corridors_per_chunk
+        self.keep_radius = keep_radius
+        self.player_cell = (largura//2, altura//2)
+        self._chunks = OrderedDict()
+        # chunks alterados (paredes abertas, objetos) não podem ser regerados:
+        # ao sair do LRU ficam guardados aqui
+        self._dirty = set()
+        self._saved = {}
+        self.generated = 0
+        self.evicted = 0
+
+    @property
+    def width(self):
+        return self._width
+
+    @property
+    def height(self):
+        return self._height
+
+    @property
+    def shape(self):
+        return (self._height, self._width)
+
+    def __len__(self):
+        return self._height
+
+    @property
+    def loaded(self):
+        return len(self._chunks)
+
+    # -------------------- chunks
+    def _chunk(self, cx, cz):
+        key = (cx, cz)
+        ch = self._chunks.get(key)
+        if ch is None:
+            ch = self._saved.pop(key, None)
+            if ch is None:
+                ch = self._generate_chunk(cx, cz)
+            self._chunks[key] = ch
+        else:
+            self._chunks.move_to_end(key)
+        return ch
+
+    def _generate_chunk(self, cx, cz):
+        cs = self.chunk_size
+        gx0 = cx * cs
+        gz0 = cz * cs
+        w = min(cs, self._width - gx0)
+        h = min(cs, self._height - gz0)
+        rng = np.random.default_rng([self.seed, cx, cz])
+        # borda de uma célula livre: fora do chunk conta como aberto
+        pad = np.zeros((h+2, w+2), dtype=np.uint8)
+        inner = pad[1:-1, 1:-1]
+        walls = (rng.random((h, w)) < self.wall_prob) & (rng.random((h, w)) < 0.9)
+        inner[walls] = CELL_WALL_H
+        free_z, free_x = np.nonzero(inner == CELL_EMPTY)
+        if len(free_x) >= 2 and self.corridors_per_chunk > 0:
+            a = rng.integers(0, len(free_x), self.corridors_per_chunk)
+            b = rng.integers(0, len(free_x), self.corridors_per_chunk)
+            keep = a != b
+            carved = rasterize_corridors(free_x[a[keep]]+1, free_z[a[keep]]+1,
+                                         free_x[b[keep]]+1, free_z[b[keep]]+1, pad.shape, rng)
+            pad[carved] = CELL_EMPTY
+        orient_walls(pad, rng)
+        # meio-fio apenas nas bordas do mundo
+        if gz0 == 0:
+            inner[0, :] = CELL_WALL_H
+        if gz0 + h == self._height:
+            inner[h-1, :] = CELL_WALL_H
+        if gx0 == 0:
+            inner[:, 0] = CELL_WALL_V
+        if gx0 + w == self._width:
+            inner[:, w-1] = CELL_WALL_V
+        px, pz = self.player_cell
+        if gx0 <= px < gx0 + w and gz0 <= pz < gz0 + h:
+            inner[pz-gz0, px-gx0] = CELL_PLAYER
+        self.generated += 1
+        return GradeLabirinto(cells=inner.copy())
+
+    def _mark_dirty(self, cx, cz):
+        self._dirty.add((cx, cz))
+
+    """ Gera (ou recarrega) os chunks num raio de 'radius' células em volta de (x,z) """
+    def preload_around(self, x, z, radius):
+        cs = self.chunk_size
+        for cz in range(max(0, int(z-radius)//cs), min(self._height-1, int(z+radius))//cs + 1):
+            for cx in range(max(0, int(x-radius)//cs), min(self._width-1, int(x+radius))//cs + 1):
+                self._chunk(cx, cz)
+
+    """ Descarta os chunks menos usados que estejam longe de todos os 'anchors' (x,z) """
+    def evict_far(self, anchors):
+        if len(self._chunks) <= self.max_chunks:
+            return 0
+        cs = self.chunk_size
+        r = self.keep_radius
+        protected = set()
+        for (ax, az) in anchors:
+            acx = int(ax)//cs
+            acz = int(az)//cs
+            for dz in range(-r, r+1):
+                for dx in range(-r, r+1):
+                    protected.add((acx+dx, acz+dz))
+        removed = 0
+        for key in list(self._chunks.keys()):
+            if len(self._chunks) <= self.max_chunks:
+                break
+            if key in protected:
+                continue
+            ch = self._chunks.pop(key)
+            if key in self._dirty:
+                self._saved[key] = ch
+            removed += 1
+        self.evicted += removed
+        return removed
+
+    # -------------------- interface de GradeLabirinto
+    def in_bounds(self, x, z):
+        return 0 <= x < self._width and 0 <= z < self._height
+
+    def get(self, x, z):
+        cs = self.chunk_size
+        return int(self._chunk(x//cs, z//cs).cells[z % cs, x % cs])
+
+    def set(self, x, z, code):
+        cs = self.chunk_size
+        self._chunk(x//cs, z//cs).set(x % cs, z % cs, code)
+        self._mark_dirty(x//cs, z//cs)
+
+    def is_walkable(self, x, z):
+        if x < 0 or z < 0 or x >= self._width or z >= self._height:
+            return False
+        cs = self.chunk_size
+        return bool(self._chunk(x//cs, z//cs).walkable[z % cs, x % cs])
+
+    def is_passable(self, x, z):
+        if x < 0 or z < 0 or x >= self._width or z >= self._height:
+            return False
+        cs = self.chunk_size
+        return bool(self._chunk(x//cs, z//cs).passable[z % cs, x % cs])
+
+    # consultas "do mapa inteiro" valem só para os chunks carregados
+    def _loaded_items(self):
+        cs = self.chunk_size
+        return [(cx*cs, cz*cs, ch) for (cx, cz), ch in self._chunks.items()]
+
+    def count(self, code):
+        return sum(ch.count(code) for (_, _, ch) in self._loaded_items())
+
+    def cells_of(self, code):
+        out = []
+        for (gx0, gz0, ch) in self._loaded_items():
+            out.extend((x+gx0, z+gz0) for (x, z) in ch.cells_of(code))
+        return out
+
+    def walkable_cells(self):
+        xs, zs = self.walkable_xz()
+        return list(zip(xs.tolist(), zs.tolist()))
+
+    def walkable_xz(self, exclude_player=False, clear=False):
+        all_x = []
+        all_z = []
+        for (gx0, gz0, ch) in self._loaded_items():
+            xs, zs = ch.walkable_xz(exclude_player, clear)
+            all_x.append(xs + gx0)
+            all_z.append(zs + gz0)
+        if not all_x:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        return np.concatenate(all_x), np.concatenate(all_z)
+
+    def walkable_ids(self):
+        xs, zs = self.walkable_xz()
+        return zs * self._width + xs
+
+    def clear_ids(self):
+        xs, zs = self.walkable_xz(clear=True)
+        return zs * self._width + xs
+
+    def window(self, x0, z0, x1, z1):
+        out = np.full((z1-z0, x1-x0), CELL_WALL_H, dtype=np.uint8)
+        cs = self.chunk_size
+        sx0 = max(0, x0)
+        sz0 = max(0, z0)
+        sx1 = min(self._width, x1)
+        sz1 = min(self._height, z1)
+        for cz in range(sz0//cs, (sz1-1)//cs + 1 if sz1 > sz0 else 0):
+            for cx in range(sx0//cs, (sx1-1)//cs + 1 if sx1 > sx0 else 0):
+                ch = self._chunk(cx, cz)
+                ax0 = max(sx0, cx*cs)
+                az0 = max(sz0, cz*cs)
+                ax1 = min(sx1, cx*cs + ch.width)
+                az1 = min(sz1, cz*cs + ch.height)
+                out[az0-z0:az1-z0, ax0-x0:ax1-x0] = ch.cells[az0-cz*cs:az1-cz*cs, ax0-cx*cs:ax1-cx*cs]
+        return out
+
+    def clear_walls(self, x0, z0, x1, z1):
+        cs = self.chunk_size
+        x0 = max(0, x0)
+        z0 = max(0, z0)
+        x1 = min(self._width, x1)
+        z1 = min(self._height, z1)
+        changed = []
+        if x0 >= x1 or z0 >= z1:
+            return changed
+        for cz in range(z0//cs, (z1-1)//cs + 1):
+            for cx in range(x0//cs, (x1-1)//cs + 1):
+                gx0 = cx*cs
+                gz0 = cz*cs
+                local = self._chunk(cx, cz).clear_walls(x0-gx0, z0-gz0, x1-gx0, z1-gz0)
+                if local:
+                    self._mark_dirty(cx, cz)
+                    changed.extend((x+gx0, z+gz0) for (x, z) in local)
+        return changed
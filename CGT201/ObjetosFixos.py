@@ -0,0 +1,81 @@
+# ************************************************
+#   ObjetosFixos.py
+#   Define a classe ObjetosFixos: registro compacto dos
+#   objetos fixos (cadeira, mesa, vaso) em arrays tipados,
+#   com um hash por celula (x,z) -> linha para achar em O(1)
+#   o objeto de uma celula.
+# ************************************************
+
+import numpy as np
+
+FIXED_TYPES = ['chair', 'table', 'vase']
+
+""" Classe ObjetosFixos """
+class ObjetosFixos:
+    def __init__(self, capacity=16):
+        capacity = max(1, capacity)
+        self.xs = np.zeros(capacity, dtype=np.int32)
+        self.zs = np.zeros(capacity, dtype=np.int32)
+        self.types = np.zeros(capacity, dtype=np.uint8)
+        self.n = 0
+        self.index = {}
+
+    @classmethod
+    def from_array(cls, arr):
+        arr = np.asarray(arr, dtype=np.int32).reshape(-1, 3)
+        objs = cls(len(arr))
+        for (x, z, t) in arr.tolist():
+            objs.add(x, z, t)
+        return objs
+
+    """ Array (n,3) com x, z e código do tipo de cada objeto """
+    def as_array(self):
+        return np.stack([self.xs[:self.n], self.zs[:self.n], self.types[:self.n].astype(np.int32)], axis=1)
+
+    def __len__(self):
+        return self.n
+
+    def __contains__(self, cell):
+        return cell in self.index
+
+    def _grow(self):
+        cap = len(self.xs) * 2
+        self.xs = np.resize(self.xs, cap)
+        self.zs = np.resize(self.zs, cap)
+        self.types = np.resize(self.types, cap)
+
+    """ Adiciona (ou troca o tipo de) o objeto da célula; typ pode ser nome ou código """
+    def add(self, x, z, typ):
+        code = FIXED_TYPES.index(typ) if isinstance(typ, str) else int(typ)
+        i = self.index.get((x, z))
+        if i is None:
+            if self.n == len(self.xs):
+                self._grow()
+            i = self.n
+            self.n += 1
+            self.xs[i] = x
+            self.zs[i] = z
+            self.index[(x, z)] = i
+        self.types[i] = code
+
+    def remove(self, x, z):
+        i = self.index.pop((x, z), None)
+        if i is None:
+            return
+        last = self.n - 1
+        if i != last:
+            self.xs[i] = self.xs[last]
+            self.zs[i] = self.zs[last]
+            self.types[i] = self.types[last]
+            self.index[(int(self.xs[i]), int(self.zs[i]))] = i
+        self.n = last
+
+    """ Nome do tipo do objeto na célula, ou None """
+    def type_at(self, x, z):
+        i = self.index.get((x, z))
+        if i is None:
+            return None
+        return FIXED_TYPES[self.types[i]]
+
+    def items(self):
+        return [(x, z, FIXED_TYPES[t]) for (x, z, t) in self.as_array().tolist()]
@@ -0,0 +1,196 @@
+# ************************************************
+#   PoolDeCaminhos.py
+#   Define a classe PoolDeCaminhos: busca de caminhos em processos
+#   separados, sem travar o laco do GLUT.
+#
+#   O plano caminhavel (uint8, borda bloqueada) fica em memoria
+#   compartilhada: os processos leem o mesmo buffer que o processo
+#   principal atualiza quando o mapa muda, sem copiar a grade a
+#   cada pedido.
+#   submit() devolve um id de pedido; poll() (chamado a cada tick)
+#   esvazia a fila de resultados sem bloquear.
+#   Cada pedido leva a versao do mapa. A versao muda quando o mapa e
+#   trocado ou quando alguma celula deixa de ser caminhavel; o
+#   resultado de um pedido de versao anterior volta marcado como
+#   velho. Paredes abertas nao mudam a versao: um caminho calculado
+#   antes continua andavel.
+#
+#   Os processos sao criados com 'spawn': nada do estado do processo
+#   principal (contexto OpenGL, janela, mapa) e herdado. Mas o spawn
+#   importa de novo o script principal em cada processo (como
+#   __mp_main__): a partir do jogo, e o app.py com os imports do
+#   OpenGL e do Simulacao. Nao abre janela porque main() fica atras
+#   de "if __name__ == '__main__'"; todo script que cria o pool
+#   precisa desse guard.
+# ************************************************
+
+import heapq
+import queue
+import multiprocessing as mp
+from multiprocessing import shared_memory
+
+import numpy as np
+
+""" Classe PoolDeCaminhos """
+class PoolDeCaminhos:
+    def __init__(self, workers=2):
+        ctx = mp.get_context('spawn')
+        self._tasks = ctx.Queue()
+        self._results = ctx.Queue()
+        self._procs = [ctx.Process(target=_worker, args=(self._tasks, self._results), daemon=True)
+                       for _ in range(workers)]
+        for p in self._procs:
+            p.start()
+        self._shm = None
+        self._free = None
+        self.width = 0
+        self.height = 0
+        self.version = 0
+        self._next_id = 0
+        # id do pedido -> versão do mapa no envio
+        self._pending = {}
+        # contadores
+        self.submitted = 0
+        self.delivered = 0
+        self.stale = 0
+
+    @property
+    def in_flight(self):
+        return len(self._pending)
+
+    """ Copia o plano caminhável para um bloco de memória compartilhada novo """
+    def set_map(self, walkable):
+        height, width = walkable.shape
+        shm = shared_memory.SharedMemory(create=True, size=(height+2) * (width+2))
+        free = np.ndarray((height+2, width+2), dtype=np.uint8, buffer=shm.buf)
+        free[:] = 0
+        free[1:-1, 1:-1] = walkable
+        self._release()
+        self._shm = shm
+        self._free = free
+        self.width = width
+        self.height = height
+        self.version += 1
+
+    """ Aplica células alteradas no buffer compartilhado """
+    def update(self, cells, walkable):
+        free = self._free
+        if free is None:
+            return
+        blocked = False
+        for (x, z) in cells:
+            v = 1 if walkable[z, x] else 0
+            if free[z+1, x+1] and not v:
+                blocked = True
+            free[z+1, x+1] = v
+        if blocked:
+            self.version += 1
+
+    def submit(self, start, goal):
+        rid = self._next_id
+        self._next_id += 1
+        self._pending[rid] = self.version
+        self._tasks.put((rid, self._shm.name, self.width, self.height, start, goal))
+        self.submitted += 1
+        return rid
+
+    """ Resultados prontos, sem bloquear: lista de (id, caminho ou None, velho) """
+    def poll(self):
+        out = []
+        while True:
+            try:
+                rid, path = self._results.get_nowait()
+            except queue.Empty:
+                break
+            version = self._pending.pop(rid, None)
+            if version is None:
+                continue
+            stale = version != self.version
+            if stale:
+                self.stale += 1
+            else:
+                self.delivered += 1
+            out.append((rid, path, stale))
+        return out
+
+    """ Esquece os pedidos em andamento (os resultados deles serão ignorados) """
+    def clear(self):
+        self._pending.clear()
+
+    def close(self):
+        for _ in self._procs:
+            self._tasks.put(None)
+        for p in self._procs:
+            p.join(timeout=1.0)
+            if p.is_alive():
+                p.terminate()
+        self._procs = []
+        self._release()
+
+    def _release(self):
+        if self._shm is not None:
+            self._free = None
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+def _worker(tasks, results):
+    name = None
+    shm = None
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+        rid, task_name, width, height, start, goal = task
+        if task_name != name:
+            if shm is not None:
+                shm.close()
+                shm = None
+            name = task_name
+            try:
+                # o rastreador de recursos é o do processo principal, que apaga o bloco
+                shm = shared_memory.SharedMemory(name=name)
+            except FileNotFoundError:
+                # mapa já trocado: o resultado volta velho de qualquer jeito
+                name = None
+        path = None
+        if shm is not None:
+            path = _search(shm.buf, width, height, start, goal)
+        results.put((rid, path))
+    if shm is not None:
+        shm.close()
+
+""" A* (4-vizinhança) sobre o plano com borda; ids = (z+1)*stride + x+1 """
+def _search(free, width, height, start, goal):
+    if not (0 <= start[0] < width and 0 <= start[1] < height and
+            0 <= goal[0] < width and 0 <= goal[1] < height):
+        return None
+    stride = width + 2
+    s = (start[1]+1)*stride + start[0]+1
+    g = (goal[1]+1)*stride + goal[0]+1
+    gx = goal[0] + 1
+    gz = goal[1] + 1
+    open_set = [(abs(start[0]+1 - gx) + abs(start[1]+1 - gz), 0, s)]
+    came_from = {}
+    gscore = {s: 0}
+    closed = set()
+    while open_set:
+        _, cost, u = heapq.heappop(open_set)
+        if u == g:
+            path = [u]
+            while u in came_from:
+                u = came_from[u]
+                path.append(u)
+            path.reverse()
+            return [(c % stride - 1, c // stride - 1) for c in path]
+        if u in closed:
+            continue
+        closed.add(u)
+        ng = -cost + 1
+        for v in (u+1, u-1, u+stride, u-stride):
+            if free[v] and ng < gscore.get(v, 1e18):
+                gscore[v] = ng
+                came_from[v] = u
+                # empate no f: sai primeiro o de maior g
+                heapq.heappush(open_set, (ng + abs(v % stride - gx) + abs(v // stride - gz), -ng, v))
+    return None
@@ -0,0 +1,202 @@
+# ************************************************
+#   RegistroDeInimigos.py
+#   Define a classe RegistroDeInimigos: os inimigos guardados em
+#   arrays NumPy (estrutura de arrays: posicao, posicao anterior,
+#   celula do ponto de passagem atual, ultima celula do caminho,
+#   relogio de replanejamento, cor) e o passo de movimento de todos
+#   eles de uma vez (move).
+#
+#   Cada inimigo tem uma visao (InimigoDoRegistro) com os mesmos
+#   campos de Enemy: o codigo escalar (busca de caminho, linha de
+#   visao, desenho) funciona sem mudar, e ler/escrever e.x ou e.path
+#   le/escreve nos arrays.
+#   Os caminhos continuam listas Python; so o ponto de passagem
+#   atual fica nos arrays. Avancar no caminho e escalar, mas so para
+#   quem chegou no ponto naquele passo.
+# ************************************************
+
+import numpy as np
+
+""" Classe RegistroDeInimigos """
+class RegistroDeInimigos:
+    def __init__(self, capacity=16):
+        capacity = max(1, capacity)
+        self.n = 0
+        self.x = np.zeros(capacity)
+        self.z = np.zeros(capacity)
+        self.prev_x = np.zeros(capacity)
+        self.prev_z = np.zeros(capacity)
+        # célula do ponto de passagem atual (-1 = sem caminho)
+        self.wx = np.full(capacity, -1, dtype=np.int32)
+        self.wz = np.full(capacity, -1, dtype=np.int32)
+        # última célula do caminho (-1 = sem caminho)
+        self.gx = np.full(capacity, -1, dtype=np.int32)
+        self.gz = np.full(capacity, -1, dtype=np.int32)
+        self.timer = np.zeros(capacity)
+        # nível de detalhe (0 perto, 1 meio, 2 longe)
+        self.tier = np.zeros(capacity, dtype=np.int8)
+        self.colors = np.zeros((capacity, 3), dtype=np.float32)
+        self.paths = []
+        self.path_idx = []
+        self.views = []
+        # versão do campo de fluxo usada nos pontos de passagem
+        self.field_version = -1
+
+    def __len__(self):
+        return self.n
+
+    def clear(self):
+        self.n = 0
+        self.paths = []
+        self.path_idx = []
+        self.views = []
+        self.field_version = -1
+
+    def _grow(self):
+        cap = len(self.x) * 2
+        for name in ('x', 'z', 'prev_x', 'prev_z', 'wx', 'wz', 'gx', 'gz', 'timer', 'tier'):
+            setattr(self, name, np.resize(getattr(self, name), cap))
+        self.colors = np.resize(self.colors, (cap, 3))
+
+    """ Novo inimigo em (x, z); devolve a visão dele """
+    def add(self, x, z, color=(1.0, 0.0, 0.0), timer=0.0):
+        if self.n == len(self.x):
+            self._grow()
+        i = self.n
+        self.n += 1
+        self.x[i] = self.prev_x[i] = x
+        self.z[i] = self.prev_z[i] = z
+        self.wx[i] = self.wz[i] = self.gx[i] = self.gz[i] = -1
+        self.timer[i] = timer
+        self.tier[i] = 0
+        self.colors[i] = color
+        self.paths.append([])
+        self.path_idx.append(0)
+        view = InimigoDoRegistro(self, i)
+        self.views.append(view)
+        return view
+
+    """ Copia o ponto de passagem atual e o fim do caminho de i para os arrays """
+    def _refresh(self, i):
+        path = self.paths[i]
+        k = self.path_idx[i]
+        if path and k < len(path):
+            self.wx[i], self.wz[i] = path[k]
+            self.gx[i], self.gz[i] = path[-1]
+        else:
+            self.wx[i] = self.wz[i] = self.gx[i] = self.gz[i] = -1
+
+    """ Pontos de passagem sem caminho (campo de fluxo): o próximo passo
+        já é o fim; -1 = sem ponto """
+    def set_waypoints(self, idx, wx, wz):
+        self.wx[idx] = wx
+        self.wz[idx] = wz
+        self.gx[idx] = wx
+        self.gz[idx] = wz
+
+    """ Quem chegou no ponto de passagem segue para o próximo do caminho """
+    def advance(self, idx):
+        for i in idx:
+            self.path_idx[i] += 1
+            self._refresh(i)
+
+    def store_prev(self):
+        n = self.n
+        self.prev_x[:n] = self.x[:n]
+        self.prev_z[:n] = self.z[:n]
+
+    """ Células (x, z) de todos, como int(x), int(z) """
+    def cells(self):
+        n = self.n
+        return self.x[:n].astype(np.int64), self.z[:n].astype(np.int64)
+
+    """ Anda todos que têm ponto de passagem em direção a ele (velocidade
+        'speed'), com o teste de parede na grade 'passable' (z,x).
+        Quem chegou no ponto não anda neste passo; quem bateria na parede
+        fica parado e com o relógio zerado (replaneja).
+        Retorna os índices de quem chegou e de quem bateu. """
+    def move(self, dt, speed, passable):
+        n = self.n
+        x = self.x[:n]
+        z = self.z[:n]
+        active = self.wx[:n] >= 0
+        dx = self.wx[:n] + 0.5 - x
+        dz = self.wz[:n] + 0.5 - z
+        dist = np.sqrt(dx*dx + dz*dz)
+        arrived = active & (dist < 0.05)
+        go = np.flatnonzero(active & ~arrived)
+        # mesmas operações, na mesma ordem, do laço escalar (mesmo arredondamento)
+        vx = dx[go] / dist[go]
+        vz = dz[go] / dist[go]
+        nx = x[go] + vx * speed * dt
+        nz = z[go] + vz * speed * dt
+        # mesma célula de collides_with_wall: int() trunca
+        cx = nx.astype(np.int64)
+        cz = nz.astype(np.int64)
+        height, width = passable.shape
+        ok = (cx >= 0) & (cx < width) & (cz >= 0) & (cz < height)
+        ok[ok] = passable[cz[ok], cx[ok]]
+        moved = go[ok]
+        x[moved] = nx[ok]
+        z[moved] = nz[ok]
+        blocked = go[~ok]
+        self.timer[blocked] = 0.0
+        return np.flatnonzero(arrived), blocked
+
+def _array_field(name):
+    def get(self):
+        return float(getattr(self.store, name)[self.i])
+    def put(self, v):
+        getattr(self.store, name)[self.i] = v
+    return property(get, put)
+
+""" Classe InimigoDoRegistro: um inimigo do registro com a cara de Enemy """
+class InimigoDoRegistro:
+    __slots__ = ('store', 'i', 'y', 'field_version', 'planned_at', 'planner',
+                 'request_id', 'sight_checked', 'lod_time')
+
+    def __init__(self, store, i):
+        self.store = store
+        self.i = i
+        self.y = 0.0
+        self.field_version = -1
+        self.planned_at = None
+        self.planner = None
+        self.request_id = None
+        self.sight_checked = None
+        self.lod_time = 0.0
+
+    x = _array_field('x')
+    z = _array_field('z')
+    prev_x = _array_field('prev_x')
+    prev_z = _array_field('prev_z')
+    recalc_timer = _array_field('timer')
+
+    @property
+    def color(self):
+        return tuple(self.store.colors[self.i].tolist())
+
+    @color.setter
+    def color(self, c):
+        self.store.colors[self.i] = c
+
+    @property
+    def path(self):
+        return self.store.paths[self.i]
+
+    @path.setter
+    def path(self, path):
+        self.store.paths[self.i] = path
+        self.store._refresh(self.i)
+
+    @property
+    def path_idx(self):
+        return self.store.path_idx[self.i]
+
+    @path_idx.setter
+    def path_idx(self, k):
+        self.store.path_idx[self.i] = k
+        self.store._refresh(self.i)
+
+    def pos(self):
+        return (self.x, self.z)
@@ -0,0 +1,1263 @@
+# ************************************************
+#   Simulacao.py
+#   Estado e regras do jogo, sem OpenGL: mapa e indices derivados,
+#   jogador, inimigos, capsulas de energia, busca de caminhos e o
+#   passo da simulacao (step_simulation).
+#
+#   app.py desenha e le o teclado a partir deste estado; headless.py
+#   roda a mesma simulacao sem janela (testes de carga).
+#   O estado fica em variaveis do modulo: quem le de fora usa
+#   Simulacao.<nome>, porque trocar o mapa reatribui Cidade, QtdX...
+# ************************************************
+
+import os
+import time
+import atexit
+import random as ALE
+from math import sin, cos, radians, sqrt
+import heapq
+
+import numpy as np
+
+from GradeLabirinto import (GradeLabirinto, CELL_EMPTY, CELL_WALL_H, CELL_WALL_V,
+                            CELL_PLAYER, CELL_FIXED, CELL_WINDOW, CELL_DOOR)
+from GeradorVetorizado import generate_sparse_map_vectorized
+import CacheDeMapas
+from MundoEmChunks import MundoEmChunks
+from IndiceCelulasLivres import IndiceCelulasLivres
+from ObjetosFixos import ObjetosFixos, FIXED_TYPES
+from Componentes import ComponentesConexos
+from CampoDeFluxo import CampoDeFluxo
+from AgendadorDeCaminhos import AgendadorDeCaminhos
+from JumpPointSearch import JumpPointSearch
+from HPAStar import HPAStar
+from CacheDeCaminhos import CacheDeCaminhos
+from DStarLite import DStarLite, PlanoCaminhavel
+from TabelaProximoPasso import TabelaProximoPasso, table_key
+from HeuristicaALT import HeuristicaALT
+from AdjacenciaCSR import AdjacenciaCSR
+from PoolDeCaminhos import PoolDeCaminhos
+from LinhaDeVisao import line_of_sight, smooth_path
+from RegistroDeInimigos import RegistroDeInimigos
+from GradeEspacial import GradeEspacial, close_pairs
+import FormatoLabirinto
+
+MAP_SIZE = 80
+USE_EMBEDDED = True
+MAP_GENERATOR = 'python'
+MAP_SEED = None
+USE_MAP_CACHE = True
+MAP_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'map_cache')
+MAP_FILE = None
+CHUNKED_WORLD = False
+WORLD_SIZE = 10000
+CHUNK_SIZE = 64
+CHUNK_CACHE_SIZE = 256
+CHUNK_VIEW_RADIUS = 40
+CHUNK_SEARCH_MAX_NODES = 20000   # A* no mundo em chunks desiste depois de expandir isso
+WALL_PROB = 0.06
+NUM_CORRIDORS = 200
+CORRIDOR_WIDEN_RADIUS = 1
+
+MAX_DIM = 1000
+SIM_TICK_RATE = 60     # passos fixos de simulação por segundo
+PLAYER_SPEED = 6.0
+ENEMY_SPEED = 3.5
+PATH_RECALC_INTERVAL = 0.9
+PATHFINDING_MODE = 'astar'
+PATHFINDER = 'astar'
+HPA_CLUSTER_SIZE = 16
+PATH_CACHE_SIZE = 256
+NEXTHOP_MAX_CELLS = 8000
+USE_ALT_HEURISTIC = False
+ALT_LANDMARKS = 8
+PATH_BUDGET_MS = 2.0
+# orçamento em pedidos de caminho por passo, no lugar do tempo: o mesmo resultado
+# em qualquer máquina. None = usa PATH_BUDGET_MS (o LOD usa PATH_BUDGET_LOD)
+PATH_BUDGET_REQUESTS = None
+PATH_BUDGET_LOD = 16
+PATH_WORKERS = 0   # processos de busca de caminho (0 = busca no laço principal)
+SMOOTH_PATHS = True
+SMOOTH_PATH_CELLS = 8  # só o começo do caminho é suavizado (o inimigo replaneja antes do fim)
+LOS_CHASE_DIST = 20.0   # até essa distância, inimigo que vê o jogador vai em linha reta
+VECTOR_ENEMIES = False  # inimigos em arrays NumPy com movimento vetorizado (só mapa inteiro)
+ENEMY_SEPARATION = 0.6  # distância mínima entre inimigos (0 = podem se sobrepor)
+CONTACT_DIST = 0.6      # jogador encosta em inimigo ou cápsula
+# nível de detalhe da simulação dos inimigos por distância ao jogador
+LOD_ENEMIES = False
+LOD_NEAR_DIST = 16.0    # até aqui (ou vendo o jogador): todo passo
+LOD_FAR_DIST = 40.0     # além daqui: só segue o caminho que já tem, em passos grossos
+LOD_MID_EVERY = 4       # meio: atualiza a cada 4 passos (com o tempo acumulado)
+LOD_FAR_EVERY = 16
+MIN_FIXED_OBJECTS = 16
+MIN_ENEMIES = 12
+MIN_ENERGIES = 8
+
+Cidade = GradeLabirinto()
+QtdX = 0
+QtdZ = 0
+
+class Player:
+    def __init__(self, x=0.5, z=0.5):
+        self.x = x
+        self.z = z
+        # posição no passo anterior (interpolação do desenho)
+        self.prev_x = x
+        self.prev_z = z
+        self.y = 0.0
+        self.angle = 0.0
+        self.moving = False
+        self.energy = 100.0
+        self.score = 0
+    def forward_vector(self):
+        a = radians(self.angle)
+        return cos(a), -sin(a)
+
+player = Player()
+
+TIER_NEAR = 0
+TIER_MID = 1
+TIER_FAR = 2
+
+class Enemy:
+    def __init__(self, x,z):
+        self.x = x
+        self.z = z
+        self.prev_x = x
+        self.prev_z = z
+        self.y = 0.0
+        self.color = (1.0, 0.0, 0.0)
+        self.path = []
+        self.path_idx = 0
+        self.recalc_timer = 0.0
+        self.field_version = -1
+        self.planned_at = None
+        self.planner = None
+        self.request_id = None
+        self.sight_checked = None
+        # nível de detalhe e instante da última atualização
+        self.tier = TIER_NEAR
+        self.lod_time = 0.0
+    def pos(self):
+        return (self.x,self.z)
+
+fixed_objects = ObjetosFixos()
+enemies = []
+# arrays dos inimigos com VECTOR_ENEMIES (enemies tem as visões deles)
+enemy_store = RegistroDeInimigos()
+# hash espacial (por célula) dos inimigos e das cápsulas; id = índice na lista
+enemy_grid = GradeEspacial(0, 0)
+energy_grid = GradeEspacial(0, 0)
+energies = []
+free_index = IndiceCelulasLivres()
+components = None
+jps_search = None
+hpa_search = None
+dstar_plane = None
+nexthop_table = None
+alt_heuristic = None
+adjacency = None
+# plano (caminhável e passável) para os raios de linha de visão
+sight_plane = None
+sight_free = None
+flow_field = CampoDeFluxo()
+path_scheduler = AgendadorDeCaminhos(PATH_BUDGET_MS)
+path_cache = CacheDeCaminhos(PATH_CACHE_SIZE)
+path_pool = None
+# id do pedido no pool -> inimigo
+path_requests = {}
+# inimigos que foram direto até o jogador, sem busca de caminho
+los_chases = 0
+# buscas A* feitas no processo principal
+astar_calls = 0
+# passos e tempo simulados; inimigos por nível de detalhe (perto, meio, longe)
+sim_tick = 0
+sim_time = 0.0
+lod_counts = [0, 0, 0]
+mapa_janelas = {}
+
+def hsv_to_rgb(h, s, v):
+    i = int(h*6.0)
+    f = (h*6.0) - i
+    p = v * (1.0 - s)
+    q = v * (1.0 - f*s)
+    t = v * (1.0 - (1.0 - f) * s)
+    i = i % 6
+    if i == 0: r,g,b = v,t,p
+    elif i == 1: r,g,b = q,v,p
+    elif i == 2: r,g,b = p,v,t
+    elif i == 3: r,g,b = p,q,v
+    elif i == 4: r,g,b = t,p,v
+    else: r,g,b = v,p,q
+    return (r,g,b)
+
+def create_embedded_map_scaled(size=MAP_SIZE):
+    mat = [[0 for _ in range(size)] for __ in range(size)]
+    for x in range(size):
+        mat[0][x] = CELL_WALL_H
+        mat[size-1][x] = CELL_WALL_H
+    for z in range(size):
+        mat[z][0] = CELL_WALL_V
+        mat[z][size-1] = CELL_WALL_V
+    step = max(6, size // 10)
+    vertical_cols = list(range(step, size-step, step))
+    horizontal_rows = list(range(step, size-step, step))
+    for x in vertical_cols:
+        for z in range(2, size-2):
+            if (z % 7) != 0 and (z % 11) != 0:
+                mat[z][x] = CELL_WALL_V
+    for z in horizontal_rows:
+        for x in range(2, size-2):
+            if (x % 7) != 0 and (x % 11) != 0:
+                if mat[z][x] == 0:
+                    mat[z][x] = CELL_WALL_H
+    win_positions = [
+        (2,2),
+        (2, size-3),
+        (size-3,2),
+        (size-3,size-3),
+        (size//2,2),
+        (size//2,size-3),
+    ]
+    for (z,x) in win_positions:
+        if 0 <= z < size and 0 <= x < size:
+            mat[z][x] = CELL_WINDOW
+    fixed_positions = []
+    for rz in range(step//2, size-2, step*2):
+        for rx in range(step//2, size-2, step*2):
+            fixed_positions.append((rz, rx))
+    fixed_positions += [(max(3, size//5), max(3, size//5)),
+                        (max(5, size//3), max(6, size//4)),
+                        (size//2 + 3, size//2 - 4),
+                        (size//3, size//2 + 6)]
+    for (z,x) in fixed_positions:
+        if 0<=z<size and 0<=x<size and mat[z][x] == 0:
+            mat[z][x] = CELL_FIXED
+    c = size//2
+    mat[c][c] = CELL_PLAYER
+    return GradeLabirinto.from_matrix(mat)
+
+def generate_sparse_map_with_corridors(size=MAP_SIZE, wall_prob=WALL_PROB, n_corridors=NUM_CORRIDORS):
+    mat = [[1 for _ in range(size)] for __ in range(size)]
+    for z in range(1, size-1):
+        for x in range(1, size-1):
+            mat[z][x] = 1 if (ALE.random() < wall_prob and ALE.random() < 0.9) else 0
+    for x in range(size):
+        mat[0][x] = CELL_WALL_H
+        mat[size-1][x] = CELL_WALL_H
+    for z in range(size):
+        mat[z][0] = CELL_WALL_V
+        mat[z][size-1] = CELL_WALL_V
+    center = size//2
+    if mat[center][center] != 0:
+        found = False
+        for r in range(1, size//2):
+            for dz in range(-r, r+1):
+                for dx in range(-r, r+1):
+                    x = center + dx
+                    z = center + dz
+                    if 0 <= x < size and 0 <= z < size and mat[z][x] == 0:
+                        mat[z][x] = CELL_PLAYER
+                        found = True
+                        break
+                if found: break
+            if found: break
+        if not found:
+            mat[center][center] = CELL_PLAYER
+    else:
+        mat[center][center] = CELL_PLAYER
+    free_cells = [(x,z) for z in range(1,size-1) for x in range(1,size-1) if mat[z][x] == 0 or mat[z][x] == CELL_PLAYER]
+    if len(free_cells) < 2:
+        for z in range(1,size-1):
+            for x in range(1,size-1):
+                if ALE.random() < 0.02:
+                    mat[z][x] = 0
+        free_cells = [(x,z) for z in range(1,size-1) for x in range(1,size-1) if mat[z][x] == 0 or mat[z][x] == CELL_PLAYER]
+    def carve_path(a,b):
+        x,y = a
+        tx,ty = b
+        attempts = 0
+        while (x,y) != (tx,ty) and attempts < (abs(tx-x)+abs(ty-y))*4 + 50:
+            attempts += 1
+            mat[y][x] = 0
+            dx = tx - x
+            dy = ty - y
+            if dx != 0 and dy != 0:
+                if ALE.random() < 0.6:
+                    x += 1 if dx>0 else -1
+                else:
+                    y += 1 if dy>0 else -1
+            elif dx != 0:
+                x += 1 if dx>0 else -1
+            elif dy != 0:
+                y += 1 if dy>0 else -1
+            mat[y][x] = 0
+    if free_cells:
+        for i in range(n_corridors):
+            a = ALE.choice(free_cells)
+            b = ALE.choice(free_cells)
+            if a != b:
+                carve_path(a,b)
+    for z in range(1,size-1):
+        for x in range(1,size-1):
+            if mat[z][x] != 0 and mat[z][x] != CELL_PLAYER:
+                up = (0 <= z-1 < size and mat[z-1][x] == 0)
+                down = (0 <= z+1 < size and mat[z+1][x] == 0)
+                left = (0 <= x-1 < size and mat[z][x-1] == 0)
+                right = (0 <= x+1 < size and mat[z][x+1] == 0)
+                if (left or right) and not (up or down):
+                    mat[z][x] = CELL_WALL_V
+                elif (up or down) and not (left or right):
+                    mat[z][x] = CELL_WALL_H
+                else:
+                    mat[z][x] = CELL_WALL_H if ALE.random() < 0.5 else CELL_WALL_V
+    return GradeLabirinto.from_matrix(mat)
+
+def map_generator_name():
+    return 'embedded' if USE_EMBEDDED else MAP_GENERATOR
+
+def generate_and_setup_map(seed=None):
+    global Cidade, QtdX, QtdZ, fixed_objects, mapa_janelas
+    if seed is None:
+        seed = MAP_SEED
+    if MAP_FILE:
+        CarregaLabirintoFromFile(MAP_FILE)
+        return
+    if CHUNKED_WORLD:
+        setup_chunked_world(seed)
+        return
+    key = path = None
+    if seed is not None and USE_MAP_CACHE:
+        key = CacheDeMapas.cache_key(map_generator_name(), MAP_SIZE, WALL_PROB, NUM_CORRIDORS,
+                                     CORRIDOR_WIDEN_RADIUS, MIN_FIXED_OBJECTS, seed)
+        path = CacheDeMapas.cache_path(key, MAP_CACHE_DIR)
+        cached = CacheDeMapas.load_map_cache(path, key)
+        if cached is not None:
+            Cidade, fixed_objects, mapa_janelas = cached
+            QtdZ = Cidade.height
+            QtdX = Cidade.width
+            rebuild_map_indexes()
+            for (x,z) in Cidade.cells_of(CELL_PLAYER):
+                player.x = x+0.5
+                player.z = z+0.5
+            print(f"Mapa carregado do cache: {QtdX}x{QtdZ} seed={seed} ({path})")
+            seed_entities(seed)
+            return
+    if seed is not None:
+        ALE.seed(seed)
+    if USE_EMBEDDED:
+        Cidade = create_embedded_map_scaled(MAP_SIZE)
+    elif MAP_GENERATOR == 'numpy':
+        Cidade = generate_sparse_map_vectorized(MAP_SIZE, WALL_PROB, NUM_CORRIDORS, seed=seed)
+    else:
+        Cidade = generate_sparse_map_with_corridors(MAP_SIZE, WALL_PROB, NUM_CORRIDORS)
+    QtdZ = Cidade.height
+    QtdX = Cidade.width
+    rebuild_map_indexes()
+    rebuild_fixed_and_windows_from_map()
+    ensure_min_fixed_objects(MIN_FIXED_OBJECTS)
+    print(f"Mapa pronto: {QtdX}x{QtdZ} (embedded={USE_EMBEDDED}, generator={MAP_GENERATOR}, seed={seed})")
+    if path is not None:
+        CacheDeMapas.save_map_cache(path, key, Cidade, fixed_objects, mapa_janelas)
+    if seed is not None:
+        seed_entities(seed)
+
+""" Semente do sorteio das entidades, o mesmo com ou sem cache. Derivada da do
+    mapa, e não a mesma: repetir a semente repetiria os sorteios do mapa e os
+    inimigos cairiam nas células que viraram objetos fixos. """
+def seed_entities(seed):
+    ALE.seed(f"{seed}/entidades")
+
+def setup_chunked_world(seed):
+    global Cidade, QtdX, QtdZ
+    if seed is None:
+        seed = ALE.randrange(2**31)
+    ALE.seed(seed)
+    Cidade = MundoEmChunks(WORLD_SIZE, WORLD_SIZE, seed, CHUNK_SIZE, CHUNK_CACHE_SIZE, WALL_PROB)
+    QtdZ = Cidade.height
+    QtdX = Cidade.width
+    px, pz = Cidade.player_cell
+    Cidade.preload_around(px, pz, CHUNK_VIEW_RADIUS)
+    rebuild_map_indexes()
+    rebuild_fixed_and_windows_from_map()
+    ensure_min_fixed_objects(MIN_FIXED_OBJECTS)
+    print(f"Mundo em chunks: {QtdX}x{QtdZ}, chunk={CHUNK_SIZE}, seed={seed}, carregados={Cidade.loaded}")
+    seed_entities(seed)
+
+def rebuild_map_indexes(previous_walkable=None):
+    global free_index, components, jps_search, hpa_search, dstar_plane, nexthop_table, alt_heuristic
+    global adjacency, path_pool, sight_plane, sight_free
+    free_index = IndiceCelulasLivres.from_ids(Cidade.clear_ids(), Cidade.width, Cidade.height,
+                                              sparse=CHUNKED_WORLD)
+    # no mundo em chunks não há grade inteira para rotular
+    adjacency = None if CHUNKED_WORLD else AdjacenciaCSR(Cidade.walkable)
+    if CHUNKED_WORLD:
+        sight_plane = None
+        sight_free = is_cell_clear
+    else:
+        sight_plane = PlanoCaminhavel(Cidade.walkable & Cidade.passable)
+        sight_free = plane_test(sight_plane)
+    components = None if CHUNKED_WORLD else ComponentesConexos(Cidade.walkable)
+    jps_search = JumpPointSearch(Cidade.walkable) if PATHFINDER == 'jps' and jps_fits_map() else None
+    hpa_search = HPAStar(Cidade.walkable, HPA_CLUSTER_SIZE) if PATHFINDER == 'hpa' and not CHUNKED_WORLD else None
+    dstar_plane = PlanoCaminhavel(Cidade.walkable) if PATHFINDER == 'dstar' and not CHUNKED_WORLD else None
+    nexthop_table = load_or_build_nexthop() if PATHFINDER == 'nexthop' and not CHUNKED_WORLD else None
+    alt_heuristic = load_or_build_alt() if USE_ALT_HEURISTIC and not CHUNKED_WORLD else None
+    if use_path_pool():
+        if path_pool is None:
+            path_pool = PoolDeCaminhos(PATH_WORKERS)
+            atexit.register(path_pool.close)
+        path_pool.set_map(Cidade.walkable)
+    if previous_walkable is not None and previous_walkable is not Cidade.walkable \
+       and previous_walkable.shape == Cidade.walkable.shape:
+        changed = GradeLabirinto.cells_where(previous_walkable != Cidade.walkable)
+        path_cache.invalidate_cells(changed)
+        path_cache.invalidate_opened([c for c in changed if Cidade.walkable[c[1], c[0]]])
+    else:
+        path_cache.clear()
+    flow_field.invalidate()
+
+""" JPS só onde não perde para o a_star (CSR): nos mapas gerados as paredes
+    soltas dão vizinho forçado em quase toda linha e o JPS fica mais lento """
+def jps_fits_map():
+    if CHUNKED_WORLD:
+        return False
+    if not MAP_FILE and not USE_EMBEDDED:
+        print("JPS: mapa gerado (paredes espalhadas) é mais lento que o a_star, usando a_star")
+        return False
+    return True
+
+def load_or_build_nexthop():
+    n = int(np.count_nonzero(Cidade.walkable))
+    if n > NEXTHOP_MAX_CELLS:
+        print(f"Tabela de próximo passo: {n} células caminháveis (máximo {NEXTHOP_MAX_CELLS}), usando a_star")
+        return None
+    base = index_cache_base(table_key(Cidade.walkable))
+    table = TabelaProximoPasso.load(base) if USE_MAP_CACHE else None
+    if table is not None:
+        print(f"Tabela de próximo passo carregada: {base}.npy ({table.nbytes/1e6:.1f} MB)")
+        return table
+    t0 = time.perf_counter()
+    table = TabelaProximoPasso.build(Cidade.walkable)
+    print(f"Tabela de próximo passo: {n} células, {table.nbytes/1e6:.1f} MB em {time.perf_counter()-t0:.2f}s")
+    if USE_MAP_CACHE:
+        os.makedirs(os.path.dirname(base), exist_ok=True)
+        table.save(base)
+    return table
+
+def load_or_build_alt():
+    path = index_cache_base(f"marcos{ALT_LANDMARKS}_{CacheDeMapas.walkable_digest(Cidade.walkable)}") + '.npz'
+    alt = HeuristicaALT.load(path, Cidade.walkable.shape, ALT_LANDMARKS) if USE_MAP_CACHE else None
+    if alt is not None:
+        return alt
+    t0 = time.perf_counter()
+    # marcos na maior componente
+    labels = components.labels.ravel()
+    counts = np.bincount(labels)
+    counts[0] = 0
+    seed_cell = None
+    if counts.max() > 0:
+        cid = int(np.flatnonzero(labels == np.argmax(counts))[0])
+        seed_cell = (cid % Cidade.width, cid // Cidade.width)
+    alt = HeuristicaALT.build(Cidade.walkable, ALT_LANDMARKS, seed_cell)
+    print(f"Heurística ALT: {len(alt.landmarks)} marcos em {time.perf_counter()-t0:.2f}s")
+    if USE_MAP_CACHE:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        alt.save(path)
+    return alt
+
+""" Índices derivados do mapa ficam junto do arquivo do mapa (ou no cache de mapas) """
+def index_cache_base(key):
+    folder = os.path.dirname(os.path.abspath(MAP_FILE)) if MAP_FILE else MAP_CACHE_DIR
+    return os.path.join(folder, key)
+
+def on_cells_changed(cells):
+    global components, alt_heuristic
+    if cells:
+        flow_field.invalidate()
+        if adjacency is not None:
+            adjacency.update(cells, Cidade.walkable)
+        if path_pool is not None:
+            path_pool.update(cells, Cidade.walkable)
+        if sight_plane is not None:
+            for (x,z) in cells:
+                sight_plane.free[sight_plane.id_of((x,z))] = 1 if is_cell_clear(x,z) else 0
+        if jps_search is not None:
+            jps_search.update(cells, Cidade.walkable)
+        if hpa_search is not None:
+            hpa_search.update(cells)
+        if nexthop_table is not None and nexthop_table.valid:
+            if not nexthop_table.check_cells(cells, Cidade.walkable):
+                print("Tabela de próximo passo invalidada (célula bloqueada), usando a_star")
+        if dstar_plane is not None:
+            dstar_plane.update(cells, Cidade.walkable)
+            for e in enemies:
+                if e.planner is not None:
+                    e.planner.notify(cells)
+        path_cache.invalidate_cells(cells)
+        path_cache.invalidate_opened([c for c in cells if Cidade.is_walkable(c[0], c[1])])
+    for (x,z) in cells:
+        if is_cell_clear(x,z):
+            free_index.add((x,z))
+        else:
+            free_index.discard((x,z))
+        if Cidade.get(x,z) == CELL_FIXED:
+            if (x,z) not in fixed_objects:
+                fixed_objects.add(x, z, ALE.choice(FIXED_TYPES))
+        elif (x,z) in fixed_objects:
+            fixed_objects.remove(x, z)
+    if components is not None and not components.update(cells, Cidade.walkable):
+        components = ComponentesConexos(Cidade.walkable)
+    if alt_heuristic is not None and cells and not alt_heuristic.update(cells, Cidade.walkable):
+        alt_heuristic = load_or_build_alt()
+
+def rebuild_fixed_and_windows_from_map():
+    global fixed_objects, mapa_janelas
+    fixed = Cidade.cells_of(CELL_FIXED)
+    fixed_objects = ObjetosFixos(len(fixed))
+    mapa_janelas = {}
+    for (x,z) in fixed:
+        fixed_objects.add(x, z, ALE.choice(FIXED_TYPES))
+    for (x,z) in Cidade.cells_of(CELL_WINDOW):
+        mapa_janelas[(z,x)] = 1.0
+    for (x,z) in Cidade.cells_of(CELL_PLAYER):
+        player.x = x+0.5
+        player.z = z+0.5
+
+def ensure_min_fixed_objects(n=MIN_FIXED_OBJECTS):
+    current = Cidade.count(CELL_FIXED)
+    need = max(0, n - current)
+    if need == 0:
+        return
+    free = free_index.sample_distinct(need, exclude=set(Cidade.cells_of(CELL_PLAYER)))
+    placed = []
+    while need > 0 and free:
+        x,z = free.pop()
+        Cidade.set(x, z, CELL_FIXED)
+        placed.append((x,z))
+        need -= 1
+    added = len(placed)
+    on_cells_changed(placed)
+    print(f"Objetos fixos adicionados: {added}")
+
+
+def is_cell_walkable(x,z):
+    return Cidade.is_walkable(x,z)
+
+""" Célula em que o inimigo anda em linha reta sem bater (caminhável e passável) """
+def is_cell_clear(x,z):
+    return Cidade.is_walkable(x,z) and Cidade.is_passable(x,z)
+
+""" is_free(x, z) sobre o plano com borda (os raios não saem mais de uma célula do mapa) """
+def plane_test(plane):
+    free = plane.free
+    stride = plane.stride
+    return lambda x, z: free[(z+1)*stride + x+1]
+
+def sees_player(e, pl_cell):
+    # raio já testado (e bloqueado) com o inimigo e o jogador nas mesmas células
+    key = (int(e.x), int(e.z), pl_cell)
+    if e.sight_checked == key:
+        return False
+    tx = pl_cell[0] + 0.5
+    tz = pl_cell[1] + 0.5
+    if distance(e.x, e.z, tx, tz) <= LOS_CHASE_DIST and line_of_sight(sight_free, e.x, e.z, tx, tz):
+        return True
+    e.sight_checked = key
+    return False
+
+def neighbors_of(cell):
+    x,z = cell
+    nbrs = [(x+1,z),(x-1,z),(x,z+1),(x,z-1)]
+    return [(nx,nz) for (nx,nz) in nbrs if 0 <= nx < QtdX and 0 <= nz < QtdZ and is_cell_walkable(nx,nz)]
+
+def heuristic(a,b):
+    return abs(a[0]-b[0]) + abs(a[1]-b[1])
+
+""" Heurística h(i) até goal sobre ids planos (x + z*width) """
+def goal_heuristic(goal):
+    if alt_heuristic is not None:
+        return alt_heuristic.to_goal(goal)
+    width = adjacency.width
+    gx, gz = goal
+    return lambda i: abs(i % width - gx) + abs(i // width - gz)
+
+def a_star(start, goal, stats=None):
+    global astar_calls
+    astar_calls += 1
+    if start == goal:
+        return [start]
+    if components is not None and not components.maybe_connected(start, goal):
+        return None
+    if adjacency is None:
+        return a_star_cells(start, goal, stats)
+    width = adjacency.width
+    if not (0 <= start[0] < width and 0 <= goal[0] < width and
+            0 <= start[1] < adjacency.height and 0 <= goal[1] < adjacency.height):
+        return None
+    s = start[0] + start[1]*width
+    g = goal[0] + goal[1]*width
+    nbr = adjacency.nbr
+    deg = adjacency.deg
+    h = goal_heuristic(goal)
+    open_set = []
+    heapq.heappush(open_set, (h(s), 0, s))
+    came_from = {}
+    gscore = {s: 0}
+    visited = set()
+    expanded = 0
+    try:
+        while open_set:
+            _, _, current = heapq.heappop(open_set)
+            if current == g:
+                path = [current]
+                while current in came_from:
+                    current = came_from[current]
+                    path.append(current)
+                path.reverse()
+                return [(i % width, i // width) for i in path]
+            visited.add(current)
+            expanded += 1
+            tentative_g = gscore[current] + 1
+            base = 4 * current
+            for j in range(base, base + deg[current]):
+                nb = nbr[j]
+                if nb in visited and tentative_g >= gscore.get(nb, 1e9):
+                    continue
+                if tentative_g < gscore.get(nb, 1e9):
+                    came_from[nb] = current
+                    gscore[nb] = tentative_g
+                    # empate no f: sai primeiro o de maior g (mais perto do objetivo)
+                    heapq.heappush(open_set, (tentative_g + h(nb), -tentative_g, nb))
+        return None
+    finally:
+        if stats is not None:
+            stats['expanded'] = stats.get('expanded', 0) + expanded
+
+""" A* sobre células (x,z) com neighbors_of: mundo em chunks, sem grade inteira.
+    Sem componentes conexos para saber de antemão se o alvo é alcançável:
+    desiste (None) depois de CHUNK_SEARCH_MAX_NODES expansões. """
+def a_star_cells(start, goal, stats=None):
+    open_set = []
+    heapq.heappush(open_set, (heuristic(start, goal), 0, start))
+    came_from = {}
+    gscore = {start: 0}
+    visited = set()
+    expanded = 0
+    try:
+        while open_set:
+            _, _, current = heapq.heappop(open_set)
+            if current == goal:
+                path = [current]
+                while current in came_from:
+                    current = came_from[current]
+                    path.append(current)
+                path.reverse()
+                return path
+            visited.add(current)
+            expanded += 1
+            if expanded > CHUNK_SEARCH_MAX_NODES:
+                return None
+            for nb in neighbors_of(current):
+                tentative_g = gscore[current] + 1
+                if nb in visited and tentative_g >= gscore.get(nb, 1e9):
+                    continue
+                if tentative_g < gscore.get(nb, 1e9):
+                    came_from[nb] = current
+                    gscore[nb] = tentative_g
+                    heapq.heappush(open_set, (tentative_g + heuristic(nb, goal), -tentative_g, nb))
+        return None
+    finally:
+        if stats is not None:
+            stats['expanded'] = stats.get('expanded', 0) + expanded
+
+def plan_enemy_path(e):
+    e.recalc_timer = PATH_RECALC_INTERVAL
+    e.planned_at = path_scheduler.clock
+    start = (int(e.x), int(e.z))
+    goal = (int(player.x), int(player.z))
+    if PATHFINDER == 'dstar' and dstar_plane is not None:
+        path = plan_with_dstar(e, start, goal)
+    else:
+        path = find_path(start, goal)
+    set_enemy_path(e, path)
+
+def set_enemy_path(e, path):
+    if path:
+        if SMOOTH_PATHS and len(path) > 2:
+            # o primeiro passo fica inteiro: o inimigo não está no centro da célula
+            path = path[:1] + smooth_path(sight_free, path[1:], limit=SMOOTH_PATH_CELLS)
+        e.path = path
+        e.path_idx = 1 if len(path) > 1 else 0
+    else:
+        e.path = []
+        e.path_idx = 0
+
+def path_budget_requests():
+    if PATH_BUDGET_REQUESTS is not None:
+        return PATH_BUDGET_REQUESTS
+    return PATH_BUDGET_LOD if LOD_ENEMIES else None
+
+def use_path_pool():
+    return PATH_WORKERS > 0 and not CHUNKED_WORLD and PATHFINDER != 'dstar'
+
+""" Pede o caminho ao pool; enquanto não chega, o inimigo segue o caminho antigo """
+def request_pool_path(e, start, goal):
+    if e.request_id is not None:
+        return
+    e.recalc_timer = PATH_RECALC_INTERVAL
+    if components is not None and not components.maybe_connected(start, goal):
+        set_enemy_path(e, None)
+        return
+    path = path_cache.get(start, goal) if PATH_CACHE_SIZE else None
+    if path is not None:
+        set_enemy_path(e, path)
+        return
+    e.request_id = path_pool.submit(start, goal)
+    path_requests[e.request_id] = e
+
+def deliver_pool_paths():
+    for rid, path, stale in path_pool.poll():
+        e = path_requests.pop(rid, None)
+        if e is None:
+            continue
+        e.request_id = None
+        if stale:
+            continue
+        if path and PATH_CACHE_SIZE:
+            path_cache.put(path)
+        # o inimigo andou desde o pedido: segue a partir da célula atual
+        cell = (int(e.x), int(e.z))
+        if path and cell in path:
+            set_enemy_path(e, path[path.index(cell):])
+        elif not path:
+            set_enemy_path(e, None)
+
+def plan_with_dstar(e, start, goal):
+    if components is not None and not components.maybe_connected(start, goal):
+        return None
+    if e.planner is None or e.planner.plane is not dstar_plane:
+        e.planner = DStarLite(dstar_plane)
+    return e.planner.plan(start, goal)
+
+def use_flow_field():
+    return PATHFINDING_MODE == 'flowfield' and not CHUNKED_WORLD
+
+def update_flow_field(pl_cell):
+    if not flow_field.needs_update(pl_cell):
+        return
+    if use_enemy_store():
+        cx, cz = enemy_store.cells()
+        targets = np.stack([cx, cz], axis=1)
+        if components is not None:
+            label = components.label_at(pl_cell[0], pl_cell[1])
+            targets = targets[components.labels[cz, cx] == label]
+    else:
+        targets = [(int(e.x), int(e.z)) for e in enemies]
+        if components is not None:
+            label = components.label_at(pl_cell[0], pl_cell[1])
+            targets = [c for c in targets if components.label_at(c[0], c[1]) == label]
+    flow_field.build(Cidade.walkable, pl_cell, targets)
+
+def follow_flow_field(e, ex_cell):
+    if e.field_version == flow_field.version and e.path and e.path_idx < len(e.path):
+        return
+    e.field_version = flow_field.version
+    if flow_field.dist_at(ex_cell[0], ex_cell[1]) == 0:
+        e.path = [ex_cell]
+        e.path_idx = 0
+        return
+    nxt = flow_field.next_step(ex_cell)
+    if nxt is not None:
+        e.path = [ex_cell, nxt]
+        e.path_idx = 1
+        return
+    e.path = []
+    e.path_idx = 0
+    # inimigo alcançável mas fora do trecho que a BFS percorreu
+    if flow_field.dist_at(ex_cell[0], ex_cell[1]) < 0 and is_cell_walkable(ex_cell[0], ex_cell[1]):
+        if components is None or components.maybe_connected(ex_cell, flow_field.goal):
+            flow_field.invalidate()
+
+""" follow_flow_field para todos os inimigos do registro (cx, cz = células):
+    recalcula o ponto de passagem de quem está sem ponto, ou de todos se o campo mudou """
+def follow_flow_field_store(cx, cz):
+    store = enemy_store
+    if store.field_version != flow_field.version:
+        store.field_version = flow_field.version
+        idx = np.arange(len(store))
+    else:
+        idx = np.flatnonzero(store.wx[:len(store)] < 0)
+    if len(idx) == 0:
+        return
+    xs = cx[idx]
+    zs = cz[idx]
+    nx, nz = flow_field.next_steps(xs, zs)
+    store.set_waypoints(idx, nx, nz)
+    # inimigo alcançável mas fora do trecho que a BFS percorreu
+    lost = np.flatnonzero((nx < 0) & (flow_field.padded[zs+1, xs+1] < 0) & Cidade.walkable[zs, xs])
+    for k in lost.tolist():
+        cell = (int(xs[k]), int(zs[k]))
+        if components is None or components.maybe_connected(cell, flow_field.goal):
+            flow_field.invalidate()
+            break
+
+""" O cache supõe caminhos mínimos (reuso de sufixos, invalidate_opened);
+    o HPA* não garante isso, então com ele as buscas não passam pelo cache """
+def use_path_cache():
+    return PATH_CACHE_SIZE > 0 and not (PATHFINDER == 'hpa' and hpa_search is not None)
+
+def find_path(start, goal):
+    cached = use_path_cache()
+    if cached:
+        path = path_cache.get(start, goal)
+        if path is not None:
+            return path
+    path = search_path(start, goal)
+    if path and cached:
+        path_cache.put(path)
+    return path
+
+def search_path(start, goal):
+    if (PATHFINDER == 'nexthop' and nexthop_table is not None and nexthop_table.valid
+            and nexthop_table.knows(start) and nexthop_table.knows(goal)):
+        path = nexthop_table.path(start, goal)
+        # paredes abertas depois do build podem ligar o que a tabela não liga
+        # ou encurtar o caminho dela: nesses casos a busca é com a_star
+        if path is None:
+            if not nexthop_table.stale:
+                return None
+        elif nexthop_table.still_shortest(path):
+            return path
+    if PATHFINDER == 'jps' and jps_search is not None:
+        if components is not None and not components.maybe_connected(start, goal):
+            return None
+        return jps_search.find(start, goal)
+    if PATHFINDER == 'hpa' and hpa_search is not None and is_cell_walkable(*start):
+        if components is not None and not components.maybe_connected(start, goal):
+            return None
+        return hpa_search.find(start, goal)
+    return a_star(start, goal)
+
+def widen_corridor_around(cx, cz, radius=CORRIDOR_WIDEN_RADIUS):
+    global Cidade, QtdX, QtdZ
+    if QtdX == 0 or QtdZ == 0:
+        return []
+    ix = int(cx)
+    iz = int(cz)
+    changed = Cidade.clear_walls(ix-radius, iz-radius, ix+radius+1, iz+radius+1)
+    if changed:
+        on_cells_changed(changed)
+    return changed
+
+def player_component_label():
+    # o jogador abre as paredes em volta ao andar: as componentes vizinhas
+    # passam a ser dele no primeiro passo; fica com a maior delas
+    px, pz = int(player.x), int(player.z)
+    r = CORRIDOR_WIDEN_RADIUS + 1
+    best = 0
+    best_size = 0
+    for label in components.labels_near(px, pz, r):
+        size = components.size_of(label)
+        if size > best_size:
+            best, best_size = label, size
+    return best
+
+def sample_player_component(k, exclude=()):
+    label = 0
+    if components is not None:
+        label = player_component_label()
+    if label == 0:
+        return free_index.sample_distinct(k, exclude=exclude)
+    return components.sample_in(label, k, exclude, ALE, allowed=Cidade.passable)
+
+def use_enemy_store():
+    return VECTOR_ENEMIES and not CHUNKED_WORLD
+
+def spawn_random_entities(min_enemies=MIN_ENEMIES, min_energies=MIN_ENERGIES):
+    global enemy_grid, energy_grid
+    enemies.clear()
+    enemy_store.clear()
+    energies.clear()
+    path_scheduler.clear()
+    path_requests.clear()
+    if path_pool is not None:
+        path_pool.clear()
+    player_cell = (int(player.x), int(player.z))
+    free_cells = sample_player_component(min_enemies, exclude={player_cell})
+    for i in range(min_enemies):
+        if not free_cells:
+            break
+        x,z = free_cells.pop()
+        e = enemy_store.add(x+0.5, z+0.5) if use_enemy_store() else Enemy(x+0.5, z+0.5)
+        e.color = hsv_to_rgb(ALE.random(), 0.85, 0.9)
+        e.path = []
+        e.path_idx = 0
+        e.recalc_timer = ALE.random()*PATH_RECALC_INTERVAL
+        e.lod_time = sim_time
+        enemies.append(e)
+    enemy_grid = GradeEspacial(QtdX, QtdZ)
+    update_enemy_grid()
+    occupied = set((int(en.x), int(en.z)) for en in enemies)
+    free_cells = sample_player_component(min_energies, exclude=occupied)
+    for i in range(min_energies):
+        if not free_cells:
+            break
+        x,z = free_cells.pop()
+        energies.append([x+0.5, z+0.5])
+    energy_grid = GradeEspacial(QtdX, QtdZ)
+    for i, cap in enumerate(energies):
+        energy_grid.move(i, cap[0], cap[1])
+    if len(fixed_objects) < MIN_FIXED_OBJECTS:
+        ensure_min_fixed_objects(MIN_FIXED_OBJECTS)
+    print(f"Spawn final: enemies={len(enemies)}, energies={len(energies)}, fixed={len(fixed_objects)}")
+
+""" Pede um caminho novo para o inimigo (ou vai direto se vê o jogador) """
+def replan_enemy(e, ex_cell, pl_cell, pool):
+    global los_chases
+    if LOS_CHASE_DIST > 0 and sees_player(e, pl_cell):
+        # jogador à vista: vai direto, sem A*
+        e.path = [ex_cell, pl_cell]
+        e.path_idx = 1
+        e.recalc_timer = PATH_RECALC_INTERVAL
+        path_scheduler.cancel(e)
+        los_chases += 1
+    elif pool:
+        request_pool_path(e, ex_cell, pl_cell)
+    else:
+        path_scheduler.request(e, distance(player.x, player.z, e.x, e.z), e.planned_at)
+
+""" Inimigo sem caminho: de vez em quando reaparece numa célula livre qualquer """
+def wander(e):
+    if ALE.random() < 0.01:
+        cell = free_index.sample()
+        if cell:
+            fx,fz = cell
+            e.x = fx + 0.5
+            e.z = fz + 0.5
+
+""" Inimigos do registro: replanejamento escalar só para quem precisa,
+    movimento vetorizado para todos """
+def step_enemy_store(dt, flow, pool):
+    store = enemy_store
+    n = len(store)
+    if n == 0:
+        return
+    timer = store.timer[:n]
+    timer -= dt
+    pl_cell = (int(player.x), int(player.z))
+    cx, cz = store.cells()
+    if flow:
+        follow_flow_field_store(cx, cz)
+    else:
+        need = ((timer <= 0.0) | (store.wx[:n] < 0) |
+                (store.gx[:n] != pl_cell[0]) | (store.gz[:n] != pl_cell[1]))
+        if LOD_ENEMIES:
+            # longe: só replaneja quando o caminho acaba
+            need = lod_due_store(n) & np.where(store.tier[:n] == TIER_FAR, store.wx[:n] < 0, need)
+        for i in np.flatnonzero(need).tolist():
+            replan_enemy(enemies[i], (int(cx[i]), int(cz[i])), pl_cell, pool)
+    for i in np.flatnonzero(store.wx[:n] < 0).tolist():
+        wander(enemies[i])
+    arrived, _ = store.move(dt, ENEMY_SPEED, Cidade.passable)
+    if flow:
+        # o próximo passo sai do campo no passo seguinte
+        store.wx[arrived] = -1
+    else:
+        store.advance(arrived.tolist())
+    if LOD_ENEMIES:
+        retier_store(np.flatnonzero(lod_due_store(n)))
+        lod_counts[:] = np.bincount(store.tier[:n], minlength=3).tolist()
+
+def lod_every(tier):
+    return (1, LOD_MID_EVERY, LOD_FAR_EVERY)[tier]
+
+""" O inimigo i é atualizado neste passo? Perto: sempre; meio e longe: a
+    cada lod_every passos, escalonados pelo índice (não todos no mesmo passo) """
+def lod_due(e, i):
+    every = lod_every(e.tier)
+    return every == 1 or (sim_tick + i) % every == 0
+
+def lod_due_store(n):
+    every = np.array([1, LOD_MID_EVERY, LOD_FAR_EVERY])[enemy_store.tier[:n]]
+    return (sim_tick + np.arange(n)) % every == 0
+
+def player_visible_from(x, z):
+    return line_of_sight(sight_free, x, z, player.x, player.z)
+
+""" Nível pela distância ao jogador; no meio, quem vê o jogador fica perto """
+def enemy_tier(e):
+    d = distance(player.x, player.z, e.x, e.z)
+    if d <= LOD_NEAR_DIST:
+        return TIER_NEAR
+    if d > LOD_FAR_DIST:
+        return TIER_FAR
+    return TIER_NEAR if player_visible_from(e.x, e.z) else TIER_MID
+
+def retier_store(idx):
+    store = enemy_store
+    x = store.x[idx]
+    z = store.z[idx]
+    d = np.sqrt((x - player.x)**2 + (z - player.z)**2)
+    tier = np.where(d <= LOD_NEAR_DIST, TIER_NEAR, np.where(d > LOD_FAR_DIST, TIER_FAR, TIER_MID))
+    for k in np.flatnonzero(tier == TIER_MID).tolist():
+        if player_visible_from(x[k], z[k]):
+            tier[k] = TIER_NEAR
+    store.tier[idx] = tier
+
+""" Passo grosso (meio e longe): anda 'dt' acumulado de uma vez pelo caminho,
+    sem passar dos pontos de passagem. Longe só replaneja quando o caminho acaba. """
+def step_enemy_coarse(e, dt, flow, pool, pl_cell):
+    e.recalc_timer -= dt
+    ex_cell = (int(e.x), int(e.z))
+    exhausted = not e.path or e.path_idx >= len(e.path)
+    if flow:
+        follow_flow_field(e, ex_cell)
+    elif exhausted or (e.tier != TIER_FAR and (e.recalc_timer <= 0.0 or e.path[-1] != pl_cell)):
+        replan_enemy(e, ex_cell, pl_cell, pool)
+    if e.path and e.path_idx < len(e.path):
+        walk_path(e, ENEMY_SPEED * dt, flow)
+    else:
+        wander(e)
+
+""" Anda até 'budget' pelo caminho do inimigo, ponto a ponto; no campo de
+    fluxo, pega o próximo passo do campo quando o caminho acaba """
+def walk_path(e, budget, flow):
+    # cada ponto de passagem fica a pelo menos uma célula do anterior
+    for _ in range(int(budget) + 2):
+        if e.path_idx >= len(e.path):
+            if not flow:
+                break
+            follow_flow_field(e, (int(e.x), int(e.z)))
+            if not e.path or e.path_idx >= len(e.path):
+                break
+        tx, tz = e.path[e.path_idx]
+        dx = tx + 0.5 - e.x
+        dz = tz + 0.5 - e.z
+        dist = sqrt(dx*dx + dz*dz)
+        arrived = dist <= budget
+        if arrived:
+            nx = tx + 0.5
+            nz = tz + 0.5
+        else:
+            nx = e.x + dx / dist * budget
+            nz = e.z + dz / dist * budget
+        if collides_with_wall(nx, nz):
+            e.recalc_timer = 0.0
+            break
+        e.x = nx
+        e.z = nz
+        if not arrived:
+            break
+        budget -= dist
+        e.path_idx += 1
+
+def step_simulation(dt):
+    global sim_tick, sim_time
+    sim_tick += 1
+    sim_time += dt
+    if player.moving and player.energy > 0:
+        vx, vz = player.forward_vector()
+        nx = player.x + vx * PLAYER_SPEED * dt
+        nz = player.z + vz * PLAYER_SPEED * dt
+        if not collides_with_wall(nx, nz):
+            player.x = nx
+            player.z = nz
+            player.energy -= PLAYER_SPEED * dt * 0.4
+            if player.energy < 0: player.energy = 0
+            widen_corridor_around(player.x, player.z, CORRIDOR_WIDEN_RADIUS)
+        else:
+            player.moving = False
+
+    flow = use_flow_field()
+    pool = path_pool is not None and use_path_pool()
+    if flow:
+        update_flow_field((int(player.x), int(player.z)))
+    store = use_enemy_store()
+    if store:
+        step_enemy_store(dt, flow, pool)
+    lod = LOD_ENEMIES and not store
+    if lod:
+        lod_counts[:] = [0, 0, 0]
+    for i, e in enumerate(() if store else enemies):
+        if lod:
+            if not lod_due(e, i):
+                lod_counts[e.tier] += 1
+                continue
+            edt = sim_time - e.lod_time
+            e.lod_time = sim_time
+            if e.tier != TIER_NEAR:
+                step_enemy_coarse(e, edt, flow, pool, (int(player.x), int(player.z)))
+                e.tier = enemy_tier(e)
+                lod_counts[e.tier] += 1
+                continue
+            e.tier = enemy_tier(e)
+            lod_counts[e.tier] += 1
+        e.recalc_timer -= dt
+        ex_cell = (int(e.x), int(e.z))
+        pl_cell = (int(player.x), int(player.z))
+        if flow:
+            follow_flow_field(e, ex_cell)
+        elif e.recalc_timer <= 0.0 or not e.path or e.path_idx >= len(e.path) or (e.path and e.path[-1] != pl_cell):
+            replan_enemy(e, ex_cell, pl_cell, pool)
+        if e.path and e.path_idx < len(e.path):
+            target_cell = e.path[e.path_idx]
+            tx = target_cell[0] + 0.5
+            tz = target_cell[1] + 0.5
+            dx = tx - e.x
+            dz = tz - e.z
+            dist = sqrt(dx*dx + dz*dz)
+            if dist < 0.05:
+                e.path_idx += 1
+            else:
+                vx = dx / dist
+                vz = dz / dist
+                nx = e.x + vx * ENEMY_SPEED * dt
+                nz = e.z + vz * ENEMY_SPEED * dt
+                if collides_with_wall(nx, nz):
+                    e.recalc_timer = 0.0
+                else:
+                    e.x = nx
+                    e.z = nz
+        else:
+            wander(e)
+
+    if pool:
+        deliver_pool_paths()
+    elif not flow:
+        path_scheduler.max_requests = path_budget_requests()
+        path_scheduler.run(dt, plan_enemy_path)
+
+    separate_enemies(dt)
+    update_enemy_grid()
+
+    # só quem está nos baldes em volta do jogador
+    for i in sorted(enemy_grid.near(player.x, player.z, CONTACT_DIST)):
+        e = enemies[i]
+        if distance(player.x, player.z, e.x, e.z) < CONTACT_DIST:
+            player.energy = max(0.0, player.energy - 5.0)
+            move_entity_to_free_cell(e)
+            enemy_grid.move(i, e.x, e.z)
+
+    for i in sorted(energy_grid.near(player.x, player.z, CONTACT_DIST)):
+        cap = energies[i]
+        if distance(player.x, player.z, cap[0], cap[1]) < CONTACT_DIST:
+            player.energy = min(100.0, player.energy + 50.0)
+            player.score += 5
+            move_capsule_to_free_cell(cap)
+            energy_grid.move(i, cap[0], cap[1])
+
+    if CHUNKED_WORLD:
+        Cidade.evict_far([(player.x, player.z)] + [(e.x, e.z) for e in enemies])
+
+def update_enemy_grid():
+    if use_enemy_store():
+        n = len(enemy_store)
+        enemy_grid.sync(enemy_store.x[:n], enemy_store.z[:n])
+        return
+    for i, e in enumerate(enemies):
+        enemy_grid.move(i, e.x, e.z)
+
+""" Afasta os inimigos a menos de ENEMY_SEPARATION um do outro, sem empurrar
+    para dentro de parede. O empurrão por passo fica abaixo de meio passo do
+    inimigo: quem anda para o mesmo ponto de passagem ainda chega nele. """
+def separate_enemies(dt):
+    n = len(enemies)
+    if ENEMY_SEPARATION <= 0 or n < 2:
+        return
+    store = use_enemy_store()
+    if store:
+        xs = enemy_store.x[:n]
+        zs = enemy_store.z[:n]
+    else:
+        xs = np.array([e.x for e in enemies])
+        zs = np.array([e.z for e in enemies])
+    i, j, dx, dz, dist = close_pairs(xs, zs, ENEMY_SEPARATION)
+    if len(i) == 0:
+        return
+    overlap = ENEMY_SEPARATION - dist
+    # no mesmo ponto: separa ao longo de x
+    same = dist < 1e-9
+    dist[same] = 1.0
+    dx[same] = 1.0
+    dz[same] = 0.0
+    ux = dx / dist * overlap * 0.5
+    uz = dz / dist * overlap * 0.5
+    px = np.zeros(n)
+    pz = np.zeros(n)
+    np.add.at(px, i, -ux)
+    np.add.at(pz, i, -uz)
+    np.add.at(px, j, ux)
+    np.add.at(pz, j, uz)
+    moved = np.flatnonzero((px != 0.0) | (pz != 0.0))
+    px = px[moved]
+    pz = pz[moved]
+    cap = 0.5 * ENEMY_SPEED * dt
+    scale = np.minimum(1.0, cap / np.sqrt(px*px + pz*pz))
+    nx = xs[moved] + px * scale
+    nz = zs[moved] + pz * scale
+    if store:
+        cx = nx.astype(np.int64)
+        cz = nz.astype(np.int64)
+        ok = (cx >= 0) & (cx < QtdX) & (cz >= 0) & (cz < QtdZ)
+        ok[ok] = Cidade.passable[cz[ok], cx[ok]]
+        xs[moved[ok]] = nx[ok]
+        zs[moved[ok]] = nz[ok]
+        return
+    for k, x, z in zip(moved.tolist(), nx.tolist(), nz.tolist()):
+        if not collides_with_wall(x, z):
+            enemies[k].x = x
+            enemies[k].z = z
+
+def distance(x1,z1,x2,z2):
+    return sqrt((x1-x2)**2 + (z1-z2)**2)
+
+def move_entity_to_free_cell(e):
+    cell = free_index.sample_far(player.x, player.z, 2.0)
+    if not cell: return
+    x,z = cell
+    e.x = x+0.5
+    e.z = z+0.5
+    e.path = []
+    e.path_idx = 0
+    e.recalc_timer = PATH_RECALC_INTERVAL
+
+def move_capsule_to_free_cell(cap):
+    cell = free_index.sample()
+    if not cell: return
+    x,z = cell
+    cap[0] = x+0.5
+    cap[1] = z+0.5
+
+def collides_with_wall(cx, cz):
+    return not Cidade.is_passable(int(cx), int(cz))
+
+def move_forward_step(step=0.5):
+    vx, vz = player.forward_vector()
+    nx = player.x + vx * step
+    nz = player.z + vz * step
+    if not collides_with_wall(nx, nz):
+        player.x = nx
+        player.z = nz
+        widen_corridor_around(player.x, player.z, CORRIDOR_WIDEN_RADIUS)
+
+def CarregaLabirintoFromMatrix(mat):
+    global Cidade, QtdX, QtdZ
+    previous = getattr(Cidade, 'walkable', None)
+    Cidade = GradeLabirinto.from_matrix(mat)
+    QtdZ = Cidade.height
+    QtdX = Cidade.width
+    rebuild_map_indexes(previous)
+    rebuild_fixed_and_windows_from_map()
+
+def CarregaLabirintoFromFile(path):
+    t0 = time.perf_counter()
+    grid, fixed, janelas = FormatoLabirinto.load_maze(path)
+    CarregaLabirintoFromMatrix(grid)
+    if fixed is not None:
+        for (x, z, typ) in fixed.items():
+            if Cidade.get(x, z) == CELL_FIXED:
+                fixed_objects.add(x, z, typ)
+    if janelas:
+        mapa_janelas.update(janelas)
+    print(f"Mapa carregado de {path}: {QtdX}x{QtdZ} em {(time.perf_counter()-t0)*1000:.1f} ms")
@@ -0,0 +1,178 @@
+# ************************************************
+#   TabelaProximoPasso.py
+#   Define a classe TabelaProximoPasso: tabela completa de
+#   "proximo passo" para mapas pequenos/medios.
+#   Uma BFS a partir de cada celula caminhavel g grava, para toda
+#   celula c, a direcao (uint8) do vizinho de c um passo mais perto
+#   de g. Um caminho e so uma caminhada pela linha de g da tabela,
+#   O(tamanho do caminho), sem busca.
+#
+#   table[i_goal, i_cell]: 0 = +x, 1 = -x, 2 = +z, 3 = -z,
+#                          254 = a propria celula, 255 = inalcancavel
+#   i = indice da celula em 'ids' (ids planos x + z*width, crescentes).
+#
+#   Paredes abertas depois do build (celulas novas) nao invalidam a
+#   tabela: os caminhos dela continuam andaveis, so podem nao ser mais
+#   os menores ('stale'). As celulas abertas ficam guardadas e
+#   still_shortest diz se um caminho da tabela continua minimo: um
+#   caminho por uma celula aberta c tem pelo menos |start-c| + |c-goal|
+#   passos. Refazer as linhas afetadas nao compensa: uma celula aberta
+#   pode encurtar caminhos de quase todos os alvos, e o build inteiro
+#   custa ~3.8 s no mapa 80x80.
+#   Uma celula que deixou de ser caminhavel invalida a tabela.
+#
+#   Em disco: <base>.npy com a tabela (aberta com mmap) e
+#   <base>_ids.npz com ids, largura e altura.
+# ************************************************
+
+import os
+
+import numpy as np
+
+from CacheDeMapas import walkable_digest
+
+HERE = 254
+UNREACHABLE = 255
+
+""" Nome de arquivo que identifica o plano caminhável (muda se o mapa mudar) """
+def table_key(walkable):
+    return 'proximo_' + walkable_digest(walkable)
+
+""" Classe TabelaProximoPasso """
+class TabelaProximoPasso:
+    def __init__(self, table, ids, width, height):
+        self.table = table
+        self.ids = ids
+        self.width = width
+        self.height = height
+        self.index = np.full(width*height, -1, dtype=np.int64)
+        self.index[ids] = np.arange(len(ids))
+        self._index = self.index.tolist()
+        self.valid = True
+        self.stale = False
+        # células abertas depois do build (fora da tabela)
+        self.opened_x = np.zeros(0, dtype=np.int64)
+        self.opened_z = np.zeros(0, dtype=np.int64)
+        self._step = (1, -1, width, -width)
+
+    @classmethod
+    def build(cls, walkable):
+        height, width = walkable.shape
+        ids = np.flatnonzero(walkable.ravel()).astype(np.int64)
+        n = len(ids)
+        index = np.full(width*height, -1, dtype=np.int64)
+        index[ids] = np.arange(n)
+        idx = index.tolist()
+        # adj[i] = [(j, direção de j até i)]
+        adj = []
+        last = width * (height - 1)
+        for c in ids.tolist():
+            x = c % width
+            nb = []
+            if x + 1 < width and idx[c+1] >= 0:
+                nb.append((idx[c+1], 1))
+            if x > 0 and idx[c-1] >= 0:
+                nb.append((idx[c-1], 0))
+            if c < last and idx[c+width] >= 0:
+                nb.append((idx[c+width], 3))
+            if c >= width and idx[c-width] >= 0:
+                nb.append((idx[c-width], 2))
+            adj.append(nb)
+        table = np.empty((n, n), dtype=np.uint8)
+        blank = bytes([UNREACHABLE]) * n
+        for g in range(n):
+            row = bytearray(blank)
+            row[g] = HERE
+            queue = [g]
+            for cur in queue:
+                for (j, code) in adj[cur]:
+                    if row[j] == UNREACHABLE:
+                        row[j] = code
+                        queue.append(j)
+            table[g] = np.frombuffer(row, dtype=np.uint8)
+        return cls(table, ids, width, height)
+
+    def save(self, base):
+        tmp = base + '.tmp.npy'
+        np.save(tmp, self.table)
+        os.replace(tmp, base + '.npy')
+        tmp = base + '_ids.tmp.npz'
+        np.savez(tmp, ids=self.ids, width=self.width, height=self.height)
+        os.replace(tmp, base + '_ids.npz')
+
+    """ Abre uma tabela salva (a tabela fica em memmap); None se não existir """
+    @classmethod
+    def load(cls, base):
+        if not (os.path.exists(base + '.npy') and os.path.exists(base + '_ids.npz')):
+            return None
+        try:
+            with np.load(base + '_ids.npz') as meta:
+                ids = meta['ids']
+                width = int(meta['width'])
+                height = int(meta['height'])
+            table = np.load(base + '.npy', mmap_mode='r')
+        except (OSError, ValueError, KeyError):
+            return None
+        if table.shape != (len(ids), len(ids)):
+            return None
+        return cls(table, ids, width, height)
+
+    """ Confere as células alteradas: célula da tabela bloqueada invalida,
+        célula nova caminhável só marca a tabela como 'stale' """
+    def check_cells(self, cells, walkable):
+        opened = []
+        for (x, z) in cells:
+            known = self._index[x + z*self.width] >= 0
+            if known and not walkable[z, x]:
+                self.valid = False
+                return False
+            if not known and walkable[z, x]:
+                opened.append((x, z))
+        if opened:
+            self.stale = True
+            xs, zs = zip(*opened)
+            self.opened_x = np.concatenate([self.opened_x, np.asarray(xs, dtype=np.int64)])
+            self.opened_z = np.concatenate([self.opened_z, np.asarray(zs, dtype=np.int64)])
+        return True
+
+    """ O caminho da tabela (start ... goal) continua mínimo com as células abertas? """
+    def still_shortest(self, path):
+        if not self.stale:
+            return True
+        (sx, sz), (gx, gz) = path[0], path[-1]
+        xs = self.opened_x
+        zs = self.opened_z
+        via = np.abs(xs - sx) + np.abs(zs - sz) + np.abs(xs - gx) + np.abs(zs - gz)
+        return not np.any(via < len(path) - 1)
+
+    def knows(self, cell):
+        x, z = cell
+        return 0 <= x < self.width and 0 <= z < self.height and self._index[x + z*self.width] >= 0
+
+    @property
+    def nbytes(self):
+        return self.table.shape[0] * self.table.shape[1]
+
+    """ Caminho de start até goal (lista de células) ou None """
+    def path(self, start, goal):
+        width = self.width
+        s = start[0] + start[1]*width
+        g = goal[0] + goal[1]*width
+        if not (0 <= start[0] < width and 0 <= goal[0] < width and
+                0 <= s < len(self.index) and 0 <= g < len(self.index)):
+            return None
+        index = self._index
+        gi = index[g]
+        if gi < 0 or index[s] < 0:
+            return None
+        row = self.table[gi].tobytes()
+        step = self._step
+        c = s
+        out = [start]
+        while c != g:
+            d = row[index[c]]
+            if d >= HERE:
+                return None
+            c += step[d]
+            out.append((c % width, c // width))
+        return out
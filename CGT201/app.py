@@ -1,19 +1,15 @@
 import sys
 import os
 import time
-import random as ALE
-from math import sin, cos, radians, sqrt
-import heapq
+from math import sin, cos, radians
 
 from OpenGL.GL import *
 from OpenGL.GLUT import *
 from OpenGL.GLU import *
 
-MAP_SIZE = 80
-USE_EMBEDDED = True
-WALL_PROB = 0.06
-NUM_CORRIDORS = 200
-CORRIDOR_WIDEN_RADIUS = 1
+from GradeLabirinto import CELL_WALL_H, CELL_WALL_V, CELL_FIXED, CELL_WINDOW, CELL_DOOR
+import Simulacao as sim
+
 FRONT_CAM_DISTANCE = 3.5
 FRONT_CAM_HEIGHT = 1.6
 FRONT_CAM_INVERT = False
@@ -53,25 +49,8 @@ ESPESSURA_PAREDE = 0.25
 ALTURA_PORTA = 2.10
 ALTURA_JANELA_BASE = 0.9
 
-CELL_EMPTY = 0
-CELL_WALL_H = 1
-CELL_WALL_V = 2
-CELL_PLAYER = 'P'
-CELL_FIXED = 'F'
-CELL_WINDOW = 'J'
-CELL_DOOR = 'D'
-
-MAX_DIM = 1000
-PLAYER_SPEED = 6.0
-ENEMY_SPEED = 3.5
-PATH_RECALC_INTERVAL = 0.9
-MIN_FIXED_OBJECTS = 16
-MIN_ENEMIES = 12
-MIN_ENERGIES = 8
-
-Cidade = []
-QtdX = 0
-QtdZ = 0
+MAX_SIM_STEPS = 5      # passos por quadro no máximo; atraso além disso é descartado
+RENDER_MAX_FPS = 0     # limite de quadros desenhados por segundo (0 = sem limite)
 
 Observador = Ponto()
 Alvo = Ponto()
@@ -82,221 +61,15 @@ camera_mode = 0
 modo_primeira_pessoa = True
 modo_terceira_focar_centro = True
 
-class Player:
-    def __init__(self, x=0.5, z=0.5):
-        self.x = x
-        self.z = z
-        self.y = 0.0
-        self.angle = 0.0
-        self.moving = False
-        self.energy = 100.0
-        self.score = 0
-    def forward_vector(self):
-        a = radians(self.angle)
-        return cos(a), -sin(a)
-
-player = Player()
-
-class Enemy:
-    def __init__(self, x,z):
-        self.x = x
-        self.z = z
-        self.y = 0.0
-        self.color = EnemyColor
-        self.path = []
-        self.path_idx = 0
-        self.recalc_timer = 0.0
-    def pos(self):
-        return (self.x,self.z)
-
-fixed_objects = []
-enemies = []
-energies = []
-mapa_janelas = {}
-
-oldTime = time.time()
+oldTime = time.perf_counter()
 GlobalTime = 0.0
-
-def hsv_to_rgb(h, s, v):
-    i = int(h*6.0)
-    f = (h*6.0) - i
-    p = v * (1.0 - s)
-    q = v * (1.0 - f*s)
-    t = v * (1.0 - (1.0 - f) * s)
-    i = i % 6
-    if i == 0: r,g,b = v,t,p
-    elif i == 1: r,g,b = q,v,p
-    elif i == 2: r,g,b = p,v,t
-    elif i == 3: r,g,b = p,q,v
-    elif i == 4: r,g,b = t,p,v
-    else: r,g,b = v,p,q
-    return (r,g,b)
-
-def create_embedded_map_scaled(size=MAP_SIZE):
-    mat = [[0 for _ in range(size)] for __ in range(size)]
-    for x in range(size):
-        mat[0][x] = CELL_WALL_H
-        mat[size-1][x] = CELL_WALL_H
-    for z in range(size):
-        mat[z][0] = CELL_WALL_V
-        mat[z][size-1] = CELL_WALL_V
-    step = max(6, size // 10)
-    vertical_cols = list(range(step, size-step, step))
-    horizontal_rows = list(range(step, size-step, step))
-    for x in vertical_cols:
-        for z in range(2, size-2):
-            if (z % 7) != 0 and (z % 11) != 0:
-                mat[z][x] = CELL_WALL_V
-    for z in horizontal_rows:
-        for x in range(2, size-2):
-            if (x % 7) != 0 and (x % 11) != 0:
-                if mat[z][x] == 0:
-                    mat[z][x] = CELL_WALL_H
-    win_positions = [
-        (2,2),
-        (2, size-3),
-        (size-3,2),
-        (size-3,size-3),
-        (size//2,2),
-        (size//2,size-3),
-    ]
-    for (z,x) in win_positions:
-        if 0 <= z < size and 0 <= x < size:
-            mat[z][x] = CELL_WINDOW
-    fixed_positions = []
-    for rz in range(step//2, size-2, step*2):
-        for rx in range(step//2, size-2, step*2):
-            fixed_positions.append((rz, rx))
-    fixed_positions += [(max(3, size//5), max(3, size//5)),
-                        (max(5, size//3), max(6, size//4)),
-                        (size//2 + 3, size//2 - 4),
-                        (size//3, size//2 + 6)]
-    for (z,x) in fixed_positions:
-        if 0<=z<size and 0<=x<size and mat[z][x] == 0:
-            mat[z][x] = CELL_FIXED
-    c = size//2
-    mat[c][c] = CELL_PLAYER
-    return mat
-
-def generate_sparse_map_with_corridors(size=MAP_SIZE, wall_prob=WALL_PROB, n_corridors=NUM_CORRIDORS):
-    mat = [[1 for _ in range(size)] for __ in range(size)]
-    for z in range(1, size-1):
-        for x in range(1, size-1):
-            mat[z][x] = 1 if (ALE.random() < wall_prob and ALE.random() < 0.9) else 0
-    for x in range(size):
-        mat[0][x] = CELL_WALL_H
-        mat[size-1][x] = CELL_WALL_H
-    for z in range(size):
-        mat[z][0] = CELL_WALL_V
-        mat[z][size-1] = CELL_WALL_V
-    center = size//2
-    if mat[center][center] != 0:
-        found = False
-        for r in range(1, size//2):
-            for dz in range(-r, r+1):
-                for dx in range(-r, r+1):
-                    x = center + dx
-                    z = center + dz
-                    if 0 <= x < size and 0 <= z < size and mat[z][x] == 0:
-                        mat[z][x] = 'P'
-                        found = True
-                        break
-                if found: break
-            if found: break
-        if not found:
-            mat[center][center] = 'P'
-    else:
-        mat[center][center] = 'P'
-    free_cells = [(x,z) for z in range(1,size-1) for x in range(1,size-1) if mat[z][x] == 0 or mat[z][x] == 'P']
-    if len(free_cells) < 2:
-        for z in range(1,size-1):
-            for x in range(1,size-1):
-                if ALE.random() < 0.02:
-                    mat[z][x] = 0
-        free_cells = [(x,z) for z in range(1,size-1) for x in range(1,size-1) if mat[z][x] == 0 or mat[z][x] == 'P']
-    def carve_path(a,b):
-        x,y = a
-        tx,ty = b
-        attempts = 0
-        while (x,y) != (tx,ty) and attempts < (abs(tx-x)+abs(ty-y))*4 + 50:
-            attempts += 1
-            mat[y][x] = 0
-            dx = tx - x
-            dy = ty - y
-            if dx != 0 and dy != 0:
-                if ALE.random() < 0.6:
-                    x += 1 if dx>0 else -1
-                else:
-                    y += 1 if dy>0 else -1
-            elif dx != 0:
-                x += 1 if dx>0 else -1
-            elif dy != 0:
-                y += 1 if dy>0 else -1
-            mat[y][x] = 0
-    if free_cells:
-        for i in range(n_corridors):
-            a = ALE.choice(free_cells)
-            b = ALE.choice(free_cells)
-            if a != b:
-                carve_path(a,b)
-    for z in range(1,size-1):
-        for x in range(1,size-1):
-            if mat[z][x] != 0 and mat[z][x] != 'P':
-                up = (0 <= z-1 < size and mat[z-1][x] == 0)
-                down = (0 <= z+1 < size and mat[z+1][x] == 0)
-                left = (0 <= x-1 < size and mat[z][x-1] == 0)
-                right = (0 <= x+1 < size and mat[z][x+1] == 0)
-                if (left or right) and not (up or down):
-                    mat[z][x] = CELL_WALL_V
-                elif (up or down) and not (left or right):
-                    mat[z][x] = CELL_WALL_H
-                else:
-                    mat[z][x] = CELL_WALL_H if ALE.random() < 0.5 else CELL_WALL_V
-    return mat
-
-def generate_and_setup_map():
-    global Cidade, QtdX, QtdZ
-    if USE_EMBEDDED:
-        Cidade = create_embedded_map_scaled(MAP_SIZE)
-    else:
-        Cidade = generate_sparse_map_with_corridors(MAP_SIZE, WALL_PROB, NUM_CORRIDORS)
-    QtdZ = len(Cidade)
-    QtdX = len(Cidade[0])
-    rebuild_fixed_and_windows_from_map()
-    print(f"Mapa pronto: {QtdX}x{QtdZ} (embedded={USE_EMBEDDED})")
-
-def rebuild_fixed_and_windows_from_map():
-    global fixed_objects, mapa_janelas
-    fixed_objects = []
-    mapa_janelas = {}
-    for z in range(QtdZ):
-        for x in range(QtdX):
-            v = Cidade[z][x]
-            if v == CELL_FIXED or v == 'F':
-                typ = ALE.choice(['chair','table','vase'])
-                fixed_objects.append({'x':x,'z':z,'type':typ})
-            if v == CELL_WINDOW or v == 'J':
-                mapa_janelas[(z,x)] = 1.0
-            if v == CELL_PLAYER or v == 'P':
-                player.x = x+0.5
-                player.z = z+0.5
-
-def ensure_min_fixed_objects(n=MIN_FIXED_OBJECTS):
-    current = sum(1 for z in range(QtdZ) for x in range(QtdX) if Cidade[z][x] == CELL_FIXED or Cidade[z][x] == 'F')
-    need = max(0, n - current)
-    if need == 0:
-        return
-    free = [(x,z) for z in range(QtdZ) for x in range(QtdX)
-            if is_cell_walkable(x,z) and not (Cidade[z][x] == CELL_PLAYER or Cidade[z][x] == 'P')]
-    ALE.shuffle(free)
-    added = 0
-    while need > 0 and free:
-        x,z = free.pop()
-        Cidade[z][x] = 'F'
-        need -= 1
-        added += 1
-    rebuild_fixed_and_windows_from_map()
-    print(f"Objetos fixos adicionados: {added}")
+# laço de passo fixo: tempo ainda não simulado, fração do passo para interpolar
+SimAccum = 0.0
+render_alpha = 1.0
+sim_ticks = 0
+sim_steps_last_frame = 0
+sim_dropped = 0.0
+last_render = 0.0
 
 def DesenhaLadrilho(x=None, z=None):
     if x is not None and z is not None:
@@ -404,8 +177,7 @@ def DesenhaEnergia():
     glutSolidSphere(0.2,10,10)
     glPopMatrix()
 
-def DesenhaObjetoFixoTipo(obj):
-    typ = obj.get('type','chair')
+def DesenhaObjetoFixoTipo(typ):
     if typ == 'chair':
         glPushMatrix()
         glTranslatef(0,0.15,0)
@@ -439,227 +211,43 @@ def DesenhaObjetoFixoTipo(obj):
         glutSolidCube(1)
         glPopMatrix()
 
+def draw_bounds():
+    if sim.CHUNKED_WORLD:
+        r = sim.CHUNK_VIEW_RADIUS
+        px = int(sim.player.x)
+        pz = int(sim.player.z)
+        return max(0, px-r), max(0, pz-r), min(sim.QtdX, px+r+1), min(sim.QtdZ, pz+r+1)
+    return 0, 0, sim.QtdX, sim.QtdZ
+
 def DesenhaCidade():
-    for z in range(QtdZ):
-        for x in range(QtdX):
+    x0, z0, x1, z1 = draw_bounds()
+    rows = sim.Cidade.window(x0, z0, x1, z1).tolist()
+    for z in range(z0, z1):
+        row = rows[z-z0]
+        for x in range(x0, x1):
             glPushMatrix()
             glTranslatef(x, 0, z)
             DesenhaLadrilho(x,z)
-            cell = Cidade[z][x]
-            if cell == CELL_WALL_H or cell == 1:
+            cell = row[x-x0]
+            if cell == CELL_WALL_H:
                 DesenhaParedeHorizontal()
-            elif cell == CELL_WALL_V or cell == 2:
+            elif cell == CELL_WALL_V:
                 DesenhaParedeVertical()
-            elif cell == CELL_DOOR or cell == 'D':
+            elif cell == CELL_DOOR:
                 DesenhaPorta()
-            elif cell == CELL_WINDOW or cell == 'J':
-                h = mapa_janelas.get((z,x),1.0)
+            elif cell == CELL_WINDOW:
+                h = sim.mapa_janelas.get((z,x),1.0)
                 DesenhaJanela(h)
-            elif cell == CELL_FIXED or cell == 'F':
+            elif cell == CELL_FIXED:
                 glPushMatrix()
                 glTranslatef(0,0,0)
                 glColor3f(*Wood)
-                for obj in fixed_objects:
-                    if obj['x'] == x and obj['z'] == z:
-                        DesenhaObjetoFixoTipo(obj)
-                        break
+                typ = sim.fixed_objects.type_at(x,z)
+                if typ is not None:
+                    DesenhaObjetoFixoTipo(typ)
                 glPopMatrix()
             glPopMatrix()
 
-def is_cell_walkable(x,z):
-    if x < 0 or z < 0 or x >= QtdX or z >= QtdZ:
-        return False
-    v = Cidade[z][x]
-    if v == CELL_EMPTY or v == CELL_PLAYER or v == 'P' or v == CELL_FIXED or v == 'F':
-        return True
-    return False
-
-def neighbors_of(cell):
-    x,z = cell
-    nbrs = [(x+1,z),(x-1,z),(x,z+1),(x,z-1)]
-    return [(nx,nz) for (nx,nz) in nbrs if 0 <= nx < QtdX and 0 <= nz < QtdZ and is_cell_walkable(nx,nz)]
-
-def heuristic(a,b):
-    return abs(a[0]-b[0]) + abs(a[1]-b[1])
-
-def a_star(start, goal):
-    if start == goal:
-        return [start]
-    open_set = []
-    heapq.heappush(open_set, (0, start))
-    came_from = {}
-    gscore = {start: 0}
-    fscore = {start: heuristic(start, goal)}
-    visited = set()
-    while open_set:
-        _, current = heapq.heappop(open_set)
-        if current == goal:
-            path = [current]
-            while current in came_from:
-                current = came_from[current]
-                path.append(current)
-            path.reverse()
-            return path
-        visited.add(current)
-        for nb in neighbors_of(current):
-            tentative_g = gscore[current] + 1
-            if nb in visited and tentative_g >= gscore.get(nb, 1e9):
-                continue
-            if tentative_g < gscore.get(nb, 1e9):
-                came_from[nb] = current
-                gscore[nb] = tentative_g
-                f = tentative_g + heuristic(nb, goal)
-                fscore[nb] = f
-                heapq.heappush(open_set, (f, nb))
-    return None
-
-def widen_corridor_around(cx, cz, radius=CORRIDOR_WIDEN_RADIUS):
-    global Cidade, QtdX, QtdZ
-    if QtdX == 0 or QtdZ == 0:
-        return
-    ix = int(cx)
-    iz = int(cz)
-    for dz in range(-radius, radius+1):
-        for dx in range(-radius, radius+1):
-            nx = ix + dx
-            nz = iz + dz
-            if nx < 0 or nz < 0 or nx >= QtdX or nz >= QtdZ:
-                continue
-            cell = Cidade[nz][nx]
-            if cell in (CELL_DOOR, CELL_WINDOW, CELL_FIXED, CELL_PLAYER, 'D', 'J', 'F', 'P'):
-                continue
-            if cell == CELL_WALL_H or cell == CELL_WALL_V or cell == 1 or cell == 2:
-                Cidade[nz][nx] = CELL_EMPTY
-
-def spawn_random_entities(min_enemies=MIN_ENEMIES, min_energies=MIN_ENERGIES):
-    enemies.clear()
-    energies.clear()
-    free_cells = [(x,z) for z in range(QtdZ) for x in range(QtdX)
-                  if is_cell_walkable(x,z) and not (abs(x+0.5-player.x)<0.1 and abs(z+0.5-player.z)<0.1)]
-    ALE.shuffle(free_cells)
-    for i in range(min_enemies):
-        if not free_cells:
-            break
-        x,z = free_cells.pop()
-        e = Enemy(x+0.5, z+0.5)
-        e.color = hsv_to_rgb(ALE.random(), 0.85, 0.9)
-        e.path = []
-        e.path_idx = 0
-        e.recalc_timer = ALE.random()*PATH_RECALC_INTERVAL
-        enemies.append(e)
-    free_cells = [(x,z) for z in range(QtdZ) for x in range(QtdX)
-                  if is_cell_walkable(x,z) and not any(int(en.x)==x and int(en.z)==z for en in enemies)]
-    ALE.shuffle(free_cells)
-    for i in range(min_energies):
-        if not free_cells:
-            break
-        x,z = free_cells.pop()
-        energies.append([x+0.5, z+0.5])
-    if len(fixed_objects) < MIN_FIXED_OBJECTS:
-        ensure_min_fixed_objects(MIN_FIXED_OBJECTS)
-    print(f"Spawn final: enemies={len(enemies)}, energies={len(energies)}, fixed={len(fixed_objects)}")
-
-def step_simulation(dt):
-    if player.moving and player.energy > 0:
-        vx, vz = player.forward_vector()
-        nx = player.x + vx * PLAYER_SPEED * dt
-        nz = player.z + vz * PLAYER_SPEED * dt
-        if not collides_with_wall(nx, nz):
-            player.x = nx
-            player.z = nz
-            player.energy -= PLAYER_SPEED * dt * 0.4
-            if player.energy < 0: player.energy = 0
-            widen_corridor_around(player.x, player.z, CORRIDOR_WIDEN_RADIUS)
-        else:
-            player.moving = False
-
-    for e in enemies:
-        e.recalc_timer -= dt
-        ex_cell = (int(e.x), int(e.z))
-        pl_cell = (int(player.x), int(player.z))
-        need_recalc = False
-        if e.recalc_timer <= 0.0 or not e.path or e.path_idx >= len(e.path) or (e.path and e.path[-1] != pl_cell):
-            need_recalc = True
-        if need_recalc:
-            e.recalc_timer = PATH_RECALC_INTERVAL
-            path = a_star(ex_cell, pl_cell)
-            if path:
-                e.path = path
-                e.path_idx = 1 if len(path) > 1 else 0
-            else:
-                e.path = []
-                e.path_idx = 0
-        if e.path and e.path_idx < len(e.path):
-            target_cell = e.path[e.path_idx]
-            tx = target_cell[0] + 0.5
-            tz = target_cell[1] + 0.5
-            dx = tx - e.x
-            dz = tz - e.z
-            dist = sqrt(dx*dx + dz*dz)
-            if dist < 0.05:
-                e.path_idx += 1
-            else:
-                vx = dx / dist
-                vz = dz / dist
-                nx = e.x + vx * ENEMY_SPEED * dt
-                nz = e.z + vz * ENEMY_SPEED * dt
-                if collides_with_wall(nx, nz):
-                    e.recalc_timer = 0.0
-                else:
-                    e.x = nx
-                    e.z = nz
-        else:
-            if ALE.random() < 0.01:
-                free = [(x,z) for z in range(QtdZ) for x in range(QtdX) if is_cell_walkable(x,z)]
-                if free:
-                    fx,fz = ALE.choice(free)
-                    e.x = fx + 0.5
-                    e.z = fz + 0.5
-
-    for e in enemies:
-        if distance(player.x, player.z, e.x, e.z) < 0.6:
-            player.energy = max(0.0, player.energy - 5.0)
-            move_entity_to_free_cell(e)
-
-    for cap in energies:
-        if distance(player.x, player.z, cap[0], cap[1]) < 0.6:
-            player.energy = min(100.0, player.energy + 50.0)
-            player.score += 5
-            move_capsule_to_free_cell(cap)
-
-def distance(x1,z1,x2,z2):
-    return sqrt((x1-x2)**2 + (z1-z2)**2)
-
-def move_entity_to_free_cell(e):
-    free = [(x,z) for z in range(QtdZ) for x in range(QtdX)
-            if is_cell_walkable(x,z) and distance(x+0.5,z+0.5,player.x,player.z)>2.0]
-    if not free: return
-    x,z = ALE.choice(free)
-    e.x = x+0.5
-    e.z = z+0.5
-    e.path = []
-    e.path_idx = 0
-    e.recalc_timer = PATH_RECALC_INTERVAL
-
-def move_capsule_to_free_cell(cap):
-    free = [(x,z) for z in range(QtdZ) for x in range(QtdX) if is_cell_walkable(x,z)]
-    if not free: return
-    x,z = ALE.choice(free)
-    cap[0] = x+0.5
-    cap[1] = z+0.5
-
-def collides_with_wall(cx, cz):
-    ix = int(cx)
-    iz = int(cz)
-    if ix < 0 or iz < 0 or ix >= QtdX or iz >= QtdZ:
-        return True
-    cell = Cidade[iz][ix]
-    if cell == CELL_EMPTY or cell == CELL_PLAYER or cell == 'P':
-        return False
-    if cell == CELL_DOOR or cell == 'D':
-        return False
-    return True
-
 Angulo = 0.0
 AlturaViewportDeMensagens = 0.18
 AnguloDeVisao = 60.0
@@ -671,17 +259,18 @@ def DefineLuz():
     amb = [0.3,0.3,0.3,1.0]
     dif = [0.7,0.7,0.7,1.0]
     spec = [1.0,1.0,1.0,1.0]
-    pos0 = [player.x, 5.0, player.z, 1.0]
+    px, pz = render_pos(sim.player)
+    pos0 = [px, 5.0, pz, 1.0]
     glLightfv(GL_LIGHT0, GL_AMBIENT, amb)
     glLightfv(GL_LIGHT0, GL_DIFFUSE, dif)
     glLightfv(GL_LIGHT0, GL_SPECULAR, spec)
     glLightfv(GL_LIGHT0, GL_POSITION, pos0)
-    if QtdX > 0 and QtdZ > 0:
+    if sim.QtdX > 0 and sim.QtdZ > 0:
         glEnable(GL_LIGHT1)
         l_amb = [0.05,0.02,0.06,1.0]
         pulse = 0.6 + 0.4 * 0.5 * (1.0 + sin(GlobalTime * 1.5))
         l_diff = [0.6*pulse,0.2*pulse,0.8*pulse,1.0]
-        l_pos = [QtdX/2.0, max(QtdX,QtdZ)*0.6, QtdZ/2.0, 1.0]
+        l_pos = [sim.QtdX/2.0, max(sim.QtdX,sim.QtdZ)*0.6, sim.QtdZ/2.0, 1.0]
         glLightfv(GL_LIGHT1, GL_AMBIENT, l_amb)
         glLightfv(GL_LIGHT1, GL_DIFFUSE, l_diff)
         glLightfv(GL_LIGHT1, GL_POSITION, l_pos)
@@ -698,15 +287,16 @@ def PosicUser():
     glLoadIdentity()
 
     global camera_mode, modo_primeira_pessoa, modo_terceira_focar_centro, FRONT_CAM_INVERT
+    px, pz = render_pos(sim.player)
 
     if camera_mode == 0:
         modo_primeira_pessoa = True
-        a = radians(player.angle)
+        a = radians(sim.player.angle)
         dx = cos(a)
         dz = -sin(a)
-        eye_x = player.x
+        eye_x = px
         eye_y = 1.5
-        eye_z = player.z
+        eye_z = pz
         center_x = eye_x + dx
         center_y = 1.5
         center_z = eye_z + dz
@@ -714,39 +304,39 @@ def PosicUser():
 
     elif camera_mode == 1:
         modo_primeira_pessoa = False
-        camY = max(QtdX,QtdZ) * 1.5
-        camX = QtdX/2.0
-        camZ = QtdZ/2.0
+        camY = max(sim.QtdX,sim.QtdZ) * 1.5
+        camX = sim.QtdX/2.0
+        camZ = sim.QtdZ/2.0
         if modo_terceira_focar_centro:
-            tgtX = QtdX/2.0
-            tgtZ = QtdZ/2.0
+            tgtX = sim.QtdX/2.0
+            tgtZ = sim.QtdZ/2.0
         else:
-            tgtX = player.x
-            tgtZ = player.z
+            tgtX = px
+            tgtZ = pz
         gluLookAt(camX, camY, camZ, tgtX, 0, tgtZ, 0,0,-1)
 
     elif camera_mode == 2:
         modo_primeira_pessoa = False
-        a = radians(player.angle)
+        a = radians(sim.player.angle)
         dx = cos(a)
         dz = -sin(a)
         sign = 1.0 if not FRONT_CAM_INVERT else -1.0
-        camX = player.x + dx * FRONT_CAM_DISTANCE * sign
-        camZ = player.z + dz * FRONT_CAM_DISTANCE * sign
+        camX = px + dx * FRONT_CAM_DISTANCE * sign
+        camZ = pz + dz * FRONT_CAM_DISTANCE * sign
         camY = FRONT_CAM_HEIGHT
-        tgtX = player.x
-        tgtZ = player.z
+        tgtX = px
+        tgtZ = pz
         tgtY = 1.0
         gluLookAt(camX, camY, camZ, tgtX, tgtY, tgtZ, 0,1,0)
 
     else:
         modo_primeira_pessoa = True
-        a = radians(player.angle)
+        a = radians(sim.player.angle)
         dx = cos(a)
         dz = -sin(a)
-        eye_x = player.x
+        eye_x = px
         eye_y = 1.5
-        eye_z = player.z
+        eye_z = pz
         center_x = eye_x + dx
         center_y = 1.5
         center_z = eye_z + dz
@@ -768,9 +358,20 @@ def DesenhaEm2D():
     defineCor(White)
     cam_names = {0: "1P (primeira pessoa)", 1: "3P topo (aérea)", 2: "Front (selfie)"}
     cam_name = cam_names.get(camera_mode, "Desconhecida")
-    PrintString(f"Energia: {player.energy:.0f}  Score: {player.score}", 0.2, 8.6, White)
+    PrintString(f"Energia: {sim.player.energy:.0f}  Score: {sim.player.score}", 0.2, 8.6, White)
     PrintString(f"Câmera: {cam_name}", 0.2, 7.4, White)
-    PrintString(f"Modo movimento: {'ON' if player.moving else 'OFF'}  (V: alterna 1P/3P, B: cicla câmeras, N: inverter front)", 0.2, 6.2, White)
+    PrintString(f"Modo movimento: {'ON' if sim.player.moving else 'OFF'}  (V: alterna 1P/3P, B: cicla câmeras, N: inverter front)", 0.2, 6.2, White)
+    if sim.path_pool is not None and sim.use_path_pool():
+        PrintString(f"Caminhos: processos {sim.PATH_WORKERS}  pendentes {sim.path_pool.in_flight}  velhos {sim.path_pool.stale}"
+                    f"  cache {sim.path_cache.hits + sim.path_cache.suffix_hits}/{sim.path_cache.misses}", 0.2, 5.0, White)
+    else:
+        PrintString(f"Caminhos: fila {sim.path_scheduler.queue_length}  atendidos {sim.path_scheduler.served_last_frame}"
+                    f"  cache {sim.path_cache.hits + sim.path_cache.suffix_hits}/{sim.path_cache.misses}", 0.2, 5.0, White)
+    PrintString(f"Simulação: {sim.SIM_TICK_RATE} Hz  passos no quadro {sim_steps_last_frame}"
+                f"  descartado {sim_dropped:.2f}s", 0.2, 3.8, White)
+    if sim.LOD_ENEMIES:
+        near, mid, far = sim.lod_counts
+        PrintString(f"LOD inimigos: perto {near}  meio {mid}  longe {far}", 0.2, 2.6, White)
     glMatrixMode(GL_PROJECTION)
     glLoadIdentity()
     glViewport(0, int(h*AlturaViewportDeMensagens), w, int(h - h*AlturaViewportDeMensagens))
@@ -792,17 +393,19 @@ def display():
     DesenhaCidade()
     if camera_mode != 0:
         glPushMatrix()
-        glTranslatef(player.x, 0, player.z)
-        glRotatef(-player.angle+90, 0,1,0)
+        px, pz = render_pos(sim.player)
+        glTranslatef(px, 0, pz)
+        glRotatef(-sim.player.angle+90, 0,1,0)
         DesenhaHumano()
         glPopMatrix()
-    for e in enemies:
+    for e in sim.enemies:
         glPushMatrix()
         glColor3f(*getattr(e,'color', EnemyColor))
-        glTranslatef(e.x, 0.3, e.z)
+        ex, ez = render_pos(e)
+        glTranslatef(ex, 0.3, ez)
         DesenhaInimigo()
         glPopMatrix()
-    for i, cap in enumerate(energies):
+    for i, cap in enumerate(sim.energies):
         pulse = 0.6 + 0.4 * 0.5 * (1.0 + sin(GlobalTime*5.0 + i))
         ec = (EnergyColor[0]*pulse, EnergyColor[1]*pulse, EnergyColor[2]*pulse)
         scale = 0.9 + 0.15 * (0.5 * (1.0 + sin(GlobalTime*6.0 + i)))
@@ -818,33 +421,69 @@ def display():
 nFrames = 0
 AccumDeltaT = 0
 
+""" Posição de desenho: entre o passo anterior e o atual, pela fração
+    do passo já decorrida (salto maior que uma célula é teletransporte) """
+def render_pos(obj):
+    px = obj.prev_x
+    pz = obj.prev_z
+    if abs(obj.x - px) + abs(obj.z - pz) > 1.0:
+        return obj.x, obj.z
+    a = render_alpha
+    return px + (obj.x - px) * a, pz + (obj.z - pz) * a
+
+""" Guarda as posições antes de cada passo fixo """
+def store_prev_positions():
+    sim.player.prev_x = sim.player.x
+    sim.player.prev_z = sim.player.z
+    if sim.use_enemy_store():
+        sim.enemy_store.store_prev()
+        return
+    for e in sim.enemies:
+        e.prev_x = e.x
+        e.prev_z = e.z
+
+""" Avança a simulação em passos de 1/SIM_TICK_RATE pelo tempo decorrido;
+    retorna quantos passos foram dados """
+def advance_simulation(elapsed):
+    global SimAccum, render_alpha, sim_ticks, sim_steps_last_frame, sim_dropped
+    step = 1.0 / sim.SIM_TICK_RATE
+    SimAccum += elapsed
+    n = 0
+    while SimAccum >= step and n < MAX_SIM_STEPS:
+        store_prev_positions()
+        sim.step_simulation(step)
+        SimAccum -= step
+        n += 1
+    if SimAccum >= step:
+        # quadro lento demais: descarta o atraso em vez de acumular
+        sim_dropped += SimAccum - SimAccum % step
+        SimAccum %= step
+    sim_ticks += n
+    sim_steps_last_frame = n
+    render_alpha = SimAccum / step
+    return n
+
 def animate():
-    global oldTime, AccumDeltaT, GlobalTime
-    now = time.time()
+    global oldTime, AccumDeltaT, GlobalTime, last_render
+    now = time.perf_counter()
     dt = now - oldTime
     oldTime = now
     AccumDeltaT += dt
     GlobalTime += dt
-    step_simulation(dt)
+    advance_simulation(dt)
+    if RENDER_MAX_FPS > 0 and now - last_render < 1.0 / RENDER_MAX_FPS:
+        return
+    last_render = now
     glutPostRedisplay()
 
 ESCAPE = b'\x1b'
 
-def move_forward_step(step=0.5):
-    vx, vz = player.forward_vector()
-    nx = player.x + vx * step
-    nz = player.z + vz * step
-    if not collides_with_wall(nx, nz):
-        player.x = nx
-        player.z = nz
-        widen_corridor_around(player.x, player.z, CORRIDOR_WIDEN_RADIUS)
-
 def keyboard(key, x, y):
     global modo_primeira_pessoa, modo_terceira_focar_centro, camera_mode, FRONT_CAM_INVERT
     if key == ESCAPE:
         os._exit(0)
     if key == b' ':
-        player.moving = not player.moving
+        sim.player.moving = not sim.player.moving
     if key == b'v' or key == b'V':
         if camera_mode == 0:
             camera_mode = 1
@@ -858,16 +497,16 @@ def keyboard(key, x, y):
     if key == b'c' or key == b'C':
         modo_terceira_focar_centro = not modo_terceira_focar_centro
     if key == b'w' or key == b'W':
-        move_forward_step(step=0.5)
+        sim.move_forward_step(step=0.5)
     if key == b'e' or key == b'E':
-        player.energy = 100.0
+        sim.player.energy = 100.0
     glutPostRedisplay()
 
 def arrow_keys(a_keys, x, y):
     if a_keys == GLUT_KEY_LEFT:
-        player.angle += 5.0
+        sim.player.angle += 5.0
     if a_keys == GLUT_KEY_RIGHT:
-        player.angle -= 5.0
+        sim.player.angle -= 5.0
     glutPostRedisplay()
 
 def initialize_opengl():
@@ -881,16 +520,14 @@ def initialize_opengl():
     glEnable(GL_LIGHT0)
 
 def main():
-    global QtdX, QtdZ, Cidade
-    generate_and_setup_map()
-    ensure_min_fixed_objects(MIN_FIXED_OBJECTS)
-    spawn_random_entities(MIN_ENEMIES, MIN_ENERGIES)
-    TerceiraPessoa.x = QtdX/2.0
+    sim.generate_and_setup_map(sim.MAP_SEED)
+    sim.spawn_random_entities(sim.MIN_ENEMIES, sim.MIN_ENERGIES)
+    TerceiraPessoa.x = sim.QtdX/2.0
     TerceiraPessoa.y = 10
-    TerceiraPessoa.z = QtdZ/2.0
-    PosicaoVeiculo.x = QtdX/2.0
+    TerceiraPessoa.z = sim.QtdZ/2.0
+    PosicaoVeiculo.x = sim.QtdX/2.0
     PosicaoVeiculo.y = 0
-    PosicaoVeiculo.z = QtdZ/2.0
+    PosicaoVeiculo.z = sim.QtdZ/2.0
 
     glutInit(sys.argv)
     glutInitDisplayMode(GLUT_RGBA | GLUT_DOUBLE | GLUT_DEPTH)
@@ -908,12 +545,5 @@ def main():
     glutSpecialFunc(arrow_keys)
     glutMainLoop()
 
-def CarregaLabirintoFromMatrix(mat):
-    global Cidade, QtdX, QtdZ
-    Cidade = mat
-    QtdZ = len(Cidade)
-    QtdX = len(Cidade[0])
-    rebuild_fixed_and_windows_from_map()
-
 if __name__ == '__main__':
     main()
@@ -0,0 +1,54 @@
+# ************************************************
+#   bench_geracao.py
+#   Mede o tempo de geracao do labirinto procedural:
+#   gerador original (Python) x gerador vetorizado (NumPy)
+#
+#   Uso: python bench_geracao.py [--python-max N] [--repeat R]
+# ************************************************
+
+import sys
+import time
+import argparse
+import random as ALE
+
+import numpy as np
+
+import Simulacao as sim
+from GradeLabirinto import CELL_EMPTY, CELL_PLAYER
+from GeradorVetorizado import generate_sparse_map_vectorized
+
+SIZES = [50, 100, 250, 500, 1000, 2000]
+
+def best_of(fn, repeat):
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        grid = fn()
+        dt = time.perf_counter() - t0
+        best = dt if best is None else min(best, dt)
+    return best, grid
+
+def free_ratio(grid):
+    return np.count_nonzero((grid.cells == CELL_EMPTY) | (grid.cells == CELL_PLAYER)) / grid.cells.size
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--python-max', type=int, default=2000,
+                        help='maior tamanho medido com o gerador Python (lento)')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=1234)
+    args = parser.parse_args()
+
+    print(f"{'size':>6} {'python (s)':>12} {'numpy (s)':>12} {'speedup':>9} {'livre py':>9} {'livre np':>9}")
+    for size in SIZES:
+        ALE.seed(args.seed)
+        t_np, g_np = best_of(lambda: generate_sparse_map_vectorized(size, sim.WALL_PROB, sim.NUM_CORRIDORS, seed=args.seed), args.repeat)
+        if size <= args.python_max:
+            t_py, g_py = best_of(lambda: sim.generate_sparse_map_with_corridors(size, sim.WALL_PROB, sim.NUM_CORRIDORS), 1)
+            print(f"{size:>6} {t_py:>12.4f} {t_np:>12.4f} {t_py/t_np:>8.1f}x {free_ratio(g_py):>9.3f} {free_ratio(g_np):>9.3f}")
+        else:
+            print(f"{size:>6} {'-':>12} {t_np:>12.4f} {'-':>9} {'-':>9} {free_ratio(g_np):>9.3f}")
+    sys.stdout.flush()
+
+if __name__ == '__main__':
+    main()
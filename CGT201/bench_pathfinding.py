@@ -0,0 +1,102 @@
+# ************************************************
+#   bench_pathfinding.py
+#   Compara a_star (Manhattan), a_star com heuristica ALT e
+#   Jump Point Search nos mapas embutidos e gerados: nos expandidos,
+#   tempo e tamanho do caminho (todos devem achar caminhos de mesmo
+#   tamanho).
+#
+#   Uso: python bench_pathfinding.py [--queries Q] [--seed S]
+# ************************************************
+
+import sys
+import time
+import argparse
+import random as ALE
+
+import Simulacao as sim
+from GradeLabirinto import GradeLabirinto, CELL_WALL_H, CELL_WALL_V, CELL_PLAYER, CELL_FIXED, CELL_WINDOW
+from GeradorVetorizado import generate_sparse_map_vectorized
+from JumpPointSearch import JumpPointSearch
+from HeuristicaALT import HeuristicaALT
+
+""" Mesmo layout de create_embedded_map_50 (versão 3d.py/app.py): avenidas a cada 8 células """
+def create_embedded_map_50():
+    size = 50
+    mat = [[0 for _ in range(size)] for __ in range(size)]
+    for x in range(size):
+        mat[0][x] = CELL_WALL_H
+        mat[size-1][x] = CELL_WALL_H
+    for z in range(size):
+        mat[z][0] = CELL_WALL_V
+        mat[z][size-1] = CELL_WALL_V
+    for x in [8, 16, 24, 32, 40]:
+        for z in range(2, size-2):
+            if (z % 7) != 0 and (z % 11) != 0:
+                mat[z][x] = CELL_WALL_V
+    for z in [8, 16, 24, 32, 40]:
+        for x in range(2, size-2):
+            if (x % 7) != 0 and (x % 11) != 0:
+                if mat[z][x] == 0:
+                    mat[z][x] = CELL_WALL_H
+    for (z,x) in [(4,4), (4,size-5), (size-5,4), (size-5,size-5), (size//2,4), (size//2,size-5)]:
+        mat[z][x] = CELL_WINDOW
+    for (z,x) in [(6,6),(6,10),(10,6),(12,18),(14,12),(20,18),(22,22),(30,10),(35,14),(40,30),(18,30),(28,26)]:
+        if mat[z][x] == 0:
+            mat[z][x] = CELL_FIXED
+    mat[size//2][size//2] = CELL_PLAYER
+    return GradeLabirinto.from_matrix(mat)
+
+def maps(seed):
+    yield 'embedded_50', create_embedded_map_50()
+    for size in (80, 200):
+        yield f'embedded_scaled_{size}', sim.create_embedded_map_scaled(size)
+    for size in (100, 250, 500):
+        yield f'generated_{size}', generate_sparse_map_vectorized(size, sim.WALL_PROB, sim.NUM_CORRIDORS, seed=seed)
+
+def reachable_pairs(n, rng):
+    pairs = []
+    while len(pairs) < n:
+        a = sim.free_index.sample(rng)
+        b = sim.free_index.sample(rng)
+        if a != b and sim.components.label_at(*a) == sim.components.label_at(*b):
+            pairs.append((a, b))
+    return pairs
+
+def run_astar(pairs, alt=None):
+    stats = {'expanded': 0}
+    sim.alt_heuristic = alt
+    try:
+        t0 = time.perf_counter()
+        lengths = [len(sim.a_star(a, b, stats)) for (a, b) in pairs]
+        return time.perf_counter() - t0, stats['expanded'], lengths
+    finally:
+        sim.alt_heuristic = None
+
+def run_jps(pairs):
+    stats = {'expanded': 0}
+    jps = JumpPointSearch(sim.Cidade.walkable)
+    t0 = time.perf_counter()
+    lengths = [len(jps.find(a, b, stats)) for (a, b) in pairs]
+    return time.perf_counter() - t0, stats['expanded'], lengths
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--queries', type=int, default=50)
+    parser.add_argument('--seed', type=int, default=1234)
+    args = parser.parse_args()
+
+    print(f"{'mapa':>20} {'a* nós':>10} {'alt nós':>10} {'jps nós':>10} {'a* (s)':>9} {'alt (s)':>9} {'jps (s)':>9} {'mesmo tam':>10}")
+    for name, grid in maps(args.seed):
+        ALE.seed(args.seed)
+        sim.CarregaLabirintoFromMatrix(grid)
+        pairs = reachable_pairs(args.queries, ALE.Random(args.seed))
+        t_a, n_a, len_a = run_astar(pairs)
+        alt = HeuristicaALT.build(sim.Cidade.walkable, sim.ALT_LANDMARKS, pairs[0][0])
+        t_l, n_l, len_l = run_astar(pairs, alt)
+        t_j, n_j, len_j = run_jps(pairs)
+        same = len_a == len_l == len_j
+        print(f"{name:>20} {n_a:>10} {n_l:>10} {n_j:>10} {t_a:>9.3f} {t_l:>9.3f} {t_j:>9.3f} {str(same):>10}")
+        sys.stdout.flush()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+# ************************************************
+#   bench_wavefront.py
+#   Compara a BFS vetorizada (FrenteDeOnda.wavefront_distances)
+#   com uma BFS em Python puro nos mapas gerados, de 100x100 a
+#   2000x2000 (as duas devem dar a mesma grade de distancias).
+#
+#   Uso: python bench_wavefront.py [--sizes 100 250 ...] [--seed S]
+# ************************************************
+
+import sys
+import time
+import argparse
+
+import numpy as np
+
+from GeradorVetorizado import generate_sparse_map_vectorized
+from FrenteDeOnda import wavefront_distances
+
+# mesmos valores de app.py (sem importar app, que carrega o OpenGL)
+WALL_PROB = 0.06
+NUM_CORRIDORS = 200
+
+""" BFS de referência (listas, fila em lista) """
+def python_bfs(walkable, source):
+    height, width = walkable.shape
+    free = walkable.ravel().tolist()
+    n = width * height
+    dist = [-1] * n
+    root = source[0] + source[1]*width
+    if free[root]:
+        dist[root] = 0
+        queue = [root]
+        for i in queue:
+            d = dist[i] + 1
+            x = i % width
+            for j in ((i+1) if x + 1 < width else -1, (i-1) if x > 0 else -1,
+                      (i+width) if i + width < n else -1, i-width):
+                if j >= 0 and dist[j] < 0 and free[j]:
+                    dist[j] = d
+                    queue.append(j)
+    return np.array(dist, dtype=np.int32).reshape(height, width)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 250, 500, 1000, 2000])
+    parser.add_argument('--seed', type=int, default=1234)
+    args = parser.parse_args()
+
+    print(f"{'tamanho':>9} {'células':>10} {'níveis':>7} {'python (s)':>11} {'numpy (s)':>10} {'ganho':>7} {'igual':>6}")
+    for size in args.sizes:
+        grid = generate_sparse_map_vectorized(size, WALL_PROB, NUM_CORRIDORS, seed=args.seed)
+        walkable = grid.walkable
+        ids = np.flatnonzero(walkable.ravel())
+        cid = int(ids[len(ids) // 2])
+        source = (cid % size, cid // size)
+        t0 = time.perf_counter()
+        ref = python_bfs(walkable, source)
+        t_py = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        dist = wavefront_distances(walkable, [source])
+        t_np = time.perf_counter() - t0
+        print(f"{size:>9} {len(ids):>10} {int(dist.max()):>7} {t_py:>11.3f} {t_np:>10.3f} "
+              f"{t_py/max(t_np, 1e-9):>6.1f}x {str(np.array_equal(ref, dist)):>6}")
+        sys.stdout.flush()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,172 @@
+# ************************************************
+#   headless.py
+#   Roda a simulacao (Simulacao.py) sem janela e sem OpenGL: monta
+#   o mundo a partir de uma semente, executa N passos fixos com a
+#   entrada do jogador aleatoria ou lida de um roteiro e imprime
+#   passos por segundo, buscas A* e contagem de entidades.
+#   Serve para testes de carga e de longa duracao em maquinas sem
+#   tela (CI).
+#   A mesma semente da o mesmo resultado: o agendador de caminhos
+#   atende um numero fixo de pedidos por passo (--path-budget) em
+#   vez de um tempo (--budget-ms, que depende da maquina). Com
+#   --workers > 0 os caminhos chegam quando os processos terminam
+#   e o resultado deixa de ser reproduzivel.
+#
+#   Roteiro: uma linha por comando, "<passo> <comando> [valor]",
+#   '#' comeca comentario. Comandos (os mesmos do teclado):
+#     andar | parar | girar <graus> | passo | energia
+#
+#   Uso: python headless.py [--seed S] [--ticks N] [--size N]
+#            [--enemies N] [--energies N] [--input aleatoria|roteiro|parado]
+#            [--script ARQ] [--report N] [--workers W] [--vector] [--lod]
+#            [--chunked [--world-size N]] [--path-budget N | --budget-ms MS] ...
+# ************************************************
+
+import sys
+import time
+import argparse
+import random
+
+import Simulacao as sim
+
+""" Lê o roteiro: passo -> lista de (comando, valor) """
+def load_script(path):
+    script = {}
+    with open(path, encoding='utf-8') as f:
+        for n, line in enumerate(f, 1):
+            line = line.split('#', 1)[0].split()
+            if not line:
+                continue
+            if len(line) < 2 or line[1] not in ('andar', 'parar', 'girar', 'passo', 'energia'):
+                raise ValueError(f"{path}:{n}: comando inválido")
+            value = float(line[2]) if len(line) > 2 else 0.0
+            script.setdefault(int(line[0]), []).append((line[1], value))
+    return script
+
+def apply_command(cmd, value):
+    player = sim.player
+    if cmd == 'andar':
+        player.moving = True
+    elif cmd == 'parar':
+        player.moving = False
+    elif cmd == 'girar':
+        player.angle += value
+    elif cmd == 'passo':
+        sim.move_forward_step(step=0.5)
+    elif cmd == 'energia':
+        player.energy = 100.0
+
+""" Jogador aleatório: anda sempre, vira de vez em quando ou ao bater
+    e recarrega a energia antes de acabar (para a simulação não parar) """
+def random_input(rng):
+    player = sim.player
+    if not player.moving:
+        player.angle += rng.uniform(90.0, 270.0)
+        player.moving = True
+    elif rng.random() < 0.02:
+        player.angle += rng.uniform(-90.0, 90.0)
+    if player.energy < 10.0:
+        player.energy = 100.0
+
+def counters():
+    cache = sim.path_cache
+    pool = sim.path_pool
+    return (f"a_star {sim.astar_calls}  cache {cache.hits + cache.suffix_hits}/{cache.misses}"
+            f"  visão {sim.los_chases}"
+            + (f"  pool {pool.submitted}/{pool.delivered}/{pool.stale}" if pool is not None else "")
+            + ("  lod {}/{}/{}".format(*sim.lod_counts) if sim.LOD_ENEMIES else ""))
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--seed', type=int, default=1234)
+    parser.add_argument('--ticks', type=int, default=3600)
+    parser.add_argument('--size', type=int, default=sim.MAP_SIZE)
+    parser.add_argument('--generator', choices=['embedded', 'python', 'numpy'], default='numpy')
+    parser.add_argument('--map-file', default=None)
+    parser.add_argument('--enemies', type=int, default=sim.MIN_ENEMIES)
+    parser.add_argument('--energies', type=int, default=sim.MIN_ENERGIES)
+    parser.add_argument('--pathfinder', choices=['astar', 'jps', 'hpa', 'nexthop', 'dstar'], default=sim.PATHFINDER)
+    parser.add_argument('--mode', choices=['astar', 'flowfield'], default=sim.PATHFINDING_MODE)
+    parser.add_argument('--workers', type=int, default=sim.PATH_WORKERS,
+                        help='processos de busca de caminho (> 0: resultado não reproduzível)')
+    parser.add_argument('--path-budget', type=int, default=sim.PATH_BUDGET_LOD,
+                        help='pedidos de caminho atendidos por passo (reproduzível)')
+    parser.add_argument('--budget-ms', type=float, default=None,
+                        help='orçamento em ms por passo no lugar de --path-budget (depende da máquina)')
+    parser.add_argument('--chunked', action='store_true', help='mundo em chunks (CHUNKED_WORLD) de --world-size')
+    parser.add_argument('--world-size', type=int, default=sim.WORLD_SIZE)
+    parser.add_argument('--vector', action='store_true', help='inimigos em arrays (VECTOR_ENEMIES)')
+    parser.add_argument('--lod', action='store_true', help='inimigos longe atualizados menos vezes (LOD_ENEMIES)')
+    parser.add_argument('--input', choices=['aleatoria', 'roteiro', 'parado'], default='aleatoria')
+    parser.add_argument('--script', default=None, help='arquivo de roteiro (--input roteiro)')
+    parser.add_argument('--report', type=int, default=600, help='imprime o progresso a cada N passos (0 = só no fim)')
+    parser.add_argument('--no-cache', action='store_true', help='não usa o cache de mapas')
+    args = parser.parse_args()
+
+    if args.input == 'roteiro' and not args.script:
+        parser.error('--input roteiro precisa de --script')
+    script = load_script(args.script) if args.script else {}
+
+    sim.MAP_SIZE = args.size
+    sim.USE_EMBEDDED = args.generator == 'embedded'
+    if not sim.USE_EMBEDDED:
+        sim.MAP_GENERATOR = args.generator
+    sim.MAP_FILE = args.map_file
+    sim.MAP_SEED = args.seed
+    sim.USE_MAP_CACHE = not args.no_cache
+    sim.PATHFINDER = args.pathfinder
+    sim.PATHFINDING_MODE = args.mode
+    sim.PATH_WORKERS = args.workers
+    if args.budget_ms is not None:
+        sim.path_scheduler.budget_ms = args.budget_ms
+        sim.PATH_BUDGET_REQUESTS = None
+    else:
+        sim.PATH_BUDGET_REQUESTS = args.path_budget
+    sim.CHUNKED_WORLD = args.chunked or sim.CHUNKED_WORLD
+    sim.WORLD_SIZE = args.world_size
+    sim.VECTOR_ENEMIES = args.vector or sim.VECTOR_ENEMIES
+    sim.LOD_ENEMIES = args.lod or sim.LOD_ENEMIES
+
+    t0 = time.perf_counter()
+    sim.generate_and_setup_map(args.seed)
+    # semente derivada (a mesma também com --map-file): com a própria semente do
+    # mapa, o sorteio repetiria o dos objetos fixos e os inimigos nasceriam neles
+    sim.seed_entities(args.seed)
+    sim.spawn_random_entities(args.enemies, args.energies)
+    print(f"Mundo montado em {time.perf_counter()-t0:.2f}s: {sim.QtdX}x{sim.QtdZ}, "
+          f"{len(sim.free_index)} células livres")
+
+    rng = random.Random(args.seed)
+    dt = 1.0 / sim.SIM_TICK_RATE
+    worst = 0.0
+    t_start = time.perf_counter()
+    t_report = t_start
+    for tick in range(args.ticks):
+        if args.input == 'aleatoria':
+            random_input(rng)
+        for cmd, value in script.get(tick, ()):
+            apply_command(cmd, value)
+        t0 = time.perf_counter()
+        sim.step_simulation(dt)
+        t1 = time.perf_counter()
+        if t1 - t0 > worst:
+            worst = t1 - t0
+        if args.report and (tick + 1) % args.report == 0:
+            rate = args.report / max(t1 - t_report, 1e-9)
+            t_report = t1
+            print(f"passo {tick+1:>8}  {rate:>9.1f} passos/s  {counters()}  "
+                  f"energia {sim.player.energy:.0f}  score {sim.player.score}")
+            sys.stdout.flush()
+    elapsed = time.perf_counter() - t_start
+
+    print(f"Passos: {args.ticks} em {elapsed:.2f}s = {args.ticks/max(elapsed, 1e-9):.1f} passos/s "
+          f"(tempo real: {sim.SIM_TICK_RATE} passos/s), médio {elapsed*1000/max(args.ticks, 1):.3f} ms, "
+          f"pior {worst*1000:.3f} ms")
+    print(f"Buscas: {counters()}")
+    print(f"Entidades: inimigos {len(sim.enemies)}, energias {len(sim.energies)}, "
+          f"objetos fixos {len(sim.fixed_objects)}")
+    print(f"Jogador: ({sim.player.x:.2f}, {sim.player.z:.2f}) energia {sim.player.energy:.0f} "
+          f"score {sim.player.score}")
+
+if __name__ == '__main__':
+    main()